@@ -0,0 +1,25 @@
+"""
+    Read-only BadgerRegistry client without brownie or web3
+
+    Only the standard library is imported, so it loads in milliseconds. Addresses are
+    returned checksummed, as brownie returns them.
+
+        client = RegistryClient("https://...")
+        client.get("controller")
+        client.get_filtered_production_vaults("v1", 3)
+"""
+from badger_registry.abi import AbiError
+from badger_registry.client import REGISTRY_ADDRESS, RegistryClient, RpcError
+from badger_registry.records import STATUSES, VaultData, VaultInfo, VaultMetadata, status_mask
+
+__all__ = [
+    "AbiError",
+    "REGISTRY_ADDRESS",
+    "RegistryClient",
+    "RpcError",
+    "STATUSES",
+    "VaultData",
+    "VaultInfo",
+    "VaultMetadata",
+    "status_mask",
+]
@@ -0,0 +1,165 @@
+"""
+    Minimal ABI codec for the registry views, standard library only
+
+    Covers the types the views take and return: uint, int, address, bool, bytes32, string,
+    bytes, dynamic arrays and tuples. Types are parsed once and cached, and addresses are
+    decoded checksummed, like web3 and brownie return them.
+"""
+import json
+from functools import lru_cache
+from pathlib import Path
+
+from badger_registry.checksum import to_checksum_address
+
+ABI_PATH = Path(__file__).parent.joinpath("abi.json")
+
+WORD = 32
+ZERO_WORD = bytes(WORD)
+
+
+class AbiError(ValueError):
+    pass
+
+
+def load_functions(path=ABI_PATH) -> dict:
+    """
+    {name: {"selector": "0x...", "inputs": [type, ...], "outputs": [type, ...]}} of the registry views
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=None)
+def parse_type(abi_type: str):
+    """
+    ("tuple", (components, ...)), ("array", element) or the base type name ("uint", "address", "string", ...)
+    """
+    if abi_type.endswith("[]"):
+        return ("array", parse_type(abi_type[:-2]))
+    if abi_type.startswith("("):
+        return ("tuple", tuple(parse_type(component) for component in _split_components(abi_type[1:-1])))
+    if abi_type.startswith("uint"):
+        return "uint"
+    if abi_type.startswith("int"):
+        return "int"
+    if abi_type in ("address", "bool", "bytes32", "string", "bytes"):
+        return abi_type
+    raise AbiError(f"Unsupported ABI type {abi_type}")
+
+
+def is_dynamic(node) -> bool:
+    if node in ("string", "bytes"):
+        return True
+    if isinstance(node, tuple):
+        return node[0] == "array" or any(is_dynamic(component) for component in node[1])
+    return False
+
+
+def head_size(node) -> int:
+    """
+    Bytes taken in the head of the enclosing tuple, static tuples are inlined
+    """
+    if isinstance(node, tuple) and node[0] == "tuple" and not is_dynamic(node):
+        return sum(head_size(component) for component in node[1])
+    return WORD
+
+
+def encode(types: list, values) -> bytes:
+    return _encode_tuple([parse_type(abi_type) for abi_type in types], list(values))
+
+
+def decode(types: list, data: bytes) -> list:
+    return _decode_tuple([parse_type(abi_type) for abi_type in types], data, 0)
+
+
+def _split_components(inner: str) -> list:
+    components, depth, start = [], 0, 0
+    for x, char in enumerate(inner):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            components.append(inner[start:x])
+            start = x + 1
+    if inner:
+        components.append(inner[start:])
+    return components
+
+
+def _encode_tuple(nodes: list, values: list) -> bytes:
+    if len(nodes) != len(values):
+        raise AbiError(f"Expected {len(nodes)} values, got {len(values)}")
+    heads, tails = [], []
+    offset = sum(head_size(node) for node in nodes)
+    for node, value in zip(nodes, values):
+        encoded = _encode_value(node, value)
+        if is_dynamic(node):
+            heads.append(offset.to_bytes(WORD, "big"))
+            tails.append(encoded)
+            offset += len(encoded)
+        else:
+            heads.append(encoded)
+    return b"".join(heads + tails)
+
+
+def _encode_value(node, value) -> bytes:
+    if node == "uint":
+        return int(value).to_bytes(WORD, "big")
+    if node == "int":
+        return int(value).to_bytes(WORD, "big", signed=True)
+    if node == "address":
+        return bytes.fromhex(value[2:] if value.startswith("0x") else value).rjust(WORD, b"\0")
+    if node == "bool":
+        return int(bool(value)).to_bytes(WORD, "big")
+    if node == "bytes32":
+        data = bytes.fromhex(value[2:]) if isinstance(value, str) else bytes(value)
+        return data.ljust(WORD, b"\0")
+    if node in ("string", "bytes"):
+        data = value.encode("utf-8") if isinstance(value, str) else bytes(value)
+        padding = -len(data) % WORD
+        return len(data).to_bytes(WORD, "big") + data + bytes(padding)
+    if node[0] == "array":
+        return len(value).to_bytes(WORD, "big") + _encode_tuple([node[1]] * len(value), list(value))
+    return _encode_tuple(list(node[1]), list(value))
+
+
+def _decode_tuple(nodes: list, data: bytes, start: int) -> list:
+    values, position = [], start
+    for node in nodes:
+        if is_dynamic(node):
+            values.append(_decode_value(node, data, start + _word(data, position)))
+            position += WORD
+        else:
+            values.append(_decode_value(node, data, position))
+            position += head_size(node)
+    return values
+
+
+def _decode_value(node, data: bytes, at: int):
+    if node == "uint":
+        return _word(data, at)
+    if node == "int":
+        return int.from_bytes(data[at : at + WORD], "big", signed=True)
+    if node == "address":
+        return to_checksum_address(data[at + 12 : at + WORD].hex())
+    if node == "bool":
+        return data[at : at + WORD] != ZERO_WORD
+    if node == "bytes32":
+        return "0x" + data[at : at + WORD].hex()
+    if node in ("string", "bytes"):
+        length = _word(data, at)
+        value = data[at + WORD : at + WORD + length]
+        if len(value) != length:
+            raise AbiError("Truncated data")
+        return value.decode("utf-8") if node == "string" else value
+    if node[0] == "array":
+        return _decode_tuple([node[1]] * _word(data, at), data, at + WORD)
+    return tuple(_decode_tuple(list(node[1]), data, at))
+
+
+def _word(data: bytes, at: int) -> int:
+    word = data[at : at + WORD]
+    if len(word) != WORD:
+        raise AbiError("Truncated data")
+    return int.from_bytes(word, "big")
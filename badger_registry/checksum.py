@@ -0,0 +1,90 @@
+"""
+    Keccak-256 and EIP-55 checksummed addresses, standard library only
+
+    hashlib's sha3_256 pads differently from the keccak256 of Ethereum, so the permutation is
+    implemented here. It is only used on addresses, which are cached as registries return the
+    same few addresses over and over.
+"""
+from functools import lru_cache
+
+## Bytes absorbed per permutation by keccak256, 1600 - 2 * 256 bits
+RATE = 136
+
+_MASK = (1 << 64) - 1
+
+
+def _round_constants() -> list:
+    constants, register = [], 1
+    for _ in range(24):
+        constant = 0
+        for bit in range(7):
+            register = ((register << 1) ^ ((register >> 7) * 0x71)) % 256
+            if register & 2:
+                constant ^= 1 << ((1 << bit) - 1)
+        constants.append(constant)
+    return constants
+
+
+_ROUND_CONSTANTS = _round_constants()
+
+
+def _pi_rho() -> list:
+    """
+    (source lane, destination lane, rotation) of the ρ and π steps, lanes indexed x + 5 * y
+    """
+    steps, x, y = [], 1, 0
+    for t in range(24):
+        x_, y_ = y, (2 * x + 3 * y) % 5
+        steps.append((x + 5 * y, x_ + 5 * y_, (t + 1) * (t + 2) // 2 % 64))
+        x, y = x_, y_
+    return steps
+
+
+_PI_RHO = _pi_rho()
+
+
+def _permute(lanes: list):
+    """
+    Keccak-f[1600] on the 25 `lanes`, indexed x + 5 * y, in place
+    """
+    for constant in _ROUND_CONSTANTS:
+        # θ
+        columns = [lanes[x] ^ lanes[x + 5] ^ lanes[x + 10] ^ lanes[x + 15] ^ lanes[x + 20] for x in range(5)]
+        for x in range(5):
+            column = columns[(x + 1) % 5]
+            d = columns[(x + 4) % 5] ^ (((column << 1) | (column >> 63)) & _MASK)
+            for i in range(x, 25, 5):
+                lanes[i] ^= d
+        # ρ and π
+        rotated = lanes[:]
+        for source, destination, shift in _PI_RHO:
+            lane = lanes[source]
+            rotated[destination] = ((lane << shift) | (lane >> (64 - shift))) & _MASK
+        # χ
+        for y in range(0, 25, 5):
+            a, b, c, d, e = rotated[y : y + 5]
+            lanes[y : y + 5] = [a ^ (~b & c), b ^ (~c & d), c ^ (~d & e), d ^ (~e & a), e ^ (~a & b)]
+        # ι
+        lanes[0] ^= constant
+
+
+def keccak256(data: bytes) -> bytes:
+    padded = bytearray(data) + b"\x01" + bytes(-(len(data) + 1) % RATE)
+    padded[-1] |= 0x80
+    lanes = [0] * 25
+    for block in range(0, len(padded), RATE):
+        for i in range(RATE // 8):
+            lanes[i] ^= int.from_bytes(padded[block + 8 * i : block + 8 * i + 8], "little")
+        _permute(lanes)
+    return b"".join(lane.to_bytes(8, "little") for lane in lanes[:4])
+
+
+@lru_cache(maxsize=4096)
+def to_checksum_address(address: str) -> str:
+    """
+    EIP-55 spelling of `address`, whatever its case
+    """
+    address = address.lower()
+    address = address[2:] if address.startswith("0x") else address
+    digest = keccak256(address.encode()).hex()
+    return "0x" + "".join(char.upper() if int(digest[i], 16) >= 8 else char for i, char in enumerate(address))
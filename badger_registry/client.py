@@ -0,0 +1,188 @@
+"""
+    Read-only registry client speaking raw JSON-RPC
+
+    Requests go over a small pool of keep-alive HTTP connections, so it can be shared between
+    threads. Every call can be pinned to a block, and struct results are decoded straight into
+    the records of badger_registry.records.
+"""
+import http.client
+import itertools
+import json
+import queue
+from urllib.parse import urlsplit
+
+from badger_registry.abi import decode, encode, load_functions
+from badger_registry.records import VaultData, VaultInfo, VaultMetadata, status_mask
+
+## The proxy shares its address across chains
+REGISTRY_ADDRESS = "0xdc602965F3e5f1e7BAf2446d5564b407d5113A06"
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+HEADERS = {"Content-Type": "application/json", "Connection": "keep-alive"}
+
+## A pooled connection the node closed while idle fails once on reuse, the request is then sent again
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class RpcError(Exception):
+    def __init__(self, message: str, code: int = None):
+        super().__init__(message)
+        self.code = code
+
+
+class RegistryClient:
+    _ids = itertools.count(1)
+
+    def __init__(self, rpc_url: str, address: str = REGISTRY_ADDRESS, timeout: float = 30, pool_size: int = 8):
+        url = urlsplit(rpc_url)
+        self.address = address.lower()
+        self.functions = load_functions()
+        self._connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        self._netloc = (url.hostname, url.port)
+        self._path = (url.path or "/") + (f"?{url.query}" if url.query else "")
+        self._timeout = timeout
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+
+    def request(self, method: str, params: list):
+        body = json.dumps({"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}).encode()
+        for attempt in range(2):
+            connection, reused = self._acquire()
+            try:
+                connection.request("POST", self._path, body, HEADERS)
+                response = connection.getresponse()
+                payload = response.read()
+            except STALE_CONNECTION_ERRORS:
+                connection.close()
+                if reused and attempt == 0:
+                    continue
+                raise
+            except Exception:
+                connection.close()
+                raise
+            self._release(connection, response)
+            break
+
+        if response.status != 200:
+            raise RpcError(f"{method} failed: HTTP {response.status} {payload[:200]!r}")
+        result = json.loads(payload)
+        if "error" in result:
+            raise RpcError(f"{method} failed: {result['error'].get('message')}", result["error"].get("code"))
+        return result["result"]
+
+    def call(self, name: str, *args, block="latest"):
+        """
+        Call the view `name`, a single output is returned as is and several as a tuple
+        """
+        function = self.functions[name]
+        data = function["selector"] + encode(function["inputs"], args).hex()
+        block = hex(block) if isinstance(block, int) else block
+        result = self.request("eth_call", [{"to": self.address, "data": data}, block])
+        values = decode(function["outputs"], bytes.fromhex(result[2:]))
+        return values[0] if len(values) == 1 else tuple(values)
+
+    def block_number(self) -> int:
+        return int(self.request("eth_blockNumber", []), 16)
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    ## Keys
+
+    def get(self, key: str, block="latest") -> str:
+        return self.call("get", key, block=block)
+
+    def get_many(self, keys: list, block="latest") -> list:
+        return self.call("getMany", list(keys), block=block)
+
+    def get_all_key_values(self, block="latest") -> dict:
+        keys, values = self.call("getAllKeyValues", block=block)
+        return dict(zip(keys, values))
+
+    def get_all_versions(self, block="latest") -> list:
+        return self.call("getAllVersions", block=block)
+
+    ## Vaults
+
+    def get_vaults(self, version: str, author: str, block="latest") -> list:
+        return _vault_infos(self.call("getVaults", version, author, block=block))
+
+    def get_author_vaults(self, author: str, block="latest") -> list:
+        return _vault_infos(self.call("getAuthorVaults", author, block=block))
+
+    def get_filtered_production_vaults(self, version: str, status: int, block="latest") -> list:
+        return _vault_infos(self.call("getFilteredProductionVaults", version, status, block=block))
+
+    def get_production_vaults(self, block="latest") -> list:
+        return [
+            VaultData(version, status, [VaultMetadata(*item) for item in items])
+            for version, status, items in self.call("getProductionVaults", block=block)
+        ]
+
+    def get_production_vaults_by_status(self, statuses, versions=(), block="latest") -> list:
+        """
+        Flat VaultInfo list of the production vaults in `statuses` (names or values), of every listed
+        version unless `versions` is given
+        """
+        return _vault_infos(
+            self.call("getProductionVaultsByStatus", status_mask(statuses), list(versions), block=block)
+        )
+
+    def get_production_vaults_by_protocol(self, protocol: str, block="latest") -> list:
+        """
+        VaultInfo of the production vaults with `protocol`, whatever their status, deprecated included
+        """
+        return _vault_infos(self.call("getProductionVaultsByProtocol", protocol, block=block))
+
+    def get_production_vaults_by_behavior(self, behavior: str, block="latest") -> list:
+        """
+        VaultInfo of the production vaults with `behavior`, whatever their status, deprecated included
+        """
+        return _vault_infos(self.call("getProductionVaultsByBehavior", behavior, block=block))
+
+    def production_vault_info(self, vault: str, block="latest"):
+        """
+        VaultInfo of a production vault, None when the vault isn't in production
+        """
+        info = VaultInfo(*self.call("productionVaultInfoByVault", vault, block=block))
+        return None if info.vault == ZERO_ADDRESS else info
+
+    ## Change detection
+
+    def get_revisions(self, block="latest") -> tuple:
+        """
+        (key table revision, [bucket revisions, ...], state digest)
+        """
+        return self.call("getRevisions", block=block)
+
+    def state_digest(self, block="latest") -> str:
+        return self.call("stateDigest", block=block)
+
+    def _acquire(self):
+        try:
+            return self._pool.get_nowait(), True
+        except queue.Empty:
+            return self._connection_class(*self._netloc, timeout=self._timeout), False
+
+    def _release(self, connection, response):
+        if response.will_close:
+            connection.close()
+            return
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+
+def _vault_infos(items: list) -> list:
+    return [VaultInfo(*item) for item in items]
@@ -0,0 +1,84 @@
+"""
+    Records decoded from the registry structs
+
+    They unpack and compare like the tuples brownie returns, so code written against
+    `registry.getFilteredProductionVaults(...)` keeps working on them.
+"""
+
+## BadgerRegistry.VaultStatus
+STATUSES = ("deprecated", "experimental", "guarded", "open")
+
+
+def status_mask(statuses) -> int:
+    """
+    getProductionVaultsByStatus mask of VaultStatus names or values, e.g. ["guarded", "open"] => 0x0c
+    """
+    mask = 0
+    for status in statuses:
+        if status in STATUSES:
+            status = STATUSES.index(status)
+        elif status not in range(len(STATUSES)):
+            raise ValueError(f"Unknown status {status!r}")
+        mask |= 1 << status
+    return mask
+
+
+class _Record:
+    __slots__ = ()
+
+    def __iter__(self):
+        return (getattr(self, name) for name in self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __getitem__(self, index):
+        return tuple(self)[index]
+
+    def __eq__(self, other):
+        if isinstance(other, (_Record, tuple, list)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class VaultInfo(_Record):
+    """
+    BadgerRegistry.VaultInfo
+    """
+
+    __slots__ = ("vault", "version", "status", "metadata")
+
+    def __init__(self, vault: str, version: str, status: int, metadata: str):
+        self.vault = vault
+        self.version = version
+        self.status = status
+        self.metadata = metadata
+
+
+class VaultMetadata(_Record):
+    """
+    BadgerRegistry.VaultMetadata
+    """
+
+    __slots__ = ("vault", "metadata")
+
+    def __init__(self, vault: str, metadata: str):
+        self.vault = vault
+        self.metadata = metadata
+
+
+class VaultData(_Record):
+    """
+    BadgerRegistry.VaultData, one bucket of getProductionVaults
+    """
+
+    __slots__ = ("version", "status", "list")
+
+    def __init__(self, version: str, status: int, list: list):
+        self.version = version
+        self.status = status
+        self.list = list
@@ -1,3 +1,13 @@
+import os
+
 from dotenv import load_dotenv
 
 load_dotenv()
+
+## RPC_METRICS=1 prints a summary of the RPC requests at exit, RPC_METRICS=<path> writes it as JSON.
+## Unset, empty, 0, false or no leave it off
+RPC_METRICS = os.getenv("RPC_METRICS", "").strip()
+if RPC_METRICS.lower() not in ("", "0", "false", "no"):
+    from scripts.helpers.rpc_metrics import install
+
+    install(RPC_METRICS)
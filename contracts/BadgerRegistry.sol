@@ -2,9 +2,11 @@
 pragma solidity =0.8.11;
 pragma experimental ABIEncoderV2;
 
+import "@openzeppelin/contracts/utils/Multicall.sol";
 import "@openzeppelin/contracts/utils/structs/EnumerableSet.sol";
 
-contract BadgerRegistry {
+/// @dev `multicall` runs several calls in one transaction, each checked against the original msg.sender
+contract BadgerRegistry is Multicall {
   using EnumerableSet for EnumerableSet.AddressSet;
 
   /// @dev is the vault at the experimental, guarded, open or deprecated stage? Only for Prod Vaults
@@ -35,40 +37,150 @@ contract BadgerRegistry {
     VaultMetadata[] list;
   }
 
+  /// @dev Kinds of change rolled into stateDigest, see _recordChange
+  enum Change {
+    newVault,
+    removeVault,
+    promoteVault,
+    demoteVault,
+    purgeVault,
+    updateMetadata,
+    set,
+    deleteKey,
+    addVersion
+  }
+
+  /// @dev VaultInfo packed in a single slot, the version is interned (see versionIds) and the metadata stored apart.
+  /// Production vaults keep the positions verifyMetadata found in their metadata, see _indexMetadata
+  //@notice uint40 and uint24 are out of reach of the versions and metadata a transaction can register
+  struct PackedVaultInfo {
+    address vault;
+    VaultStatus status;
+    uint40 versionId;
+    uint24 protocolIndex;
+    uint24 behaviorIndex;
+  }
+
   /// @dev Multisig. Vaults from here are considered Production ready
   address public governance;
   address public developer; //@notice an address with some powers to make things easier in development
   address public strategistGuild;
 
-  /// @dev Given an Author Address, and Version, Return the Vault
-  mapping(address => mapping(string => EnumerableSet.AddressSet)) private vaults;
+  /// @dev Deprecated, author vaults by version before versions were interned. Emptied by migrateVaults
+  mapping(address => mapping(string => EnumerableSet.AddressSet)) private legacyVaults;
 
-  /// @dev Given an Author Address, and Vault Address, Return the VaultInfo
-  mapping(address => mapping(address => VaultInfo)) public vaultInfoByAuthorAndVault;
+  /// @dev Deprecated, author VaultInfo before it was packed. Emptied by migrateVaults
+  mapping(address => mapping(address => VaultInfo)) private legacyVaultInfoByAuthorAndVault;
 
   mapping(string => address) public addresses;
   mapping(address => string) public keyByAddress;
 
-  /// @dev Given Version and VaultStatus, returns the list of Vaults in production
-  mapping(string => mapping(VaultStatus => EnumerableSet.AddressSet)) private productionVaults;
+  /// @dev Deprecated, production vaults by version before versions were interned. Emptied by migrateProductionVaults
+  mapping(string => mapping(VaultStatus => EnumerableSet.AddressSet)) private legacyProductionVaults;
 
-  /// @dev Given Vault Address, returns the VaultInfo in production
-  mapping(address => VaultInfo) public productionVaultInfoByVault;
+  /// @dev Deprecated, production VaultInfo before it was packed. Emptied by migrateProductionVaults
+  mapping(address => VaultInfo) private legacyProductionVaultInfoByVault;
 
   // Known constants you can use
   string[] public keys; //@notice, you don't have a guarantee of the key being there, it's just a utility
   string[] public versions; //@notice, you don't have a guarantee of the key being there, it's just a utility
 
-  event NewVault(address author, string version, string metadata, address vault);
-  event RemoveVault(address author, string version, string metadata, address vault);
-  event PromoteVault(address author, string version, string metadata, address vault, VaultStatus status);
-  event DemoteVault(address author, string version, string metadata, address vault, VaultStatus status);
-  event PurgeVault(address author, string version, string metadata, address vault, VaultStatus status);
+  /// @dev Given a key, returns its position in `keys` plus one, zero when the key isn't listed
+  mapping(string => uint256) private keyIndexes;
+
+  /// @dev Every version a vault was ever registered with, a version id is its position here plus one
+  //@notice Unlike `versions` this isn't curated, as anyone can `add` a vault with any version
+  string[] private internedVersions;
+  mapping(string => uint256) private versionIds;
+
+  /// @dev Given an Author Address, and Version id, Return the Vault
+  mapping(address => mapping(uint256 => EnumerableSet.AddressSet)) private vaults;
+
+  /// @dev Given an Author Address, and Vault Address, Return the packed VaultInfo and its metadata
+  mapping(address => mapping(address => PackedVaultInfo)) private packedVaultInfoByAuthorAndVault;
+  mapping(address => mapping(address => string)) private metadataByAuthorAndVault;
+
+  /// @dev Given Version id and VaultStatus, returns the list of Vaults in production
+  mapping(uint256 => mapping(VaultStatus => EnumerableSet.AddressSet)) private productionVaults;
+
+  /// @dev Given Vault Address, returns the packed VaultInfo in production and its metadata
+  mapping(address => PackedVaultInfo) private packedProductionVaultInfoByVault;
+  mapping(address => string) private productionMetadataByVault;
+
+  /// @dev Every author with at least one vault, and given an Author Address, all their Vaults across versions
+  EnumerableSet.AddressSet private authors;
+  mapping(address => EnumerableSet.AddressSet) private vaultsByAuthor;
+
+  /// @dev Given Vault Address, returns every author that added it
+  mapping(address => EnumerableSet.AddressSet) private authorsByVault;
+
+  /// @dev Given Version id, the revision of each of its production buckets, one 64 bits counter per VaultStatus
+  mapping(uint256 => uint256) private productionRevisions;
+
+  /// @dev Revision of the key table, bumped on every set and deleteKey
+  uint256 private keysRevision;
+
+  /// @dev Rolling hash of every change made to the registry since it was deployed or upgraded to track it
+  bytes32 public stateDigest;
+
+  /// @dev Given the hash of a protocol (or behavior) metadata value, the production vaults with that value.
+  /// Vaults stay indexed whatever their status, demote only moves them between buckets, purge unindexes them
+  mapping(bytes32 => EnumerableSet.AddressSet) private productionVaultsByProtocol;
+  mapping(bytes32 => EnumerableSet.AddressSet) private productionVaultsByBehavior;
+
+  /// @dev Vault events are indexed by vault, keccak256 of the version, then author or status, so the
+  /// history of a vault, version, author or status can be filtered by the node.
+  /// `author` is the account that added the vault, `caller` the role that promoted, demoted, purged or updated it
+  event NewVault(
+    address indexed vault,
+    bytes32 indexed versionHash,
+    address indexed author,
+    string version,
+    string metadata
+  );
+  event RemoveVault(
+    address indexed vault,
+    bytes32 indexed versionHash,
+    address indexed author,
+    string version,
+    string metadata
+  );
+  event PromoteVault(
+    address indexed vault,
+    bytes32 indexed versionHash,
+    VaultStatus indexed status,
+    address caller,
+    string version,
+    string metadata
+  );
+  event DemoteVault(
+    address indexed vault,
+    bytes32 indexed versionHash,
+    VaultStatus indexed status,
+    address caller,
+    string version,
+    string metadata
+  );
+  event PurgeVault(
+    address indexed vault,
+    bytes32 indexed versionHash,
+    VaultStatus indexed status,
+    address caller,
+    string version,
+    string metadata
+  );
 
   event Set(string key, address at);
   event AddKey(string key);
   event DeleteKey(string key);
   event AddVersion(string version);
+  event UpdateVaultMetadata(
+    address indexed vault,
+    bytes32 indexed versionHash,
+    address indexed caller,
+    string version,
+    string metadata
+  );
 
   function initialize(address newGovernance, address newStrategistGuild) public {
     require(governance == address(0));
@@ -106,6 +218,7 @@ contract BadgerRegistry {
     versions.push(version);
 
     emit AddVersion(version);
+    _recordChange(abi.encode(Change.addVersion, version));
   }
 
   /// @dev Add a vault, under the msg.sender key
@@ -115,14 +228,21 @@ contract BadgerRegistry {
     string memory version,
     string memory metadata
   ) public {
+    _add(vault, version, metadata);
+  }
+
+  function _add(
+    address vault,
+    string memory version,
+    string memory metadata
+  ) private {
     verifyMetadata(metadata);
-    VaultInfo memory existedVaultInfo = vaultInfoByAuthorAndVault[msg.sender][vault];
+    PackedVaultInfo memory existedVaultInfo = packedVaultInfoByAuthorAndVault[msg.sender][vault];
     if (existedVaultInfo.vault != address(0)) {
       require(
         // Compare strings via their hash because solidity
-        vault == existedVaultInfo.vault &&
-          keccak256(bytes(version)) == keccak256(bytes(existedVaultInfo.version)) &&
-          keccak256(bytes(metadata)) == keccak256(bytes(existedVaultInfo.metadata)),
+        existedVaultInfo.versionId == versionIds[version] &&
+          keccak256(bytes(metadata)) == keccak256(bytes(metadataByAuthorAndVault[msg.sender][vault])),
         "BadgerRegistry: vault info changed. Please remove before add changed vault info"
       );
       // Same vault cannot be added twice (nothing happens)
@@ -130,27 +250,35 @@ contract BadgerRegistry {
     }
 
     // Vault status start as experimental, this aids in promotion / demotion invariants
-    vaultInfoByAuthorAndVault[msg.sender][vault] = VaultInfo({
+    uint256 versionId = _internVersion(version);
+    packedVaultInfoByAuthorAndVault[msg.sender][vault] = PackedVaultInfo({
       vault: vault,
-      version: version,
-      status: VaultStatus(1),
-      metadata: metadata
+      status: VaultStatus.experimental,
+      versionId: uint40(versionId)
     });
+    metadataByAuthorAndVault[msg.sender][vault] = metadata;
 
-    vaults[msg.sender][version].add(vault);
-    emit NewVault(msg.sender, version, metadata, vault);
+    vaults[msg.sender][versionId].add(vault);
+    _indexAuthorVault(msg.sender, vault);
+    emit NewVault(vault, keccak256(bytes(version)), msg.sender, version, metadata);
+    _recordChange(abi.encode(Change.newVault, msg.sender, version, metadata, vault));
   }
 
   /// @dev Remove the vault from your index
   function remove(address vault) public {
-    VaultInfo memory existedVaultInfo = vaultInfoByAuthorAndVault[msg.sender][vault];
+    PackedVaultInfo memory existedVaultInfo = packedVaultInfoByAuthorAndVault[msg.sender][vault];
     if (existedVaultInfo.vault == address(0)) {
       return;
     }
-    delete vaultInfoByAuthorAndVault[msg.sender][vault];
-    bool removedFromVersionSet = vaults[msg.sender][existedVaultInfo.version].remove(vault);
+    string memory metadata = metadataByAuthorAndVault[msg.sender][vault];
+    delete packedVaultInfoByAuthorAndVault[msg.sender][vault];
+    delete metadataByAuthorAndVault[msg.sender][vault];
+    bool removedFromVersionSet = vaults[msg.sender][existedVaultInfo.versionId].remove(vault);
+    _unindexAuthorVault(msg.sender, vault);
     if (removedFromVersionSet) {
-      emit RemoveVault(msg.sender, existedVaultInfo.version, existedVaultInfo.metadata, vault);
+      string storage version = internedVersions[existedVaultInfo.versionId - 1];
+      emit RemoveVault(vault, keccak256(bytes(version)), msg.sender, version, metadata);
+      _recordChange(abi.encode(Change.removeVault, msg.sender, version, metadata, vault));
     }
   }
 
@@ -164,7 +292,16 @@ contract BadgerRegistry {
     VaultStatus status
   ) public {
     require(msg.sender == governance || msg.sender == strategistGuild || msg.sender == developer, "!auth");
-    verifyMetadata(metadata);
+    _promote(vault, version, metadata, status);
+  }
+
+  function _promote(
+    address vault,
+    string memory version,
+    string memory metadata,
+    VaultStatus status
+  ) private {
+    (uint256 protocolIndex, uint256 behaviorIndex) = verifyMetadata(metadata);
 
     VaultStatus actualStatus = status;
     if (msg.sender == developer) {
@@ -172,35 +309,42 @@ contract BadgerRegistry {
       actualStatus = VaultStatus.experimental;
     }
 
-    VaultInfo memory existedVaultInfo = productionVaultInfoByVault[vault];
+    PackedVaultInfo memory existedVaultInfo = packedProductionVaultInfoByVault[vault];
+    uint256 versionId;
     if (existedVaultInfo.vault != address(0)) {
+      versionId = existedVaultInfo.versionId;
       require(
-        // Compare strings via their hash because solidity
-        vault == existedVaultInfo.vault && keccak256(bytes(version)) == keccak256(bytes(existedVaultInfo.version)),
+        versionId == versionIds[version],
         "BadgerRegistry: vault info changed. Please demote before promote changed vault info"
       );
-      productionVaultInfoByVault[vault].status = actualStatus;
+      packedProductionVaultInfoByVault[vault].status = actualStatus;
     } else {
-      productionVaultInfoByVault[vault] = VaultInfo({
+      versionId = _internVersion(version);
+      packedProductionVaultInfoByVault[vault] = PackedVaultInfo({
         vault: vault,
-        version: version,
         status: actualStatus,
-        metadata: metadata
+        versionId: uint40(versionId)
       });
+      productionMetadataByVault[vault] = metadata;
+      _indexMetadata(vault, metadata, protocolIndex, behaviorIndex);
     }
     require(uint256(actualStatus) >= uint256(existedVaultInfo.status), "BadgerRegistry: Vault is not being promoted");
 
-    bool addedToVersionStatusSet = productionVaults[version][actualStatus].add(vault);
+    bool addedToVersionStatusSet = productionVaults[versionId][actualStatus].add(vault);
     // If addedToVersionStatusSet remove from old and emit event
     if (addedToVersionStatusSet) {
       // also remove from old prod
       if (uint256(actualStatus) > 0) {
         for (uint256 status_ = uint256(actualStatus); status_ > 0; --status_) {
-          productionVaults[version][VaultStatus(status_ - 1)].remove(vault);
+          productionVaults[versionId][VaultStatus(status_ - 1)].remove(vault);
         }
       }
+      _bumpProductionRevision(versionId, actualStatus);
+      if (existedVaultInfo.vault != address(0)) {
+        _bumpProductionRevision(versionId, existedVaultInfo.status);
+      }
 
-      emit PromoteVault(msg.sender, version, metadata, vault, actualStatus);
+      _logProductionChange(Change.promoteVault, version, metadata, vault, actualStatus);
     }
   }
 
@@ -208,34 +352,44 @@ contract BadgerRegistry {
   /// @notice all roles can demote
   function demote(address vault, VaultStatus status) public {
     require(msg.sender == governance || msg.sender == strategistGuild || msg.sender == developer, "!auth");
+    _demote(vault, status);
+  }
 
+  function _demote(address vault, VaultStatus status) private {
     VaultStatus actualStatus = status;
 
-    VaultInfo memory existedVaultInfo = productionVaultInfoByVault[vault];
+    PackedVaultInfo memory existedVaultInfo = packedProductionVaultInfoByVault[vault];
     require(existedVaultInfo.vault != address(0), "BadgerRegistry: Vault does not exist");
     // Value should be allowed to be equal to allow for promotion of vaults to experimental status as prod vaults
     require(uint256(actualStatus) < uint256(existedVaultInfo.status), "BadgerRegistry: Vault is not being demoted");
 
-    productionVaults[existedVaultInfo.version][existedVaultInfo.status].remove(vault);
-    productionVaultInfoByVault[vault].status = status;
-    emit DemoteVault(msg.sender, existedVaultInfo.version, existedVaultInfo.metadata, vault, status);
-    productionVaults[existedVaultInfo.version][status].add(vault);
+    productionVaults[existedVaultInfo.versionId][existedVaultInfo.status].remove(vault);
+    packedProductionVaultInfoByVault[vault].status = status;
+    string storage version = internedVersions[existedVaultInfo.versionId - 1];
+    string storage metadata = productionMetadataByVault[vault];
+    _logProductionChange(Change.demoteVault, version, metadata, vault, status);
+    productionVaults[existedVaultInfo.versionId][status].add(vault);
+    _bumpProductionRevision(existedVaultInfo.versionId, existedVaultInfo.status);
+    _bumpProductionRevision(existedVaultInfo.versionId, status);
   }
 
   function purge(address vault) public {
     require(msg.sender == governance || msg.sender == strategistGuild, "!auth");
+    _purge(vault);
+  }
 
-    VaultInfo memory existedVaultInfo = productionVaultInfoByVault[vault];
+  function _purge(address vault) private {
+    PackedVaultInfo memory existedVaultInfo = packedProductionVaultInfoByVault[vault];
     require(existedVaultInfo.vault != address(0), "BadgerRegistry: Vault does not exist");
 
-    bool removedFromVersionStatusSet = productionVaults[existedVaultInfo.version][existedVaultInfo.status].remove(
-      vault
-    );
-    bool deletedFromVaultInfoByVault = productionVaultInfoByVault[vault].vault != address(0);
-    if (removedFromVersionStatusSet || deletedFromVaultInfoByVault) {
-      delete productionVaultInfoByVault[vault];
-      emit PurgeVault(msg.sender, existedVaultInfo.version, existedVaultInfo.metadata, vault, existedVaultInfo.status);
-    }
+    productionVaults[existedVaultInfo.versionId][existedVaultInfo.status].remove(vault);
+    string memory metadata = productionMetadataByVault[vault];
+    _unindexMetadata(vault, metadata, existedVaultInfo.protocolIndex, existedVaultInfo.behaviorIndex);
+    delete packedProductionVaultInfoByVault[vault];
+    delete productionMetadataByVault[vault];
+    _bumpProductionRevision(existedVaultInfo.versionId, existedVaultInfo.status);
+    string storage version = internedVersions[existedVaultInfo.versionId - 1];
+    _logProductionChange(Change.purgeVault, version, metadata, vault, existedVaultInfo.status);
   }
 
   /// @notice Metadata may need to be updated in the case of a vault upgrade (e.g. curve -> convex)
@@ -243,11 +397,361 @@ contract BadgerRegistry {
   /// @param vault Vault address
   function updateMetadata(address vault, string memory metadata) public {
     require(msg.sender == governance || msg.sender == strategistGuild, "!auth");
-    verifyMetadata(metadata);
+    _updateMetadata(vault, metadata);
+  }
+
+  function _updateMetadata(address vault, string memory metadata) private {
+    (uint256 protocolIndex, uint256 behaviorIndex) = verifyMetadata(metadata);
+
+    PackedVaultInfo memory existedVaultInfo = packedProductionVaultInfoByVault[vault];
+    require(existedVaultInfo.vault != address(0), "BadgerRegistry: Vault does not exist");
+
+    _unindexMetadata(
+      vault,
+      productionMetadataByVault[vault],
+      existedVaultInfo.protocolIndex,
+      existedVaultInfo.behaviorIndex
+    );
+    productionMetadataByVault[vault] = metadata;
+    _indexMetadata(vault, metadata, protocolIndex, behaviorIndex);
+    _bumpProductionRevision(existedVaultInfo.versionId, existedVaultInfo.status);
+    string storage version = internedVersions[existedVaultInfo.versionId - 1];
+    emit UpdateVaultMetadata(vault, keccak256(bytes(version)), msg.sender, version, metadata);
+    _recordChange(abi.encode(Change.updateMetadata, msg.sender, version, metadata, vault));
+  }
+
+  /** Version interning */
+
+  /// @dev Returns the id of a version, registering it first if it's new
+  function _internVersion(string memory version) private returns (uint256 versionId) {
+    versionId = versionIds[version];
+    if (versionId == 0) {
+      internedVersions.push(version);
+      versionId = internedVersions.length;
+      versionIds[version] = versionId;
+    }
+  }
+
+  /// @dev Unpacks a VaultInfo for the views
+  function _vaultInfo(PackedVaultInfo storage packed, string storage metadata)
+    private
+    view
+    returns (VaultInfo memory info)
+  {
+    info.vault = packed.vault;
+    info.status = packed.status;
+    info.metadata = metadata;
+    if (packed.versionId != 0) {
+      info.version = internedVersions[packed.versionId - 1];
+    }
+  }
+
+  /// @dev Given an Author Address, and Vault Address, Return the VaultInfo
+  function vaultInfoByAuthorAndVault(address author, address vaultAddress)
+    public
+    view
+    returns (
+      address vault,
+      string memory version,
+      VaultStatus status,
+      string memory metadata
+    )
+  {
+    VaultInfo memory info = _vaultInfo(
+      packedVaultInfoByAuthorAndVault[author][vaultAddress],
+      metadataByAuthorAndVault[author][vaultAddress]
+    );
+    return (info.vault, info.version, info.status, info.metadata);
+  }
+
+  /// @dev Given Vault Address, returns the VaultInfo in production
+  function productionVaultInfoByVault(address vaultAddress)
+    public
+    view
+    returns (
+      address vault,
+      string memory version,
+      VaultStatus status,
+      string memory metadata
+    )
+  {
+    VaultInfo memory info = _vaultInfo(
+      packedProductionVaultInfoByVault[vaultAddress],
+      productionMetadataByVault[vaultAddress]
+    );
+    return (info.vault, info.version, info.status, info.metadata);
+  }
+
+  /** Migration */
+  //@notice Registries upgraded from the layout with string versions and unpacked VaultInfo must move their
+  //@notice vaults over in the upgrade transaction (see `migrate`), as until then they are not visible in the views.
+  //@notice Anyone can call these, they only move data already in storage and clear it from the old layout,
+  //@notice so running them twice is a no-op. A vault already present in the new layout is kept as is.
+
+  /// @dev Moves up to `count` production vaults of the given version and status to the packed layout
+  function migrateProductionVaults(
+    string memory version,
+    VaultStatus status,
+    uint256 count
+  ) public {
+    EnumerableSet.AddressSet storage legacySet = legacyProductionVaults[version][status];
+    for (uint256 x = 0; x < count && legacySet.length() > 0; ++x) {
+      address vault = legacySet.at(legacySet.length() - 1);
+      legacySet.remove(vault);
+
+      VaultInfo storage legacyInfo = legacyProductionVaultInfoByVault[vault];
+      if (packedProductionVaultInfoByVault[vault].vault == address(0) && legacyInfo.vault != address(0)) {
+        uint256 versionId = _internVersion(version);
+        packedProductionVaultInfoByVault[vault] = PackedVaultInfo({
+          vault: vault,
+          status: status,
+          versionId: uint40(versionId)
+        });
+        string memory metadata = legacyInfo.metadata;
+        productionMetadataByVault[vault] = metadata;
+        productionVaults[versionId][status].add(vault);
+        _bumpProductionRevision(versionId, status);
+        (uint256 protocolIndex, uint256 behaviorIndex) = verifyMetadata(metadata);
+        _indexMetadata(vault, metadata, protocolIndex, behaviorIndex);
+      }
+      delete legacyProductionVaultInfoByVault[vault];
+    }
+  }
+
+  /// @dev Moves up to `count` vaults the given author added under the given version to the packed layout
+  //@notice Authors are not enumerable in the old layout, they can be listed from the NewVault events.
+  //@notice Moved vaults are listed in the author index as well
+  function migrateVaults(
+    address author,
+    string memory version,
+    uint256 count
+  ) public {
+    EnumerableSet.AddressSet storage legacySet = legacyVaults[author][version];
+    for (uint256 x = 0; x < count && legacySet.length() > 0; ++x) {
+      address vault = legacySet.at(legacySet.length() - 1);
+      legacySet.remove(vault);
+
+      VaultInfo storage legacyInfo = legacyVaultInfoByAuthorAndVault[author][vault];
+      if (packedVaultInfoByAuthorAndVault[author][vault].vault == address(0) && legacyInfo.vault != address(0)) {
+        uint256 versionId = _internVersion(version);
+        packedVaultInfoByAuthorAndVault[author][vault] = PackedVaultInfo({
+          vault: vault,
+          status: legacyInfo.status,
+          versionId: uint40(versionId)
+        });
+        metadataByAuthorAndVault[author][vault] = legacyInfo.metadata;
+        vaults[author][versionId].add(vault);
+        _indexAuthorVault(author, vault);
+      }
+      delete legacyVaultInfoByAuthorAndVault[author][vault];
+    }
+  }
+
+  /// @dev Indexes every key and moves every vault of the given buckets, all in one call
+  //@notice Meant to run through `upgradeToAndCall`, so the vaults never go missing from the views.
+  //@notice Production buckets are listed by version, author buckets by (author, version) pairs
+  function migrate(
+    string[] memory productionVersions,
+    address[] memory _authors,
+    string[] memory _versions
+  ) external {
+    require(_authors.length == _versions.length, "BadgerRegistry: length mismatch");
+    indexKeys(0, keys.length);
+    for (uint256 x = 0; x < productionVersions.length; ++x) {
+      for (uint256 status = 0; status < VAULT_STATUS_LENGTH; ++status) {
+        migrateProductionVaults(productionVersions[x], VaultStatus(status), type(uint256).max);
+      }
+    }
+    for (uint256 x = 0; x < _authors.length; ++x) {
+      migrateVaults(_authors[x], _versions[x], type(uint256).max);
+    }
+  }
+
+  /** Change detection */
+  //@notice Pollers compare revisions to tell which parts of the registry changed since they last read it,
+  //@notice and mirrors built from the events compare stateDigest to tell whether they are in sync
+
+  /// @dev Rolls a change into stateDigest, `change` is the abi encoded Change followed by the fields of its event
+  function _recordChange(bytes memory change) private {
+    stateDigest = keccak256(abi.encode(stateDigest, keccak256(change)));
+  }
+
+  /// @dev Emits the event of a promotion, demotion or purge and records the change, apart to keep their stacks shallow
+  function _logProductionChange(
+    Change change,
+    string memory version,
+    string memory metadata,
+    address vault,
+    VaultStatus status
+  ) private {
+    bytes32 versionHash = keccak256(bytes(version));
+    if (change == Change.promoteVault) {
+      emit PromoteVault(vault, versionHash, status, msg.sender, version, metadata);
+    } else if (change == Change.demoteVault) {
+      emit DemoteVault(vault, versionHash, status, msg.sender, version, metadata);
+    } else {
+      emit PurgeVault(vault, versionHash, status, msg.sender, version, metadata);
+    }
+    _recordChange(abi.encode(change, msg.sender, version, metadata, vault, status));
+  }
+
+  /// @dev Bumps the revision of a production bucket
+  function _bumpProductionRevision(uint256 versionId, VaultStatus status) private {
+    productionRevisions[versionId] += 1 << (64 * uint256(status));
+  }
+
+  /// @dev Revisions of the key table and of every bucket of getProductionVaults, with the state digest
+  /// @return keyTableRevision the key table revision
+  /// @return bucketRevisions the revision of each bucket, in the order getProductionVaults lists them
+  /// @return digest the current stateDigest
+  function getRevisions()
+    public
+    view
+    returns (
+      uint256 keyTableRevision,
+      uint256[] memory bucketRevisions,
+      bytes32 digest
+    )
+  {
+    uint256 versionsCount = versions.length;
+    bucketRevisions = new uint256[](versionsCount * VAULT_STATUS_LENGTH);
+    for (uint256 x = 0; x < versionsCount; x++) {
+      uint256 revisions = productionRevisions[versionIds[versions[x]]];
+      for (uint256 y = 0; y < VAULT_STATUS_LENGTH; y++) {
+        bucketRevisions[x * VAULT_STATUS_LENGTH + y] = uint64(revisions >> (64 * y));
+      }
+    }
+    return (keysRevision, bucketRevisions, stateDigest);
+  }
+
+  /** Metadata index */
+  //@notice Production vaults are indexed by the hash of their protocol and behavior values, e.g. "Convex" for
+  //@notice protocol=Convex, so a lookup costs as much as its result whatever the size of the registry.
+  //@notice Demotions keep the index as is, the status of each vault is part of the views result
+
+  /// @dev Lists the vault under the protocol and behavior of its metadata, at the positions verifyMetadata returned.
+  /// The positions are kept with the production VaultInfo, so unindexing doesn't parse the metadata again
+  function _indexMetadata(
+    address vault,
+    string memory metadata,
+    uint256 protocolIndex,
+    uint256 behaviorIndex
+  ) private {
+    PackedVaultInfo storage info = packedProductionVaultInfoByVault[vault];
+    info.protocolIndex = uint24(protocolIndex);
+    info.behaviorIndex = uint24(behaviorIndex);
+    (bytes32 protocolHash, bytes32 behaviorHash) = _metadataHashes(bytes(metadata), protocolIndex, behaviorIndex);
+    productionVaultsByProtocol[protocolHash].add(vault);
+    productionVaultsByBehavior[behaviorHash].add(vault);
+  }
+
+  /// @dev Reverts _indexMetadata, given the positions stored with the vault info
+  function _unindexMetadata(
+    address vault,
+    string memory metadata,
+    uint256 protocolIndex,
+    uint256 behaviorIndex
+  ) private {
+    (bytes32 protocolHash, bytes32 behaviorHash) = _metadataHashes(bytes(metadata), protocolIndex, behaviorIndex);
+    productionVaultsByProtocol[protocolHash].remove(vault);
+    productionVaultsByBehavior[behaviorHash].remove(vault);
+  }
+
+  /// @dev Retrieve the production Vaults whose metadata has the given protocol, e.g. "Convex"
+  /// @notice Every status is returned, deprecated included, filter on VaultInfo.status for the live ones
+  function getProductionVaultsByProtocol(string memory protocol) public view returns (VaultInfo[] memory) {
+    return _productionVaultInfos(productionVaultsByProtocol[keccak256(bytes(protocol))]);
+  }
+
+  /// @dev Retrieve the production Vaults whose metadata has the given behavior, e.g. "DCA"
+  /// @notice Every status is returned, deprecated included, filter on VaultInfo.status for the live ones
+  function getProductionVaultsByBehavior(string memory behavior) public view returns (VaultInfo[] memory) {
+    return _productionVaultInfos(productionVaultsByBehavior[keccak256(bytes(behavior))]);
+  }
+
+  /// @dev VaultInfo of every production vault of `vaultSet`
+  function _productionVaultInfos(EnumerableSet.AddressSet storage vaultSet) private view returns (VaultInfo[] memory) {
+    uint256 length = vaultSet.length();
+    VaultInfo[] memory list = new VaultInfo[](length);
+    for (uint256 i = 0; i < length; i++) {
+      address vault = vaultSet.at(i);
+      list[i] = _vaultInfo(packedProductionVaultInfoByVault[vault], productionMetadataByVault[vault]);
+    }
+    return list;
+  }
+
+  /** Author index */
+
+  /// @dev Lists the vault under its author, and the author as one of the vault's
+  function _indexAuthorVault(address author, address vault) private {
+    vaultsByAuthor[author].add(vault);
+    authorsByVault[vault].add(author);
+    authors.add(author);
+  }
+
+  /// @dev Reverts _indexAuthorVault, dropping the author once they have no vault left
+  function _unindexAuthorVault(address author, address vault) private {
+    EnumerableSet.AddressSet storage authorVaults = vaultsByAuthor[author];
+    authorVaults.remove(vault);
+    authorsByVault[vault].remove(author);
+    if (authorVaults.length() == 0) {
+      authors.remove(author);
+    }
+  }
+
+  /// @dev Get the number of authors with at least one vault
+  function authorsCount() public view returns (uint256) {
+    return authors.length();
+  }
 
-    require(productionVaultInfoByVault[vault].vault != address(0), "BadgerRegistry: Vault does not exist");
+  /// @dev Retrieve every author with at least one vault
+  function getAuthors() public view returns (address[] memory) {
+    return authors.values();
+  }
+
+  /// @dev Retrieve at most `limit` authors, starting at `offset`
+  function getAuthorsPage(uint256 offset, uint256 limit) public view returns (address[] memory) {
+    return _addressSetPage(authors, offset, limit);
+  }
+
+  /// @dev Retrieve every author that added the given vault
+  function getVaultAuthors(address vault) public view returns (address[] memory) {
+    return authorsByVault[vault].values();
+  }
+
+  /// @dev Retrieve a list of all Vaults from the given author, whatever their version
+  function getAuthorVaults(address author) public view returns (VaultInfo[] memory) {
+    return getAuthorVaultsPage(author, 0, type(uint256).max);
+  }
+
+  /// @dev Retrieve at most `limit` Vaults from the given author, whatever their version, starting at `offset`
+  function getAuthorVaultsPage(
+    address author,
+    uint256 offset,
+    uint256 limit
+  ) public view returns (VaultInfo[] memory) {
+    EnumerableSet.AddressSet storage vaultSet = vaultsByAuthor[author];
+    uint256 length = _pageLength(vaultSet.length(), offset, limit);
 
-    productionVaultInfoByVault[vault].metadata = metadata;
+    VaultInfo[] memory list = new VaultInfo[](length);
+    for (uint256 i = 0; i < length; i++) {
+      address vault = vaultSet.at(offset + i);
+      list[i] = _vaultInfo(packedVaultInfoByAuthorAndVault[author][vault], metadataByAuthorAndVault[author][vault]);
+    }
+    return list;
+  }
+
+  /// @dev Addresses of `addressSet` in a page of at most `limit` items starting at `offset`
+  function _addressSetPage(
+    EnumerableSet.AddressSet storage addressSet,
+    uint256 offset,
+    uint256 limit
+  ) private view returns (address[] memory list) {
+    uint256 length = _pageLength(addressSet.length(), offset, limit);
+    list = new address[](length);
+    for (uint256 i = 0; i < length; i++) {
+      list[i] = addressSet.at(offset + i);
+    }
   }
 
   /** KEY Management */
@@ -256,10 +760,16 @@ contract BadgerRegistry {
   //@notice e.g. controller = 0x123123
   function set(string memory key, address at) public {
     require(msg.sender == governance, "!gov");
+    _set(key, at);
+  }
+
+  function _set(string memory key, address at) private {
     _addKey(key);
     addresses[key] = at;
     keyByAddress[at] = key;
+    keysRevision++;
     emit Set(key, at);
+    _recordChange(abi.encode(Change.set, key, at));
   }
 
   /// @dev Delete a key
@@ -272,16 +782,24 @@ contract BadgerRegistry {
     address at = addresses[key];
     delete keyByAddress[at];
 
-    for (uint256 x = 0; x < keys.length; x++) {
-      // Compare strings via their hash because solidity
-      if (keccak256(bytes(key)) == keccak256(bytes(keys[x]))) {
-        delete addresses[key];
-        keys[x] = keys[keys.length - 1];
-        keys.pop();
-        emit DeleteKey(key);
-        return;
-      }
+    uint256 index = keyIndexes[key];
+    if (index == 0) {
+      return;
     }
+    delete addresses[key];
+
+    // Move the last key in the freed position, so removal doesn't depend on the amount of keys
+    uint256 lastIndex = keys.length;
+    if (index != lastIndex) {
+      string memory lastKey = keys[lastIndex - 1];
+      keys[index - 1] = lastKey;
+      keyIndexes[lastKey] = index;
+    }
+    keys.pop();
+    delete keyIndexes[key];
+    keysRevision++;
+    emit DeleteKey(key);
+    _recordChange(abi.encode(Change.deleteKey, key));
   }
 
   /// @dev Delete keys
@@ -304,31 +822,154 @@ contract BadgerRegistry {
     return keys.length;
   }
 
+  /// @dev Retrieve every listed key
+  function getAllKeys() public view returns (string[] memory) {
+    return keys;
+  }
+
+  /// @dev Retrieve every listed version
+  function getAllVersions() public view returns (string[] memory) {
+    return versions;
+  }
+
+  /// @dev Retrieve every listed key with its value, in the order of `keys`
+  function getAllKeyValues() public view returns (string[] memory, address[] memory) {
+    return (keys, getMany(keys));
+  }
+
+  /// @dev Retrieve the value of each of the given keys
+  function getMany(string[] memory _keys) public view returns (address[] memory) {
+    uint256 length = _keys.length;
+    address[] memory values = new address[](length);
+    for (uint256 x = 0; x < length; ++x) {
+      values[x] = addresses[_keys[x]];
+    }
+    return values;
+  }
+
   /// @dev Add a key to the list of keys
   //@notice This is used to make it easier to discover keys,
   //@notice however you have no guarantee that all keys will be in the list
   function _addKey(string memory key) internal {
     //If we find the key, skip
-    for (uint256 x = 0; x < keys.length; x++) {
-      // Compare strings via their hash because solidity
-      if (keccak256(bytes(key)) == keccak256(bytes(keys[x]))) {
-        return;
-      }
+    if (keyIndexes[key] != 0) {
+      return;
     }
 
     // Else let's add it and emit the event
     keys.push(key);
+    keyIndexes[key] = keys.length;
 
     emit AddKey(key);
   }
 
+  /// @dev Index keys listed before the key index existed, in `keys[start:end]`
+  //@notice Must be run over all the keys right after upgrading from a registry without the index,
+  //@notice e.g. through `upgradeToAndCall`, as `set` would otherwise list unindexed keys twice.
+  //@notice Anyone can call it, it only writes positions already in storage and can be re-run safely
+  function indexKeys(uint256 start, uint256 end) public {
+    uint256 length = keys.length;
+    if (end > length) {
+      end = length;
+    }
+    for (uint256 x = start; x < end; ++x) {
+      keyIndexes[keys[x]] = x + 1;
+    }
+  }
+
+  /** Batch Management */
+  //@notice Batches apply the same rules and emit the same events as their single item counterparts,
+  //@notice if any item reverts the whole batch is reverted
+
+  /// @dev Batched add, vaults are indexed under the msg.sender key
+  function addMany(
+    address[] memory _vaults,
+    string[] memory _versions,
+    string[] memory _metadata
+  ) external {
+    uint256 length = _vaults.length;
+    require(_versions.length == length && _metadata.length == length, "BadgerRegistry: length mismatch");
+    for (uint256 x = 0; x < length; ++x) {
+      _add(_vaults[x], _versions[x], _metadata[x]);
+    }
+  }
+
+  /// @dev Batched promote
+  function promoteMany(
+    address[] memory _vaults,
+    string[] memory _versions,
+    string[] memory _metadata,
+    VaultStatus[] memory _statuses
+  ) external {
+    require(msg.sender == governance || msg.sender == strategistGuild || msg.sender == developer, "!auth");
+    uint256 length = _vaults.length;
+    require(
+      _versions.length == length && _metadata.length == length && _statuses.length == length,
+      "BadgerRegistry: length mismatch"
+    );
+    for (uint256 x = 0; x < length; ++x) {
+      _promote(_vaults[x], _versions[x], _metadata[x], _statuses[x]);
+    }
+  }
+
+  /// @dev Batched demote
+  function demoteMany(address[] memory _vaults, VaultStatus[] memory _statuses) external {
+    require(msg.sender == governance || msg.sender == strategistGuild || msg.sender == developer, "!auth");
+    uint256 length = _vaults.length;
+    require(_statuses.length == length, "BadgerRegistry: length mismatch");
+    for (uint256 x = 0; x < length; ++x) {
+      _demote(_vaults[x], _statuses[x]);
+    }
+  }
+
+  /// @dev Batched purge
+  function purgeMany(address[] memory _vaults) external {
+    require(msg.sender == governance || msg.sender == strategistGuild, "!auth");
+    uint256 length = _vaults.length;
+    for (uint256 x = 0; x < length; ++x) {
+      _purge(_vaults[x]);
+    }
+  }
+
+  /// @dev Batched updateMetadata
+  function updateMetadataMany(address[] memory _vaults, string[] memory _metadata) external {
+    require(msg.sender == governance || msg.sender == strategistGuild, "!auth");
+    uint256 length = _vaults.length;
+    require(_metadata.length == length, "BadgerRegistry: length mismatch");
+    for (uint256 x = 0; x < length; ++x) {
+      _updateMetadata(_vaults[x], _metadata[x]);
+    }
+  }
+
+  /// @dev Batched set
+  function setMany(string[] memory _keys, address[] memory _addresses) external {
+    require(msg.sender == governance, "!gov");
+    uint256 length = _keys.length;
+    require(_addresses.length == length, "BadgerRegistry: length mismatch");
+    for (uint256 x = 0; x < length; ++x) {
+      _set(_keys[x], _addresses[x]);
+    }
+  }
+
   /// @dev Retrieve a list of all Vaults from the given author and version
   function getVaults(string memory version, address author) public view returns (VaultInfo[] memory) {
-    uint256 length = vaults[author][version].length();
+    return getVaultsPage(version, author, 0, type(uint256).max);
+  }
+
+  /// @dev Retrieve at most `limit` Vaults from the given author and version, starting at `offset`
+  function getVaultsPage(
+    string memory version,
+    address author,
+    uint256 offset,
+    uint256 limit
+  ) public view returns (VaultInfo[] memory) {
+    EnumerableSet.AddressSet storage vaultSet = vaults[author][versionIds[version]];
+    uint256 length = _pageLength(vaultSet.length(), offset, limit);
 
     VaultInfo[] memory list = new VaultInfo[](length);
     for (uint256 i = 0; i < length; i++) {
-      list[i] = vaultInfoByAuthorAndVault[author][vaults[author][version].at(i)];
+      address vault = vaultSet.at(offset + i);
+      list[i] = _vaultInfo(packedVaultInfoByAuthorAndVault[author][vault], metadataByAuthorAndVault[author][vault]);
     }
     return list;
   }
@@ -339,11 +980,23 @@ contract BadgerRegistry {
     view
     returns (VaultInfo[] memory)
   {
-    uint256 length = productionVaults[version][status].length();
+    return getFilteredProductionVaultsPage(version, status, 0, type(uint256).max);
+  }
+
+  /// @dev Retrieve at most `limit` production Vaults of the given Version and Status, starting at `offset`
+  function getFilteredProductionVaultsPage(
+    string memory version,
+    VaultStatus status,
+    uint256 offset,
+    uint256 limit
+  ) public view returns (VaultInfo[] memory) {
+    EnumerableSet.AddressSet storage vaultSet = productionVaults[versionIds[version]][status];
+    uint256 length = _pageLength(vaultSet.length(), offset, limit);
 
     VaultInfo[] memory list = new VaultInfo[](length);
     for (uint256 i = 0; i < length; i++) {
-      list[i] = productionVaultInfoByVault[productionVaults[version][status].at(i)];
+      address vault = vaultSet.at(offset + i);
+      list[i] = _vaultInfo(packedProductionVaultInfoByVault[vault], productionMetadataByVault[vault]);
     }
     return list;
   }
@@ -355,12 +1008,14 @@ contract BadgerRegistry {
     VaultData[] memory data = new VaultData[](versionsCount * VAULT_STATUS_LENGTH);
 
     for (uint256 x = 0; x < versionsCount; x++) {
+      uint256 versionId = versionIds[versions[x]];
       for (uint256 y = 0; y < VAULT_STATUS_LENGTH; y++) {
-        uint256 length = productionVaults[versions[x]][VaultStatus(y)].length();
+        EnumerableSet.AddressSet storage vaultSet = productionVaults[versionId][VaultStatus(y)];
+        uint256 length = vaultSet.length();
         VaultMetadata[] memory list = new VaultMetadata[](length);
         for (uint256 z = 0; z < length; z++) {
-          VaultInfo storage vaultInfo = productionVaultInfoByVault[productionVaults[versions[x]][VaultStatus(y)].at(z)];
-          list[z] = VaultMetadata({vault: vaultInfo.vault, metadata: vaultInfo.metadata});
+          address vault = vaultSet.at(z);
+          list[z] = VaultMetadata({vault: vault, metadata: productionMetadataByVault[vault]});
         }
         data[x * VAULT_STATUS_LENGTH + y] = VaultData({version: versions[x], status: VaultStatus(y), list: list});
       }
@@ -369,13 +1024,150 @@ contract BadgerRegistry {
     return data;
   }
 
+  /// @dev Paginated version of getProductionVaults
+  /// @notice Vaults are numbered in the same order getProductionVaults lists them, the page holds
+  /// @notice at most `limit` vaults starting at `offset`, grouped in the (non empty) buckets they belong to
+  /// @return data the buckets spanned by the page
+  /// @return total the number of production vaults across all buckets
+  function getProductionVaultsPage(uint256 offset, uint256 limit)
+    public
+    view
+    returns (VaultData[] memory data, uint256 total)
+  {
+    uint256 bucketsCount = versions.length * VAULT_STATUS_LENGTH;
+
+    uint256[] memory lengths = new uint256[](bucketsCount);
+    for (uint256 i = 0; i < bucketsCount; i++) {
+      uint256 versionId = versionIds[versions[i / VAULT_STATUS_LENGTH]];
+      lengths[i] = productionVaults[versionId][VaultStatus(i % VAULT_STATUS_LENGTH)].length();
+      total += lengths[i];
+    }
+    uint256 pageEnd = offset + _pageLength(total, offset, limit);
+
+    // Count the non empty buckets overlapping the page, so we can size the result
+    uint256 count;
+    uint256 bucketStart;
+    for (uint256 i = 0; i < bucketsCount; i++) {
+      uint256 bucketEnd = bucketStart + lengths[i];
+      if (lengths[i] > 0 && bucketEnd > offset && bucketStart < pageEnd) {
+        count++;
+      }
+      bucketStart = bucketEnd;
+    }
+
+    data = new VaultData[](count);
+    count = 0;
+    bucketStart = 0;
+    for (uint256 i = 0; i < bucketsCount && bucketStart < pageEnd; i++) {
+      uint256 bucketEnd = bucketStart + lengths[i];
+      if (lengths[i] > 0 && bucketEnd > offset) {
+        data[count++] = _productionBucketSlice(
+          i,
+          offset > bucketStart ? offset - bucketStart : 0,
+          (pageEnd < bucketEnd ? pageEnd : bucketEnd) - bucketStart
+        );
+      }
+      bucketStart = bucketEnd;
+    }
+  }
+
+  /// @dev Vaults `start` (inclusive) to `end` (exclusive) of the bucket at index `bucket` of getProductionVaults
+  function _productionBucketSlice(
+    uint256 bucket,
+    uint256 start,
+    uint256 end
+  ) private view returns (VaultData memory) {
+    string storage version = versions[bucket / VAULT_STATUS_LENGTH];
+    VaultStatus status = VaultStatus(bucket % VAULT_STATUS_LENGTH);
+    EnumerableSet.AddressSet storage vaultSet = productionVaults[versionIds[version]][status];
+
+    VaultMetadata[] memory list = new VaultMetadata[](end - start);
+    for (uint256 z = start; z < end; z++) {
+      address vault = vaultSet.at(z);
+      list[z - start] = VaultMetadata({vault: vault, metadata: productionMetadataByVault[vault]});
+    }
+    return VaultData({version: version, status: status, list: list});
+  }
+
+  /// @dev Retrieve, in one flat list, the production Vaults of the given versions whose status is in `statusMask`
+  /// @notice Bit `1 << status` of the mask selects a VaultStatus, e.g. 0x0c for guarded and open vaults.
+  /// @notice An empty list of versions means every listed version. Vaults are in getProductionVaults order,
+  /// @notice and only the selected buckets are read, so the cost scales with the vaults returned
+  function getProductionVaultsByStatus(uint8 statusMask, string[] memory _versions)
+    public
+    view
+    returns (VaultInfo[] memory list)
+  {
+    if (_versions.length == 0) {
+      _versions = versions;
+    }
+    uint256 bucketsCount = _versions.length * VAULT_STATUS_LENGTH;
+
+    uint256 length;
+    for (uint256 i = 0; i < bucketsCount; i++) {
+      if (((statusMask >> (i % VAULT_STATUS_LENGTH)) & 1) == 1) {
+        length += productionVaults[versionIds[_versions[i / VAULT_STATUS_LENGTH]]][
+          VaultStatus(i % VAULT_STATUS_LENGTH)
+        ].length();
+      }
+    }
+
+    list = new VaultInfo[](length);
+    uint256 count;
+    for (uint256 i = 0; i < bucketsCount; i++) {
+      if (((statusMask >> (i % VAULT_STATUS_LENGTH)) & 1) == 1) {
+        count = _copyProductionBucket(
+          list,
+          count,
+          _versions[i / VAULT_STATUS_LENGTH],
+          VaultStatus(i % VAULT_STATUS_LENGTH)
+        );
+      }
+    }
+  }
+
+  /// @dev Writes the VaultInfo of the production vaults of `version` and `status` in `list` from `start`,
+  /// returns the position following the last one written
+  function _copyProductionBucket(
+    VaultInfo[] memory list,
+    uint256 start,
+    string memory version,
+    VaultStatus status
+  ) private view returns (uint256) {
+    EnumerableSet.AddressSet storage vaultSet = productionVaults[versionIds[version]][status];
+    uint256 length = vaultSet.length();
+    for (uint256 z = 0; z < length; z++) {
+      address vault = vaultSet.at(z);
+      list[start + z] = VaultInfo({
+        vault: vault,
+        version: version,
+        status: status,
+        metadata: productionMetadataByVault[vault]
+      });
+    }
+    return start + length;
+  }
+
+  /// @dev Number of items in a page of at most `limit` items starting at `offset`
+  function _pageLength(
+    uint256 total,
+    uint256 offset,
+    uint256 limit
+  ) private pure returns (uint256) {
+    if (offset >= total) {
+      return 0;
+    }
+    uint256 remaining = total - offset;
+    return limit < remaining ? limit : remaining;
+  }
+
   /// @notice Metadata is used for offchain naming and information display of vaults
   /// @dev Metadata expected format: name=MyVault,protocol=Badger,behavior=DCA
-  function verifyMetadata(string memory metadata) private pure {
+  /// @return protocolIndex position of the "=" following "protocol"
+  /// @return behaviorIndex position of the "=" following "behavior"
+  function verifyMetadata(string memory metadata) private pure returns (uint256 protocolIndex, uint256 behaviorIndex) {
     bytes memory metadataBytes = bytes(metadata);
     uint256 nameIndex;
-    uint256 protocolIndex;
-    uint256 behaviorIndex;
     for (uint256 i = 0; i < metadataBytes.length; i++) {
       if (metadataBytes[i] == 0x3d) {
         // "="
@@ -393,27 +1185,59 @@ contract BadgerRegistry {
     require(protocolIndex > 0, "BadgerRegistry: Invalid Protocol");
     require(behaviorIndex > 0, "BadgerRegistry: Invalid Behavior");
     // offsets on indices are to backtrack to start of expected delimiter
-    require(keccak256(getSlice(metadataBytes, 0, nameIndex - 1)) == keccak256("name"), "BadgerRegistry: Invalid Name");
+    require(nameIndex == 4 && _matchesAt(metadataBytes, 0, "name", 4), "BadgerRegistry: Invalid Name");
     require(
-      keccak256(getSlice(metadataBytes, protocolIndex - 8, protocolIndex - 1)) == keccak256("protocol"),
+      protocolIndex >= 8 && _matchesAt(metadataBytes, protocolIndex - 8, "protocol", 8),
       "BadgerRegistry: Invalid Protocol"
     );
-    require(
-      keccak256(getSlice(metadataBytes, behaviorIndex - 8, behaviorIndex - 1)) == keccak256("behavior"),
-      "BadgerRegistry: Invalid Behavior"
-    );
+    require(_matchesAt(metadataBytes, behaviorIndex - 8, "behavior", 8), "BadgerRegistry: Invalid Behavior");
   }
 
-  // https://ethereum.stackexchange.com/questions/78559/how-can-i-slice-bytes-strings-and-arrays-in-solidity
-  function getSlice(
+  /// @dev Hashes of the protocol and behavior values of metadata already verified, hashed in place
+  //@notice The protocol runs up to "behavior", without the "," separating them if any,
+  //@notice and the behavior up to the next "," or the end of the metadata
+  function _metadataHashes(
+    bytes memory metadataBytes,
+    uint256 protocolIndex,
+    uint256 behaviorIndex
+  ) private pure returns (bytes32 protocolHash, bytes32 behaviorHash) {
+
+    uint256 protocolEnd = behaviorIndex - 8;
+    if (protocolEnd > protocolIndex + 1 && metadataBytes[protocolEnd - 1] == 0x2c) {
+      // ","
+      protocolEnd--;
+    }
+    uint256 behaviorEnd = behaviorIndex + 1;
+    while (behaviorEnd < metadataBytes.length && metadataBytes[behaviorEnd] != 0x2c) {
+      behaviorEnd++;
+    }
+
+    protocolHash = _hashRange(metadataBytes, protocolIndex + 1, protocolEnd);
+    behaviorHash = _hashRange(metadataBytes, behaviorIndex + 1, behaviorEnd);
+  }
+
+  /// @dev keccak256 of `text[begin:end]`, without copying it
+  function _hashRange(
     bytes memory text,
     uint256 begin,
     uint256 end
-  ) private pure returns (bytes memory) {
-    bytes memory a = new bytes(end - begin + 1);
-    for (uint256 i = begin; i <= end; i++) {
-      a[i - begin] = text[i];
+  ) private pure returns (bytes32 hash) {
+    assembly {
+      hash := keccak256(add(add(text, 32), begin), sub(end, begin))
+    }
+  }
+
+  /// @dev Whether `text[begin:begin + length]` equals the first `length` bytes of `word`, compared in place
+  //@notice Reads a full word from `begin`, which may run past the end of `text`, only the first `length` bytes count
+  function _matchesAt(
+    bytes memory text,
+    uint256 begin,
+    bytes32 word,
+    uint256 length
+  ) private pure returns (bool matches) {
+    assembly {
+      let shift := sub(256, mul(length, 8))
+      matches := eq(shr(shift, mload(add(add(text, 32), begin))), shr(shift, word))
     }
-    return a;
   }
 }
@@ -0,0 +1,20 @@
+"""
+    Load the registry keys in one call instead of probing `keys(uint)` one index at a time
+"""
+
+
+def load_address_book(registry, block_identifier=None) -> dict:
+    """
+    Every listed key and its address, read with a single eth_call
+    """
+    keys, values = registry.getAllKeyValues.call(block_identifier=block_identifier)
+    return dict(zip(keys, values))
+
+
+def resolve_keys(registry, keys, block_identifier=None) -> dict:
+    """
+    Addresses of the given keys, listed or not, read with a single eth_call
+    """
+    keys = list(keys)
+    values = registry.getMany.call(keys, block_identifier=block_identifier)
+    return dict(zip(keys, values))
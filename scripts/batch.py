@@ -0,0 +1,49 @@
+"""
+    Send registry batch calls (addMany, promoteMany, demoteMany, purgeMany, setMany)
+    split in chunks that fit under the block gas limit
+
+    Each chunk is all or nothing on chain, a batch split in several chunks is not. Chunks are
+    estimated one at a time against the state the previous chunks left, so later items may
+    depend on earlier ones.
+"""
+from brownie import web3
+
+## Share of the block gas limit a single chunk may use
+DEFAULT_GAS_FRACTION = 0.8
+
+
+def chunk_batch(method, items, sender, gas_limit: int = None):
+    """
+    Yield consecutive chunks of `items` whose `method` call is estimated under `gas_limit`
+
+    `items` is a list of argument tuples, one per vault or key, e.g. [(vault, status), ...] for demoteMany.
+    A chunk is only estimated once the previous one is consumed, send it before asking for the next
+    """
+    if gas_limit is None:
+        gas_limit = int(web3.eth.get_block("latest").gasLimit * DEFAULT_GAS_FRACTION)
+
+    remaining = list(items)
+    while remaining:
+        # Halve the head of the remaining items until it fits, a single item is sent as is
+        chunk = remaining
+        while len(chunk) > 1 and method.estimate_gas(*columns(chunk), {"from": sender}) > gas_limit:
+            chunk = chunk[: len(chunk) // 2]
+        yield chunk
+        remaining = remaining[len(chunk) :]
+
+
+def send_batch(method, items, sender, gas_limit: int = None):
+    """
+    Send `items` through `method` in as many transactions as the gas limit requires
+    """
+    txs = []
+    for chunk in chunk_batch(method, items, sender, gas_limit):
+        txs.append(method(*columns(chunk), {"from": sender}))
+    return txs
+
+
+def columns(chunk):
+    """
+    [(vault, status), ...] -> [[vault, ...], [status, ...]], the argument layout of the batch calls
+    """
+    return [list(column) for column in zip(*chunk)]
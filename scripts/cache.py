@@ -0,0 +1,180 @@
+"""
+    Read-through cache of registry views, invalidated by the registry events
+
+    Every entry is read at the block of the last `refresh`, and `refresh` drops exactly the
+    entries the events mined since then could have changed, so cached values are never stale
+    relative to that block. Concurrent misses on the same entry share a single RPC call.
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from brownie import web3
+
+from scripts.helpers.registry_events import decode_log, registry_events
+
+DEFAULT_MAX_ENTRIES = 1024
+
+## Entry kinds
+GET = "get"
+FILTERED_PRODUCTION_VAULTS = "getFilteredProductionVaults"
+PRODUCTION_VAULTS = "getProductionVaults"
+
+
+class RegistryCache:
+    """
+    Views of `registry` as of one block, a snapshot until `refresh` moves it to the latest block
+
+    With `max_age` (seconds) a read first refreshes the cache when the last refresh is older than
+    that, so reads lag the chain by at most `max_age` plus one refresh. Without it the cache never
+    moves on its own and `refresh` has to be called, e.g. once per block or request.
+    """
+
+    def __init__(self, registry, max_entries: int = DEFAULT_MAX_ENTRIES, max_age: float = None):
+        self.registry = registry
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.events = registry_events(registry)
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._block = web3.eth.block_number
+        self._refreshed_at = time.monotonic()
+
+    @property
+    def block(self) -> int:
+        """
+        Block the cached values are read at
+        """
+        return self._block
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+        }
+
+    ## Cached views
+
+    def get(self, key: str) -> str:
+        return self._cached((GET, key), lambda block: self.registry.get.call(key, block_identifier=block))
+
+    def get_filtered_production_vaults(self, version: str, status: int):
+        return self._cached(
+            (FILTERED_PRODUCTION_VAULTS, version, int(status)),
+            lambda block: self.registry.getFilteredProductionVaults.call(version, status, block_identifier=block),
+        )
+
+    def get_production_vaults(self):
+        return self._cached(
+            (PRODUCTION_VAULTS,),
+            lambda block: self.registry.getProductionVaults.call(block_identifier=block),
+        )
+
+    ## Invalidation
+
+    def refresh(self) -> int:
+        """
+        Move to the latest block, dropping the entries changed by the events mined since the previous one
+        """
+        self._refreshed_at = time.monotonic()
+        head = web3.eth.block_number
+        if head <= self._block:
+            return self._block
+
+        logs = web3.eth.get_logs({"address": self.registry.address, "fromBlock": self._block + 1, "toBlock": head})
+        stale = set()
+        for log in logs:
+            decoded = decode_log(self.events, log)
+            if decoded is not None:
+                stale.update(self._stale_entries(*decoded))
+
+        with self._lock:
+            for entry in list(self._entries):
+                if entry in stale or (entry[0] == FILTERED_PRODUCTION_VAULTS and entry[:2] in stale):
+                    del self._entries[entry]
+                    self.invalidations += 1
+            self._block = head
+        return head
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _stale_entries(self, name, args):
+        """
+        Entries an event may have changed, a (kind, version) pair stands for every status of that version
+        """
+        if name in ("Set", "DeleteKey"):
+            return [(GET, args["key"])]
+        if name in ("PromoteVault", "DemoteVault", "PurgeVault", "UpdateVaultMetadata"):
+            return [(FILTERED_PRODUCTION_VAULTS, args["version"]), (PRODUCTION_VAULTS,)]
+        if name == "AddVersion":
+            return [(PRODUCTION_VAULTS,)]
+        return []
+
+    def _refresh_if_old(self):
+        """
+        Refresh when the last refresh is older than `max_age`, unless another thread is already doing it
+        """
+        if self.max_age is None or time.monotonic() - self._refreshed_at < self.max_age:
+            return
+        if self._refresh_lock.acquire(blocking=False):
+            try:
+                self.refresh()
+            finally:
+                self._refresh_lock.release()
+
+    ## Read-through with request coalescing
+
+    def _cached(self, entry, fetch):
+        self._refresh_if_old()
+        with self._lock:
+            if entry in self._entries:
+                self._entries.move_to_end(entry)
+                self.hits += 1
+                return self._entries[entry]
+
+            future = self._inflight.get(entry)
+            leader = future is None
+            if leader:
+                future = self._inflight[entry] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+            block = self._block
+
+        if not leader:
+            return future.result()
+
+        try:
+            value = fetch(block)
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[entry]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._inflight[entry]
+            # A refresh while we were reading may have dropped this entry, so only cache it if none happened
+            if block == self._block:
+                self._entries[entry] = value
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        future.set_result(value)
+        return value
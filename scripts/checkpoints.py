@@ -0,0 +1,254 @@
+"""
+    Production vaults and keys of the registry as of any past block, without an archive node
+
+    The registry events are replayed from the deploy block (full nodes keep every log, only the
+    state of old blocks needs an archive node). Every `interval` blocks the whole state is saved
+    as a compressed checkpoint, and the vault and key events in between are saved as deltas.
+    `state_at(block)` loads the checkpoint right before `block` and replays at most `interval`
+    blocks of deltas, without any RPC call.
+
+    `start_block` is the first block replayed, the deploy block or any block before it: nothing
+    is read before it, legacy v0.2.1 events included. v0.2.1 emitted nothing on metadata updates,
+    so vaults updated before the upgrade keep the metadata they were promoted with until their
+    next update. `start_block="head"` instead seeds the first checkpoint with the registry views
+    at the confirmed head, which any node serves, and only answers for blocks after it.
+"""
+import json
+import sqlite3
+import zlib
+
+from brownie import web3
+
+from scripts.helpers.registry_events import decode_log, registry_events
+from scripts.helpers.registry_state import read_state
+
+DEFAULT_INTERVAL = 10000
+DEFAULT_CONFIRMATIONS = 12
+DEFAULT_BATCH_SIZE = 2000
+
+## Event name => arguments saved in its delta, the events changing production vaults or keys
+DELTA_FIELDS = {
+    "PromoteVault": ("vault", "version", "status", "metadata"),
+    "DemoteVault": ("vault", "status"),
+    "PurgeVault": ("vault",),
+    "UpdateVaultMetadata": ("vault", "metadata"),
+    "Set": ("key", "at"),
+    "DeleteKey": ("key",),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS checkpoints (block INTEGER PRIMARY KEY, state BLOB);
+CREATE TABLE IF NOT EXISTS deltas (
+    block INTEGER, log_index INTEGER, event TEXT, args TEXT,
+    PRIMARY KEY (block, log_index)
+);
+"""
+
+
+def empty_state() -> dict:
+    """
+    {"productionVaults": {vault: [version, status, metadata]}, "keys": {key: address}}
+    """
+    return {"productionVaults": {}, "keys": {}}
+
+
+def initial_state(registry, block: int) -> dict:
+    """
+    State of the registry at the end of `block`, read from its views
+
+    Raises ValueError when the node doesn't serve the state of `block` or the registry doesn't have the views yet
+    """
+    try:
+        state = read_state(registry, block_identifier=block)
+    except Exception as e:
+        raise ValueError(
+            f"Can't read the registry state at block {block}: {e}. "
+            "Start from the deploy block instead, its logs are replayed without any historical state"
+        ) from e
+    return {
+        "productionVaults": {vault: list(info) for vault, info in state["productionVaults"].items()},
+        "keys": state["keys"],
+    }
+
+
+def apply_delta(state: dict, event: str, args: dict):
+    """
+    Apply the change of one registry event to `state`, in place
+    """
+    vaults, keys = state["productionVaults"], state["keys"]
+    if event == "PromoteVault":
+        if args["vault"] in vaults:
+            # Promoting an existing vault only moves its status, metadata is kept
+            vaults[args["vault"]][1] = args["status"]
+        else:
+            vaults[args["vault"]] = [args["version"], args["status"], args["metadata"]]
+    elif event == "DemoteVault":
+        vaults[args["vault"]][1] = args["status"]
+    elif event == "PurgeVault":
+        vaults.pop(args["vault"], None)
+    elif event == "UpdateVaultMetadata":
+        vaults[args["vault"]][2] = args["metadata"]
+    elif event == "Set":
+        keys[args["key"]] = args["at"]
+    elif event == "DeleteKey":
+        keys.pop(args["key"], None)
+
+
+class RegistryCheckpoints:
+    def __init__(
+        self,
+        registry,
+        db_path=":memory:",
+        start_block=0,
+        interval=DEFAULT_INTERVAL,
+        confirmations=DEFAULT_CONFIRMATIONS,
+        batch_size=DEFAULT_BATCH_SIZE,
+    ):
+        self.address = registry.address
+        self.interval = interval
+        self.confirmations = confirmations
+        self.batch_size = batch_size
+        self.events = registry_events(registry)
+
+        self.db = sqlite3.connect(db_path)
+        with self.db:
+            self.db.executescript(SCHEMA)
+            registry_address = self._meta("registry")
+            if registry_address is None:
+                if start_block == "head":
+                    start_block = web3.eth.block_number - confirmations + 1
+                    state = initial_state(registry, start_block - 1)
+                else:
+                    state = empty_state()
+                self._set_meta("registry", self.address)
+                self._set_meta("cursor", start_block - 1)
+                # Any query finds a checkpoint to start from, holding what happened before the start block
+                self._save_checkpoint(start_block - 1, state)
+            elif registry_address != self.address:
+                raise ValueError(f"Database checkpoints another registry [{registry_address}]")
+
+        self._checkpoint_block, self._state = self._load(self.cursor)
+
+    @property
+    def cursor(self) -> int:
+        """
+        Last block whose deltas are saved, queries can't go past it
+        """
+        return int(self._meta("cursor"))
+
+    def sync(self) -> int:
+        """
+        Save the deltas of every confirmed block since the cursor, and a checkpoint every `interval` blocks
+        """
+        target = web3.eth.block_number - self.confirmations
+        while self.cursor < target:
+            from_block = self.cursor + 1
+            # Batches end on checkpoint blocks, so checkpoints are exactly `interval` blocks apart
+            next_checkpoint = self._checkpoint_block + self.interval
+            to_block = min(target, from_block + self.batch_size - 1, next_checkpoint)
+            logs = web3.eth.get_logs({"address": self.address, "fromBlock": from_block, "toBlock": to_block})
+
+            with self.db:
+                for log in logs:
+                    self._apply(log)
+                if to_block == next_checkpoint:
+                    self._save_checkpoint(to_block, self._state)
+                    self._checkpoint_block = to_block
+                self._set_meta("cursor", to_block)
+
+        return self.cursor
+
+    def state_at(self, block: int) -> dict:
+        """
+        Production vaults ({vault: (version, status, metadata)}) and keys ({key: address}) at the end of `block`
+        """
+        if block > self.cursor:
+            raise ValueError(f"Block {block} is past the last synced block {self.cursor}")
+        (first_block,) = self.db.execute("SELECT MIN(block) FROM checkpoints").fetchone()
+        if block < first_block:
+            raise ValueError(f"Block {block} is before the first checkpoint {first_block}")
+        _, state = self._load(block)
+        return {
+            "block": block,
+            "productionVaults": {vault: tuple(info) for vault, info in state["productionVaults"].items()},
+            "keys": state["keys"],
+        }
+
+    def production_vaults(self, block: int, version: str = None, status: int = None) -> list:
+        """
+        Sorted (vault, version, status, metadata) of the production vaults at `block`, optionally filtered
+        """
+        vaults = self.state_at(block)["productionVaults"]
+        return sorted(
+            (vault, *info)
+            for vault, info in vaults.items()
+            if (version is None or info[0] == version) and (status is None or info[1] == status)
+        )
+
+    def _apply(self, log):
+        decoded = decode_log(self.events, log)
+        if decoded is None or decoded[0] not in DELTA_FIELDS:
+            return
+        event, args = decoded
+        delta = {field: args[field] for field in DELTA_FIELDS[event]}
+        apply_delta(self._state, event, delta)
+        self.db.execute(
+            "INSERT OR REPLACE INTO deltas VALUES (?, ?, ?, ?)",
+            (log["blockNumber"], log["logIndex"], event, json.dumps(delta)),
+        )
+
+    def _load(self, block: int):
+        """
+        (checkpoint block, state at the end of `block`) from the nearest checkpoint and the deltas since
+        """
+        checkpoint_block, blob = self.db.execute(
+            "SELECT block, state FROM checkpoints WHERE block <= ? ORDER BY block DESC LIMIT 1", (block,)
+        ).fetchone()
+        state = json.loads(zlib.decompress(blob))
+        deltas = self.db.execute(
+            "SELECT event, args FROM deltas WHERE block > ? AND block <= ? ORDER BY block, log_index",
+            (checkpoint_block, block),
+        )
+        for event, args in deltas:
+            apply_delta(state, event, json.loads(args))
+        return checkpoint_block, state
+
+    def _save_checkpoint(self, block: int, state: dict):
+        blob = zlib.compress(json.dumps(state, separators=(",", ":")).encode())
+        self.db.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?)", (block, blob))
+
+    def _meta(self, name):
+        row = self.db.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return None if row is None else row[0]
+
+    def _set_meta(self, name, value):
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (name, str(value)))
+
+
+def main(address, db_path="checkpoints.db", start_block=0):
+    """
+    Bring the checkpoints of the registry at `address` up to date, one database per network
+
+    `start_block` is the deploy block, or "head" to seed from the current state without replaying the history
+    """
+    from brownie import BadgerRegistry
+
+    start_block = start_block if start_block == "head" else int(start_block)
+    checkpoints = RegistryCheckpoints(BadgerRegistry.at(address), db_path=db_path, start_block=start_block)
+    cursor = checkpoints.sync()
+    print(f"Registry [{address}] checkpointed up to block {cursor}")
+    return checkpoints
+
+
+def show(address, block, status=None, db_path="checkpoints.db"):
+    """
+    Print the production vaults at `block`, e.g. `brownie run checkpoints show <address> <block> 3` for open vaults
+    """
+    from brownie import BadgerRegistry
+
+    checkpoints = RegistryCheckpoints(BadgerRegistry.at(address), db_path=db_path)
+    vaults = checkpoints.production_vaults(int(block), status=None if status is None else int(status))
+    for vault, version, status_, metadata in vaults:
+        print(f"{vault} {version} {status_} {metadata}")
+    return vaults
@@ -0,0 +1,65 @@
+"""
+    Keep a copy of the production vaults and keys, re-reading only what changed
+
+    Every poll costs one small `getRevisions` call. Only the buckets whose revision moved are
+    read again, and the keys only when the key table revision moved. `in_sync` checks a local
+    index against the on-chain digest without reading any of the registry state.
+"""
+from brownie import web3
+
+from scripts.address_book import load_address_book
+
+VAULT_STATUS_LENGTH = 4
+
+
+class RegistryPoller:
+    def __init__(self, registry):
+        self.registry = registry
+        self.block = None
+        self.digest = None
+        self.versions = []
+        ## (version, status) => [VaultInfo, ...] and the revision it was read at
+        self.buckets = {}
+        self.revisions = {}
+        self.keys = {}
+        self.keys_revision = None
+
+    def poll(self, block_identifier=None) -> dict:
+        """
+        Bring the copy to `block_identifier` (default latest), returns what changed
+
+        {"keys": True when the keys were read again, "buckets": [(version, status), ...] read again}
+        """
+        block = web3.eth.block_number if block_identifier is None else block_identifier
+        keys_revision, bucket_revisions, digest = self.registry.getRevisions.call(block_identifier=block)
+        changes = {"keys": False, "buckets": []}
+
+        # Versions are only ever appended, a longer list of buckets means new versions
+        if len(bucket_revisions) != len(self.versions) * VAULT_STATUS_LENGTH:
+            self.versions = list(self.registry.getAllVersions.call(block_identifier=block))
+
+        if keys_revision != self.keys_revision:
+            self.keys = load_address_book(self.registry, block_identifier=block)
+            self.keys_revision = keys_revision
+            changes["keys"] = True
+
+        for position, revision in enumerate(bucket_revisions):
+            bucket = (self.versions[position // VAULT_STATUS_LENGTH], position % VAULT_STATUS_LENGTH)
+            if self.revisions.get(bucket) != revision:
+                self.buckets[bucket] = self.registry.getFilteredProductionVaults.call(*bucket, block_identifier=block)
+                self.revisions[bucket] = revision
+                changes["buckets"].append(bucket)
+
+        self.block = block
+        self.digest = digest
+        return changes
+
+    def production_vaults(self, version: str, status: int):
+        return self.buckets.get((version, status), [])
+
+
+def in_sync(registry, indexer) -> bool:
+    """
+    Whether the index matches the registry at its cursor, by comparing the state digests
+    """
+    return registry.stateDigest.call(block_identifier=indexer.cursor) == indexer.digest()
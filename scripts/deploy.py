@@ -28,6 +28,15 @@ OPTIMISM_REGISTRY_CONFIG = {
     'techOps': web3.toChecksumAddress("0x8D05c5DA2a3Cb4BeB4C5EB500EE9e3Aa71670733"),
 }
 
+## Network name => registry config, the proxy is initialized with techOps as governance and strategistGuild
+REGISTRY_CONFIGS = {
+    'ethereum': ETH_REGISTRY_CONFIG,
+    'polygon': POLYGON_REGISTRY_CONFIG,
+    'arbitrum': ARBITRUM_REGISTRY_CONFIG,
+    'fantom': FANTOM_REGISTRY_CONFIG,
+    'optimism': OPTIMISM_REGISTRY_CONFIG,
+}
+
 def deploy_registry_logic(logic):
     """
     Deploy the strat logic
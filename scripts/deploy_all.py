@@ -0,0 +1,331 @@
+"""
+    Deploy the registry logic and proxy to every configured network at once, without prompts
+
+    DEPLOYER_PRIVATE_KEY=0x... brownie run deploy_all
+
+    Networks are deployed concurrently, each over its own RPC connection with nonces handed out
+    locally. Every transaction hash and contract address is written to a state file as soon as
+    it is known, so running the deploy again picks up a failed network where it stopped and
+    leaves the finished ones alone. A deploy is done once the proxy is checked to point to the
+    logic, have the right admin and be initialized with the expected governance and strategistGuild.
+
+    A network whose config has a "proxy" with code is upgraded instead: the new logic is deployed,
+    the proxy admin sends `upgradeTo` (the deployer does it when it is the admin, otherwise the run
+    stops with the calldata to send) and the deployer then sends `migrate` through the proxy.
+"""
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from eth_account import Account
+from web3 import Web3
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+from scripts.deploy import REGISTRY_CONFIGS
+from scripts.helpers.networks import NETWORKS, REGISTRY_ADDRESS
+
+STATE_PATH = "deploy_state.json"
+## Seconds to wait for a receipt before stopping, a config can set its own "receiptTimeout"
+RECEIPT_TIMEOUT = 600
+
+## EIP-1967 slots of AdminUpgradeabilityProxy
+IMPLEMENTATION_SLOT = 0x360894A13BA1A3210667C828492DB98DCA3E2076CC3735A920A3CA505D382BBC
+ADMIN_SLOT = 0xB53127684A568B3173AE13B9F8A6016E243E63B6E8EE1178D6A717850B5D6103
+
+## Steps of a network deploy, in order, an upgrade runs LOGIC, UPGRADE then MIGRATE
+LOGIC = "logic"
+PROXY = "proxy"
+UPGRADE = "upgrade"
+MIGRATE = "migrate"
+
+
+class DeployError(Exception):
+    pass
+
+
+class DeployState:
+    """
+    Progress of every network, saved to `path` after each change
+    """
+
+    def __init__(self, path: str = STATE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._networks = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self._networks = json.load(f)
+
+    def get(self, network: str) -> dict:
+        with self._lock:
+            return json.loads(json.dumps(self._networks.get(network, {})))
+
+    def update(self, network: str, **values):
+        with self._lock:
+            self._networks.setdefault(network, {}).update(values)
+            # Write aside and rename, so a crash never leaves a truncated state file
+            with open(f"{self.path}.tmp", "w") as f:
+                json.dump(self._networks, f, indent=2, sort_keys=True)
+            os.replace(f"{self.path}.tmp", self.path)
+
+
+class NonceManager:
+    """
+    Hands out consecutive nonces without asking the node every time
+
+    Nonces are tracked per chain and account, so network configs sharing a chain share them too
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._nonces = {}
+
+    def next(self, w3, address: str) -> int:
+        with self._lock:
+            key = (w3.eth.chain_id, address)
+            if key not in self._nonces:
+                self._nonces[key] = w3.eth.get_transaction_count(address, "pending")
+            nonce = self._nonces[key]
+            self._nonces[key] += 1
+            return nonce
+
+    def reset(self, w3, address: str):
+        """
+        Forget the nonce of `address`, e.g. after a transaction failed to be sent and left a gap
+        """
+        with self._lock:
+            self._nonces.pop((w3.eth.chain_id, address), None)
+
+
+def deploy_network(
+    network: str, config: dict, account, artifacts: dict, state: DeployState, nonces: NonceManager = None
+) -> dict:
+    """
+    Deploy, or finish deploying, the logic and proxy on one network
+
+    `config` holds the "rpc" url, the "proxyAdmin" and the "governance" and "strategistGuild"
+    the proxy is initialized with. `artifacts` maps a contract name to its "abi" and "bytecode".
+    With a "proxy" address that has code, that proxy is upgraded to new logic instead, see upgrade_network
+    """
+    nonces = nonces or NonceManager()
+    w3 = Web3(Web3.HTTPProvider(config["rpc"]))
+    chain_id = w3.eth.chain_id
+    known_chain_id = state.get(network).get("chainId", chain_id)
+    if known_chain_id != chain_id:
+        raise DeployError(f"{network} was deployed on chain {known_chain_id}, the rpc points to chain {chain_id}")
+    state.update(network, chainId=chain_id)
+
+    if config.get("proxy") and w3.eth.get_code(config["proxy"]):
+        return upgrade_network(w3, network, config, account, artifacts, state, nonces)
+
+    governance, strategist_guild = _roles(config)
+    registry = w3.eth.contract(abi=artifacts["BadgerRegistry"]["abi"])
+    initialize = registry.encodeABI(fn_name="initialize", args=[governance, strategist_guild])
+    timeout = config.get("receiptTimeout", RECEIPT_TIMEOUT)
+
+    logic = _deploy_contract(w3, network, LOGIC, account, artifacts["BadgerRegistry"], [], state, nonces, timeout)
+    proxy = _deploy_contract(
+        w3,
+        network,
+        PROXY,
+        account,
+        artifacts["AdminUpgradeabilityProxy"],
+        [logic, config["proxyAdmin"], initialize],
+        state,
+        nonces,
+        timeout,
+    )
+
+    verify_network(w3, proxy, logic, config, artifacts["BadgerRegistry"]["abi"])
+    state.update(network, verified=True)
+    return state.get(network)
+
+
+def upgrade_network(w3, network: str, config: dict, account, artifacts: dict, state: DeployState, nonces) -> dict:
+    """
+    Point the existing `config["proxy"]` to new logic with `upgradeTo`, then move the vaults with `migrate`
+
+    `upgradeTo` must come from the proxy admin and `migrate` from anyone else, as the proxy doesn't
+    forward the calls of its admin. When the deployer isn't the admin the run stops with the calldata
+    the admin has to send, running again once it is mined resumes with `migrate`.
+    `migrate` moves the production vaults of every listed version, and the author vaults of the
+    optional "migrateAuthors" [[author, version], ...] of the config. Running it again is a no-op
+    """
+    proxy = Web3.toChecksumAddress(config["proxy"])
+    admin = _slot_address(w3, proxy, ADMIN_SLOT)
+    migrated = "block" in state.get(network).get(MIGRATE, {})
+    if admin == account.address and not migrated:
+        # Checked before upgrading, an upgraded registry hides its vaults until they are migrated
+        raise DeployError(f"The proxy admin {admin} can't call migrate through {proxy}, deploy from another account")
+    timeout = config.get("receiptTimeout", RECEIPT_TIMEOUT)
+    state.update(network, **{PROXY: {"address": proxy}})
+
+    logic = _deploy_contract(w3, network, LOGIC, account, artifacts["BadgerRegistry"], [], state, nonces, timeout)
+    if _slot_address(w3, proxy, IMPLEMENTATION_SLOT) != logic:
+        proxy_contract = w3.eth.contract(address=proxy, abi=artifacts["AdminUpgradeabilityProxy"]["abi"])
+        if admin != account.address:
+            data = proxy_contract.encodeABI(fn_name="upgradeTo", args=[logic])
+            raise DeployError(
+                f"The proxy admin {admin} must send upgradeTo({logic}) to {proxy} (data {data}), "
+                "run again once it is mined to migrate"
+            )
+        upgrade = proxy_contract.functions.upgradeTo(logic)
+        _send(w3, network, UPGRADE, account, upgrade.buildTransaction, state, nonces, timeout)
+
+    if not migrated:
+        registry = w3.eth.contract(address=proxy, abi=artifacts["BadgerRegistry"]["abi"])
+        authors = config.get("migrateAuthors", [])
+        migrate = registry.functions.migrate(
+            registry.functions.getAllVersions().call(),
+            [author for author, _ in authors],
+            [version for _, version in authors],
+        )
+        receipt = _send(w3, network, MIGRATE, account, migrate.buildTransaction, state, nonces, timeout)
+        state.update(network, **{MIGRATE: {"tx": receipt.transactionHash.hex(), "block": receipt.blockNumber}})
+
+    verify_network(w3, proxy, logic, config, artifacts["BadgerRegistry"]["abi"], check_roles=False)
+    state.update(network, verified=True)
+    return state.get(network)
+
+
+def verify_network(w3, proxy: str, logic: str, config: dict, abi: list, check_roles: bool = True):
+    """
+    Check the proxy points to `logic`, is administered by the proxyAdmin and initialized with the configured roles
+
+    Upgrades skip the roles, governance may have moved since the proxy was initialized
+    """
+    checks = {
+        "implementation": (_slot_address(w3, proxy, IMPLEMENTATION_SLOT), logic),
+        "admin": (_slot_address(w3, proxy, ADMIN_SLOT), config["proxyAdmin"]),
+    }
+    if check_roles:
+        governance, strategist_guild = _roles(config)
+        registry = w3.eth.contract(address=proxy, abi=abi)
+        checks["governance"] = (registry.functions.governance().call(), governance)
+        checks["strategistGuild"] = (registry.functions.strategistGuild().call(), strategist_guild)
+    wrong = {name: values for name, values in checks.items() if values[0].lower() != values[1].lower()}
+    if wrong:
+        details = ", ".join(f"{name} is {found} instead of {expected}" for name, (found, expected) in wrong.items())
+        raise DeployError(f"Proxy {proxy}: {details}")
+
+
+def deploy_all(networks: dict, account, artifacts: dict, state_path: str = STATE_PATH) -> dict:
+    """
+    Deploy to every network of `networks` ({name: config}) concurrently
+
+    A network that fails is reported with an "error" entry instead of failing the others,
+    running the deploy again resumes it
+    """
+    state = DeployState(state_path)
+    nonces = NonceManager()
+
+    def deploy(network):
+        try:
+            return deploy_network(network, networks[network], account, artifacts, state, nonces)
+        except Exception as e:
+            return {**state.get(network), "error": f"{type(e).__name__}: {e}"}
+
+    names = list(networks)
+    if not names:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(names)) as executor:
+        return dict(zip(names, executor.map(deploy, names)))
+
+
+def _deploy_contract(
+    w3,
+    network: str,
+    step: str,
+    account,
+    artifact: dict,
+    args: list,
+    state: DeployState,
+    nonces: NonceManager,
+    timeout: float = RECEIPT_TIMEOUT,
+) -> str:
+    """
+    Address of the contract deployed by `step`, sending its transaction only if none was sent before
+    """
+    progress = state.get(network).get(step, {})
+    if "address" in progress:
+        return progress["address"]
+
+    contract = w3.eth.contract(abi=artifact["abi"], bytecode=artifact["bytecode"])
+    receipt = _send(w3, network, step, account, contract.constructor(*args).buildTransaction, state, nonces, timeout)
+    state.update(network, **{step: {"tx": receipt.transactionHash.hex(), "address": receipt.contractAddress}})
+    return receipt.contractAddress
+
+
+def _send(w3, network: str, step: str, account, build, state: DeployState, nonces: NonceManager, timeout: float):
+    """
+    Receipt of the transaction of `step`, built by `build(params)` and sent only if none was sent before
+
+    Raises DeployError when the transaction reverts, or isn't mined within `timeout` seconds. A reverted
+    or dropped transaction is forgotten so the next run sends a new one, a pending one is waited for again
+    """
+    tx_hash = state.get(network).get(step, {}).get("tx")
+    if tx_hash is None:
+        tx = build({"from": account.address, "chainId": w3.eth.chain_id})
+        # Only take a nonce once the transaction is built, a failed gas estimate would leave a gap otherwise
+        tx["nonce"] = nonces.next(w3, account.address)
+        try:
+            tx_hash = w3.eth.send_raw_transaction(account.sign_transaction(tx).rawTransaction).hex()
+        except Exception:
+            nonces.reset(w3, account.address)
+            raise
+        state.update(network, **{step: {"tx": tx_hash}})
+
+    try:
+        receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
+    except TimeExhausted:
+        try:
+            nonce = w3.eth.get_transaction(tx_hash)["nonce"]
+        except TransactionNotFound:
+            state.update(network, **{step: {}})
+            nonces.reset(w3, account.address)
+            raise DeployError(f"{step} transaction {tx_hash} was dropped by the node, run again to send a new one")
+        raise DeployError(
+            f"{step} transaction {tx_hash} (nonce {nonce}) is still pending after {timeout}s, run again to keep "
+            "waiting for it, or replace that nonce with a higher gas price and save its hash in the state file"
+        )
+    if receipt.status != 1:
+        # Forget the reverted transaction so the next run sends a new one
+        state.update(network, **{step: {}})
+        raise DeployError(f"{step} transaction {tx_hash} reverted")
+    return receipt
+
+
+def _slot_address(w3, address: str, slot: int) -> str:
+    return Web3.toChecksumAddress(w3.eth.get_storage_at(address, slot)[-20:])
+
+
+def _roles(config: dict):
+    """
+    (governance, strategistGuild) of a network config, both default to techOps like scripts/deploy.py
+    """
+    return config.get("governance", config["techOps"]), config.get("strategistGuild", config["techOps"])
+
+
+def main(state_path=STATE_PATH):
+    from brownie import AdminUpgradeabilityProxy, BadgerRegistry
+
+    account = Account.from_key(os.environ["DEPLOYER_PRIVATE_KEY"])
+    # The configured networks already run the proxy, they are upgraded unless it isn't deployed there yet
+    networks = {
+        name: {**REGISTRY_CONFIGS[name], "rpc": os.getenv(variable), "proxy": REGISTRY_ADDRESS}
+        for name, variable in NETWORKS.items()
+        if os.getenv(variable)
+    }
+    artifacts = {
+        container._name: {"abi": container.abi, "bytecode": container.bytecode}
+        for container in (BadgerRegistry, AdminUpgradeabilityProxy)
+    }
+
+    results = deploy_all(networks, account, artifacts, state_path)
+    for name, result in results.items():
+        if "error" in result:
+            print(f"{name}: {result['error']}, run again to resume")
+        else:
+            print(f"{name}: registry proxy {result[PROXY]['address']} with logic {result[LOGIC]['address']}")
+    return results
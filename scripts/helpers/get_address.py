@@ -1,7 +1,13 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
 from brownie import web3
 from eth_utils import is_checksum_address
 import click
 
+## Concurrent ENS lookups when resolving many names at once
+MAX_ENS_WORKERS = 8
+
 def get_address(msg: str, default: str = None) -> str:
     val = click.prompt(msg, default=default)
 
@@ -10,7 +16,7 @@ def get_address(msg: str, default: str = None) -> str:
 
         if is_checksum_address(val):
             return val
-        elif addr := web3.ens.address(val):
+        elif addr := resolve_address(val):
             click.echo(f"Found ENS '{val}' [{addr}]")
             return addr
 
@@ -18,4 +24,25 @@ def get_address(msg: str, default: str = None) -> str:
             f"I'm sorry, but '{val}' is not a checksummed address or valid ENS record"
         )
         # NOTE: Only display default once
-        val = click.prompt(msg)
\ No newline at end of file
+        val = click.prompt(msg)
+
+@lru_cache(maxsize=None)
+def resolve_address(val: str) -> str:
+    """
+    Checksummed address of `val`, either a checksummed address or an ENS name, None when the name doesn't resolve
+
+    ENS lookups are cached for the life of the process
+    """
+    if is_checksum_address(val):
+        return val
+    return web3.ens.address(val)
+
+def resolve_addresses(values) -> dict:
+    """
+    {value: address} of many addresses and ENS names, looked up concurrently
+    """
+    values = list(dict.fromkeys(values))
+    if not values:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(MAX_ENS_WORKERS, len(values))) as executor:
+        return dict(zip(values, executor.map(resolve_address, values)))
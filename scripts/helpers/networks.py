@@ -0,0 +1,11 @@
+## The proxy shares its address across chains
+REGISTRY_ADDRESS = "0xdc602965F3e5f1e7BAf2446d5564b407d5113A06"
+
+## Network name => environment variable holding its RPC url
+NETWORKS = {
+    "ethereum": "ETH_RPC_URL",
+    "polygon": "POLYGON_RPC_URL",
+    "arbitrum": "ARBITRUM_RPC_URL",
+    "fantom": "FANTOM_RPC_URL",
+    "optimism": "OPTIMISM_RPC_URL",
+}
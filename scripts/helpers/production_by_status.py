@@ -0,0 +1,15 @@
+from badger_registry.records import STATUSES, status_mask
+
+__all__ = ["STATUSES", "status_mask", "production_vaults_by_status"]
+
+
+def production_vaults_by_status(registry, statuses, versions=(), block_identifier=None) -> list:
+    """
+    VaultInfo of the production vaults in `statuses` (names or values), e.g. ["guarded", "open"]
+
+    One flat list in getProductionVaults order, of every listed version unless `versions` is given.
+    Only the selected buckets are read, so the call costs what it returns.
+    """
+    return registry.getProductionVaultsByStatus.call(
+        status_mask(statuses), list(versions), block_identifier=block_identifier
+    )
@@ -0,0 +1,59 @@
+from brownie import web3
+from eth_utils import event_abi_to_log_topic
+
+## Vault events as emitted before they had indexed topics, registries upgraded from v0.2.1 have both in their history.
+## v0.2.1 emitted no event on metadata updates, UpdateVaultMetadata only exists indexed.
+## v0.2.1 named the sender of production events `author` too, it is decoded as `caller` like the indexed events
+_VAULT_FIELDS = [("author", "address"), ("version", "string"), ("metadata", "string"), ("vault", "address")]
+_PRODUCTION_FIELDS = [("caller", "address")] + _VAULT_FIELDS[1:] + [("status", "uint8")]
+LEGACY_EVENTS = {
+    "NewVault": _VAULT_FIELDS,
+    "RemoveVault": _VAULT_FIELDS,
+    "PromoteVault": _PRODUCTION_FIELDS,
+    "DemoteVault": _PRODUCTION_FIELDS,
+    "PurgeVault": _PRODUCTION_FIELDS,
+}
+
+
+def legacy_event_abis() -> list:
+    return [
+        {
+            "type": "event",
+            "name": name,
+            "anonymous": False,
+            "inputs": [{"name": field, "type": type_, "indexed": False} for field, type_ in fields],
+        }
+        for name, fields in LEGACY_EVENTS.items()
+    ]
+
+
+def registry_events(registry) -> dict:
+    """
+    Map the topic of every registry event, current or legacy, to the web3 event able to decode its logs
+    """
+    events = {}
+    for abi in [legacy_event_abis(), registry.abi]:
+        contract = web3.eth.contract(address=registry.address, abi=abi)
+        events.update(
+            {event_abi_to_log_topic(item): contract.events[item["name"]]() for item in abi if item["type"] == "event"}
+        )
+    return events
+
+
+def event_topic(registry, name: str) -> str:
+    """
+    Topic of the current `name` event, to filter logs with
+    """
+    abi = next(item for item in registry.abi if item["type"] == "event" and item["name"] == name)
+    return "0x" + event_abi_to_log_topic(abi).hex()
+
+
+def decode_log(events: dict, log):
+    """
+    Returns the event name and arguments of a registry log, None for logs of unknown events
+    """
+    event = events.get(bytes(log["topics"][0]))
+    if event is None:
+        return None
+    decoded = event.processLog(log)
+    return decoded["event"], decoded["args"]
@@ -0,0 +1,28 @@
+from brownie import web3
+
+from scripts.paginate import iter_production_vaults
+
+
+def read_state(registry, vaults=(), block_identifier=None) -> dict:
+    """
+    Current versions, keys and production vaults ({vault: (version, status, metadata)})
+
+    `vaults` are looked up one by one too, in case they are in production under a version that isn't listed
+    """
+    block = web3.eth.block_number if block_identifier is None else block_identifier
+    keys, values = registry.getAllKeyValues.call(block_identifier=block)
+    production = {
+        vault: (version, int(status), metadata)
+        for version, status, vault, metadata in iter_production_vaults(registry, block_identifier=block)
+    }
+    for vault in vaults:
+        if vault not in production:
+            address, version, status, metadata = registry.productionVaultInfoByVault.call(vault, block_identifier=block)
+            if int(address, 16) != 0:
+                production[vault] = (version, int(status), metadata)
+
+    return {
+        "versions": list(registry.getAllVersions.call(block_identifier=block)),
+        "keys": dict(zip(keys, values)),
+        "productionVaults": production,
+    }
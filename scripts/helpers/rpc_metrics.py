@@ -0,0 +1,199 @@
+"""
+    Opt-in instrumentation of every JSON-RPC request, turned on from brownie_hooks.py
+
+    RPC_METRICS=1 brownie run ...                  prints a summary when the process exits
+    RPC_METRICS=rpc_metrics.json brownie run ...   writes it as JSON instead
+
+    The providers are wrapped at the class level, so requests made by brownie, by our scripts,
+    by ENS lookups and by the deploy pipeline's own connections are all counted, whatever the
+    network. Compilation time is recorded next to them as "brownie:compile".
+"""
+import atexit
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from web3 import HTTPProvider, IPCProvider, WebsocketProvider
+
+## Upper bounds of the latency histogram buckets, in milliseconds, the last bucket is unbounded
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+PROVIDERS = (HTTPProvider, IPCProvider, WebsocketProvider)
+
+_active = None
+_state = threading.local()
+
+
+class RpcMetrics:
+    """
+    Per method call counts, errors, retries, latency histogram and payload sizes
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.methods = {}
+
+    def record(self, method: str, seconds: float, request_bytes=0, response_bytes=0, error=False, retry=False):
+        bucket = next(
+            (x for x, bound in enumerate(LATENCY_BUCKETS_MS) if seconds * 1000 <= bound), len(LATENCY_BUCKETS_MS)
+        )
+        with self._lock:
+            stats = self.methods.setdefault(
+                method,
+                {
+                    "calls": 0,
+                    "errors": 0,
+                    "retries": 0,
+                    "seconds": 0.0,
+                    "requestBytes": 0,
+                    "responseBytes": 0,
+                    "latency": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                },
+            )
+            stats["calls"] += 1
+            stats["errors"] += int(error)
+            stats["retries"] += int(retry)
+            stats["seconds"] += seconds
+            stats["requestBytes"] += request_bytes
+            stats["responseBytes"] += response_bytes
+            stats["latency"][bucket] += 1
+
+    def summary(self) -> dict:
+        """
+        {method: stats}, with the latency histogram keyed by bucket ("<=10ms", ..., ">5000ms")
+        """
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        with self._lock:
+            return {
+                method: {**stats, "latency": dict(zip(labels, stats["latency"]))}
+                for method, stats in sorted(self.methods.items())
+            }
+
+    def format(self) -> str:
+        lines = [
+            f"{'method':<32}{'calls':>8}{'errors':>8}{'retries':>8}"
+            f"{'total s':>10}{'avg ms':>10}{'sent kB':>10}{'recv kB':>10}"
+        ]
+        for method, stats in sorted(self.methods.items(), key=lambda item: -item[1]["seconds"]):
+            lines.append(
+                f"{method:<32}{stats['calls']:>8}{stats['errors']:>8}{stats['retries']:>8}"
+                f"{stats['seconds']:>10.2f}{stats['seconds'] * 1000 / stats['calls']:>10.1f}"
+                f"{stats['requestBytes'] / 1024:>10.1f}{stats['responseBytes'] / 1024:>10.1f}"
+            )
+        return "\n".join(lines)
+
+
+METRICS = RpcMetrics()
+
+
+def instrument():
+    """
+    Wrap `make_request` of every provider class, once. Requests are only recorded while metrics are active
+    """
+    for provider in PROVIDERS:
+        if getattr(provider.make_request, "_rpc_metrics", False):
+            continue
+        provider.make_request = _instrumented(provider.make_request)
+
+
+@contextmanager
+def recording(metrics: RpcMetrics):
+    """
+    Record the requests made inside the block into `metrics`
+    """
+    global _active
+    instrument()
+    previous, _active = _active, metrics
+    try:
+        yield metrics
+    finally:
+        _active = previous
+
+
+def install(target: str = "1"):
+    """
+    Start recording into METRICS, and report them at exit: printed for "1", written as JSON to any other `target`
+    """
+    global _active
+    instrument()
+    _instrument_compiler()
+    _active = METRICS
+    atexit.register(report, target)
+
+
+def report(target: str = "1", metrics: RpcMetrics = METRICS):
+    if target.lower() in ("1", "true", "yes"):
+        print(metrics.format())
+        return
+    with open(target, "w") as f:
+        json.dump(metrics.summary(), f, indent=2)
+
+
+def _instrumented(make_request):
+    def wrapper(self, method, params):
+        metrics = _active
+        if metrics is None:
+            return make_request(self, method, params)
+
+        # The retry middlewares send the same request again through the same provider after a failed attempt.
+        # Its JSON-RPC id is drawn inside make_request on every attempt, so the provider stands in for it
+        request = (id(self), method, _encode(params))
+        retry = getattr(_state, "failed", None) == request
+        start = time.perf_counter()
+        try:
+            response = make_request(self, method, params)
+        except Exception:
+            _state.failed = request
+            metrics.record(method, time.perf_counter() - start, _size(method, params), error=True, retry=retry)
+            raise
+        seconds = time.perf_counter() - start
+        _state.failed = None
+        error = isinstance(response, dict) and "error" in response
+        metrics.record(method, seconds, _size(method, params), _size(response), error=error, retry=retry)
+        return response
+
+    wrapper._rpc_metrics = True
+    return wrapper
+
+
+def _instrument_compiler():
+    try:
+        from brownie.project import compiler
+    except ImportError:
+        return
+    if getattr(compiler.compile_and_format, "_rpc_metrics", False):
+        return
+    compile_and_format = compiler.compile_and_format
+
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return compile_and_format(*args, **kwargs)
+        finally:
+            if _active is not None:
+                _active.record("brownie:compile", time.perf_counter() - start)
+
+    wrapper._rpc_metrics = True
+    compiler.compile_and_format = wrapper
+
+
+def _size(*payload) -> int:
+    """
+    Size of the JSON encoding of the payload, close to what goes over the wire
+    """
+    return len(_encode(payload if len(payload) > 1 else payload[0]))
+
+
+def _encode(payload) -> str:
+    """
+    JSON encoding of the payload, empty when it can't be encoded
+    """
+    try:
+        return json.dumps(payload, default=_hex)
+    except (TypeError, ValueError):
+        return ""
+
+
+def _hex(value):
+    return value.hex() if isinstance(value, (bytes, bytearray)) else str(value)
@@ -0,0 +1,40 @@
+from eth_utils import keccak
+
+try:
+    from eth_abi import encode
+except ImportError:
+    from eth_abi import encode_abi as encode
+
+## Digest of a registry nothing was recorded in yet
+EMPTY_DIGEST = bytes(32)
+
+_VAULT_FIELDS = (("author", "address"), ("version", "string"), ("metadata", "string"), ("vault", "address"))
+## Production events name the role sending them `caller`, it is rolled in where NewVault has the author
+_CALLER_FIELDS = (("caller", "address"),) + _VAULT_FIELDS[1:]
+_STATUS_FIELDS = _CALLER_FIELDS + (("status", "uint8"),)
+
+## Event name => (BadgerRegistry.Change, event fields rolled into the digest)
+CHANGES = {
+    "NewVault": (0, _VAULT_FIELDS),
+    "RemoveVault": (1, _VAULT_FIELDS),
+    "PromoteVault": (2, _STATUS_FIELDS),
+    "DemoteVault": (3, _STATUS_FIELDS),
+    "PurgeVault": (4, _STATUS_FIELDS),
+    "UpdateVaultMetadata": (5, _CALLER_FIELDS),
+    "Set": (6, (("key", "string"), ("at", "address"))),
+    "DeleteKey": (7, (("key", "string"),)),
+    "AddVersion": (8, (("version", "string"),)),
+}
+
+
+def roll_digest(digest: bytes, name: str, args) -> bytes:
+    """
+    The registry stateDigest after the change of the `name` event with `args`, like _recordChange
+
+    Events that don't change the digest (e.g. AddKey) leave it as is
+    """
+    if name not in CHANGES:
+        return digest
+    change, fields = CHANGES[name]
+    encoded = encode(["uint8"] + [type_ for _, type_ in fields], [change] + [args[field] for field, _ in fields])
+    return keccak(encode(["bytes32", "bytes32"], [digest, keccak(encoded)]))
@@ -0,0 +1,67 @@
+INVALID_NAME = "BadgerRegistry: Invalid Name"
+INVALID_PROTOCOL = "BadgerRegistry: Invalid Protocol"
+INVALID_BEHAVIOR = "BadgerRegistry: Invalid Behavior"
+
+
+class InvalidMetadata(ValueError):
+    """
+    Raised with the revert reason BadgerRegistry would give for the metadata
+    """
+
+
+def verify_metadata(metadata: str):
+    """
+    Same rules as BadgerRegistry.verifyMetadata, so bad metadata is caught before sending a transaction
+
+    Expected format: name=MyVault,protocol=Badger,behavior=DCA
+    Returns the positions of the "=" following "protocol" and "behavior" in the utf-8 metadata
+    """
+    data = metadata.encode("utf-8")
+
+    name_index = protocol_index = behavior_index = 0
+    for i, byte in enumerate(data):
+        if byte == 0x3D:
+            # "=", like the contract a "=" at position 0 leaves the name index unset
+            if name_index == 0:
+                name_index = i
+            elif protocol_index == 0:
+                protocol_index = i
+            elif behavior_index == 0:
+                behavior_index = i
+                break
+
+    if name_index == 0:
+        raise InvalidMetadata(INVALID_NAME)
+    if protocol_index == 0:
+        raise InvalidMetadata(INVALID_PROTOCOL)
+    if behavior_index == 0:
+        raise InvalidMetadata(INVALID_BEHAVIOR)
+    if data[:name_index] != b"name":
+        raise InvalidMetadata(INVALID_NAME)
+    if protocol_index < 8 or data[protocol_index - 8 : protocol_index] != b"protocol":
+        raise InvalidMetadata(INVALID_PROTOCOL)
+    if data[behavior_index - 8 : behavior_index] != b"behavior":
+        raise InvalidMetadata(INVALID_BEHAVIOR)
+    return protocol_index, behavior_index
+
+
+def metadata_fields(metadata: str):
+    """
+    (protocol, behavior) values of valid metadata, as indexed by getProductionVaultsByProtocol / ByBehavior
+    """
+    protocol_index, behavior_index = verify_metadata(metadata)
+    data = metadata.encode("utf-8")
+
+    protocol = data[protocol_index + 1 : behavior_index - 8]
+    if protocol.endswith(b","):
+        protocol = protocol[:-1]
+    behavior = data[behavior_index + 1 :].split(b",", 1)[0]
+    return protocol.decode("utf-8"), behavior.decode("utf-8")
+
+
+def is_valid_metadata(metadata: str) -> bool:
+    try:
+        verify_metadata(metadata)
+    except InvalidMetadata:
+        return False
+    return True
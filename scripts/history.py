@@ -0,0 +1,97 @@
+"""
+    History of one vault, author, version or status, filtered by the node
+
+    Vault events are indexed by vault, keccak256 of the version, then author (NewVault,
+    RemoveVault), caller (UpdateVaultMetadata) or status (PromoteVault, DemoteVault, PurgeVault),
+    so every query is an `eth_getLogs` over topics that only returns the matching logs.
+    The caller of the production events is the role sending them (governance, the strategist
+    guild or the developer), not the vault author, so author histories leave them out.
+    Logs emitted before a registry was upgraded to indexed events have nothing to filter on,
+    pass the upgrade block as `legacy_to_block` to fetch them and filter them locally.
+"""
+from brownie import web3
+from eth_utils import event_abi_to_log_topic
+
+from scripts.helpers.registry_events import decode_log, event_topic, legacy_event_abis, registry_events
+
+VAULT_EVENTS = ("NewVault", "RemoveVault", "PromoteVault", "DemoteVault", "PurgeVault", "UpdateVaultMetadata")
+## Events naming the vault author, production events name the role sending them `caller` instead
+AUTHOR_EVENTS = ("NewVault", "RemoveVault")
+STATUS_EVENTS = ("PromoteVault", "DemoteVault", "PurgeVault")
+
+DEFAULT_BATCH_SIZE = 2000
+
+
+def address_topic(address: str) -> str:
+    return "0x" + address[2:].lower().rjust(64, "0")
+
+
+def version_topic(version: str) -> str:
+    return web3.keccak(text=version).hex()
+
+
+def status_topic(status: int) -> str:
+    return f"0x{int(status):064x}"
+
+
+def vault_history(registry, vault: str, **kwargs) -> list:
+    return query_history(registry, VAULT_EVENTS, [address_topic(vault)], {"vault": vault}, **kwargs)
+
+
+def author_history(registry, author: str, **kwargs) -> list:
+    return query_history(registry, AUTHOR_EVENTS, [None, None, address_topic(author)], {"author": author}, **kwargs)
+
+
+def version_history(registry, version: str, **kwargs) -> list:
+    return query_history(registry, VAULT_EVENTS, [None, version_topic(version)], {"version": version}, **kwargs)
+
+
+def status_history(registry, status: int, **kwargs) -> list:
+    return query_history(registry, STATUS_EVENTS, [None, None, status_topic(status)], {"status": status}, **kwargs)
+
+
+def query_history(
+    registry,
+    names,
+    topics: list,
+    match: dict,
+    from_block=0,
+    to_block=None,
+    legacy_to_block=None,
+    batch_size=DEFAULT_BATCH_SIZE,
+) -> list:
+    """
+    [(block, event name, args), ...] of the `names` events whose topics after the event topic match `topics`
+
+    Legacy logs up to `legacy_to_block` are kept when their args match `match` instead
+    """
+    to_block = web3.eth.block_number if to_block is None else to_block
+    events = registry_events(registry)
+
+    topics = [[event_topic(registry, name) for name in names]] + topics
+    logs = _get_logs(registry.address, topics, from_block, to_block, batch_size)
+    history = [(log, decode_log(events, log)) for log in logs]
+
+    if legacy_to_block is not None:
+        legacy_abis = [abi for abi in legacy_event_abis() if abi["name"] in names]
+        legacy_topics = ["0x" + event_abi_to_log_topic(abi).hex() for abi in legacy_abis]
+        for log in _get_logs(registry.address, [legacy_topics], from_block, min(to_block, legacy_to_block), batch_size):
+            decoded = decode_log(events, log)
+            if _matches(decoded[1], match):
+                history.append((log, decoded))
+
+    history.sort(key=lambda item: (item[0]["blockNumber"], item[0]["logIndex"]))
+    return [(log["blockNumber"], name, args) for log, (name, args) in history]
+
+
+def _get_logs(address: str, topics: list, from_block: int, to_block: int, batch_size: int) -> list:
+    logs = []
+    for start in range(from_block, to_block + 1, batch_size):
+        logs += web3.eth.get_logs(
+            {"address": address, "fromBlock": start, "toBlock": min(to_block, start + batch_size - 1), "topics": topics}
+        )
+    return logs
+
+
+def _matches(args, match: dict) -> bool:
+    return all(str(args[field]).lower() == str(value).lower() for field, value in match.items())
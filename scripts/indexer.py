@@ -0,0 +1,355 @@
+"""
+    Incrementally mirror BadgerRegistry state into a local SQLite store
+
+    The indexer replays the registry events from a stored block cursor, so each refresh
+    only fetches the blocks mined since the last run and reads cost no RPC at all.
+    Logs are only applied once they are `confirmations` blocks deep, and every write keeps
+    an undo record so a deeper reorg can be rolled back to the last common block.
+
+    The mirror is only complete when `start_block` is at or before the registry deployment. Events
+    about vaults or keys written before `start_block` are skipped with a warning.
+"""
+import json
+import logging
+import sqlite3
+
+from brownie import web3
+
+from scripts.helpers.registry_events import decode_log, registry_events
+from scripts.helpers.state_digest import EMPTY_DIGEST, roll_digest
+
+## Versions pushed by `initialize`, which emits no AddVersion event for them
+INITIAL_VERSIONS = ("v1", "v1.5", "v2")
+
+DEFAULT_CONFIRMATIONS = 12
+DEFAULT_BATCH_SIZE = 2000
+## How many blocks of undo history are kept to recover from reorgs
+DEFAULT_MAX_ROLLBACK = 1000
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS author_vaults (
+    author TEXT, vault TEXT, version TEXT, status INTEGER, metadata TEXT,
+    PRIMARY KEY (author, vault)
+);
+CREATE TABLE IF NOT EXISTS production_vaults (
+    vault TEXT PRIMARY KEY, version TEXT, status INTEGER, metadata TEXT
+);
+CREATE TABLE IF NOT EXISTS addresses (key TEXT PRIMARY KEY, address TEXT);
+CREATE TABLE IF NOT EXISTS key_by_address (address TEXT PRIMARY KEY, key TEXT);
+CREATE TABLE IF NOT EXISTS keys (position INTEGER PRIMARY KEY, key TEXT);
+CREATE TABLE IF NOT EXISTS versions (position INTEGER PRIMARY KEY, version TEXT);
+CREATE TABLE IF NOT EXISTS digest (id INTEGER PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS blocks (number INTEGER PRIMARY KEY, hash TEXT);
+CREATE TABLE IF NOT EXISTS journal (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, block INTEGER, tbl TEXT, pk TEXT, row TEXT
+);
+"""
+
+## Primary key columns of every mirrored table, used by the journal
+PRIMARY_KEYS = {
+    "author_vaults": ("author", "vault"),
+    "production_vaults": ("vault",),
+    "addresses": ("key",),
+    "key_by_address": ("address",),
+    "keys": ("position",),
+    "versions": ("position",),
+    "digest": ("id",),
+}
+
+
+class ReorgTooDeep(Exception):
+    pass
+
+
+class RegistryIndexer:
+    def __init__(
+        self,
+        registry,
+        db_path=":memory:",
+        start_block=0,
+        confirmations=DEFAULT_CONFIRMATIONS,
+        batch_size=DEFAULT_BATCH_SIZE,
+        max_rollback=DEFAULT_MAX_ROLLBACK,
+        digest_from_block=None,
+    ):
+        self.address = registry.address
+        self.confirmations = confirmations
+        self.batch_size = batch_size
+        self.max_rollback = max_rollback
+
+        self.events = registry_events(registry)
+
+        self.db = sqlite3.connect(db_path)
+        self.db.row_factory = sqlite3.Row
+        with self.db:
+            self.db.executescript(SCHEMA)
+            registry_address = self._meta("registry")
+            if registry_address is None:
+                self._set_meta("registry", self.address)
+                self._set_meta("cursor", start_block - 1)
+                # The digest of a registry upgraded to track it starts at the upgrade, not at the first event
+                self._set_meta("digest_from_block", start_block if digest_from_block is None else digest_from_block)
+                self.db.execute("INSERT INTO digest VALUES (0, ?)", (EMPTY_DIGEST.hex(),))
+                for position, version in enumerate(INITIAL_VERSIONS):
+                    self.db.execute("INSERT INTO versions VALUES (?, ?)", (position, version))
+            elif registry_address != self.address:
+                raise ValueError(f"Database indexes another registry [{registry_address}]")
+
+    @property
+    def cursor(self) -> int:
+        """
+        Last block whose logs have been applied to the mirror
+        """
+        return int(self._meta("cursor"))
+
+    def sync(self) -> int:
+        """
+        Apply every confirmed log since the cursor, rolling back first if the chain reorged
+        """
+        head = web3.eth.block_number
+        self._handle_reorg(head)
+
+        target = head - self.confirmations
+        while self.cursor < target:
+            from_block = self.cursor + 1
+            to_block = min(target, from_block + self.batch_size - 1)
+            logs = web3.eth.get_logs({"address": self.address, "fromBlock": from_block, "toBlock": to_block})
+
+            with self.db:
+                for log in logs:
+                    self._apply(log)
+                    self._record_block(log["blockNumber"], log["blockHash"])
+                self._record_block(to_block, self._block_hash(to_block))
+                self._set_meta("cursor", to_block)
+                self._prune(to_block)
+
+        return self.cursor
+
+    ## Reorg handling
+
+    def _handle_reorg(self, head):
+        cursor = self.cursor
+        recorded = self.db.execute("SELECT hash FROM blocks WHERE number = ?", (cursor,)).fetchone()
+        if recorded is None or (cursor <= head and recorded["hash"] == self._block_hash(cursor)):
+            return
+
+        # Walk back through the blocks we have seen until one is still part of the chain
+        ancestor = None
+        seen = self.db.execute("SELECT number, hash FROM blocks WHERE number < ? ORDER BY number DESC", (cursor,))
+        for row in seen.fetchall():
+            if row["number"] <= head and row["hash"] == self._block_hash(row["number"]):
+                ancestor = row["number"]
+                break
+        if ancestor is None:
+            raise ReorgTooDeep(f"No common block with the chain after block {cursor}, rebuild the index")
+
+        with self.db:
+            undo = self.db.execute("SELECT * FROM journal WHERE block > ? ORDER BY id DESC", (ancestor,)).fetchall()
+            for entry in undo:
+                table = entry["tbl"]
+                pk = json.loads(entry["pk"])
+                self._delete_row(table, pk)
+                if entry["row"] is not None:
+                    self._insert_row(table, json.loads(entry["row"]))
+            self.db.execute("DELETE FROM journal WHERE block > ?", (ancestor,))
+            self.db.execute("DELETE FROM blocks WHERE number > ?", (ancestor,))
+            self._set_meta("cursor", ancestor)
+
+    def _block_hash(self, number):
+        try:
+            return web3.eth.get_block(number)["hash"].hex()
+        except Exception:
+            # Block is past the head of the (reorged) chain
+            return None
+
+    def _record_block(self, number, block_hash):
+        if not isinstance(block_hash, str):
+            block_hash = block_hash.hex()
+        self.db.execute("INSERT OR REPLACE INTO blocks VALUES (?, ?)", (number, block_hash))
+
+    def _prune(self, cursor):
+        horizon = cursor - self.max_rollback
+        self.db.execute("DELETE FROM journal WHERE block < ?", (horizon,))
+        self.db.execute("DELETE FROM blocks WHERE number < ? AND number != ?", (horizon, cursor))
+
+    ## Event replay, mirrors the storage writes of BadgerRegistry
+
+    def _apply(self, log):
+        decoded = decode_log(self.events, log)
+        if decoded is None:
+            return
+        (name, args), block = decoded, log["blockNumber"]
+        if block >= int(self._meta("digest_from_block")):
+            self._put(block, "digest", {"id": 0, "value": roll_digest(self.digest(), name, args).hex()})
+
+        if name == "NewVault":
+            self._put(block, "author_vaults", {
+                "author": args["author"], "vault": args["vault"], "version": args["version"],
+                "status": 1, "metadata": args["metadata"],
+            })
+        elif name == "RemoveVault":
+            self._delete(block, "author_vaults", {"author": args["author"], "vault": args["vault"]})
+        elif name == "PromoteVault":
+            existing = self._row("production_vaults", {"vault": args["vault"]})
+            if existing is not None:
+                # Promoting an existing vault only moves its status, metadata is kept
+                self._put(block, "production_vaults", {**existing, "status": args["status"]})
+            else:
+                self._put(block, "production_vaults", {
+                    "vault": args["vault"], "version": args["version"],
+                    "status": args["status"], "metadata": args["metadata"],
+                })
+        elif name == "DemoteVault":
+            existing = self._known_row(name, block, "production_vaults", {"vault": args["vault"]})
+            if existing is not None:
+                self._put(block, "production_vaults", {**existing, "status": args["status"]})
+        elif name == "PurgeVault":
+            self._delete(block, "production_vaults", {"vault": args["vault"]})
+        elif name == "UpdateVaultMetadata":
+            existing = self._known_row(name, block, "production_vaults", {"vault": args["vault"]})
+            if existing is not None:
+                self._put(block, "production_vaults", {**existing, "metadata": args["metadata"]})
+        elif name == "Set":
+            self._put(block, "addresses", {"key": args["key"], "address": args["at"]})
+            self._put(block, "key_by_address", {"address": args["at"], "key": args["key"]})
+        elif name == "AddKey":
+            self._put(block, "keys", {"position": self._count("keys"), "key": args["key"]})
+        elif name == "DeleteKey":
+            self._delete_key(block, args["key"])
+        elif name == "AddVersion":
+            self._put(block, "versions", {"position": self._count("versions"), "version": args["version"]})
+
+    def _delete_key(self, block, key):
+        existing = self._row("addresses", {"key": key})
+        if existing is not None:
+            self._delete(block, "key_by_address", {"address": existing["address"]})
+        self._delete(block, "addresses", {"key": key})
+
+        # Same swap and pop as the contract, so positions match `keys(uint)`
+        row = self.db.execute("SELECT position FROM keys WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            logger.warning("DeleteKey at block %s: key %r was listed before start_block, skipped", block, key)
+            return
+        position = row["position"]
+        last = self._count("keys") - 1
+        moved = self._row("keys", {"position": last})
+        self._delete(block, "keys", {"position": last})
+        if position != last:
+            self._put(block, "keys", {"position": position, "key": moved["key"]})
+
+    def _known_row(self, name, block, table, pk):
+        """
+        Row an event updates, None with a warning when it was written before start_block
+        """
+        row = self._row(table, pk)
+        if row is None:
+            logger.warning("%s at block %s: no %s row for %s before start_block, skipped", name, block, table, pk)
+        return row
+
+    ## Journaled row access
+
+    def _put(self, block, table, row):
+        pk = {column: row[column] for column in PRIMARY_KEYS[table]}
+        self._journal(block, table, pk)
+        self._delete_row(table, pk)
+        self._insert_row(table, row)
+
+    def _delete(self, block, table, pk):
+        self._journal(block, table, pk)
+        self._delete_row(table, pk)
+
+    def _journal(self, block, table, pk):
+        previous = self._row(table, pk)
+        self.db.execute(
+            "INSERT INTO journal (block, tbl, pk, row) VALUES (?, ?, ?, ?)",
+            (block, table, json.dumps(pk), None if previous is None else json.dumps(previous)),
+        )
+
+    def _row(self, table, pk):
+        where = " AND ".join(f"{column} = ?" for column in pk)
+        row = self.db.execute(f"SELECT * FROM {table} WHERE {where}", tuple(pk.values())).fetchone()
+        return None if row is None else dict(row)
+
+    def _insert_row(self, table, row):
+        columns = ", ".join(row)
+        placeholders = ", ".join("?" for _ in row)
+        self.db.execute(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", tuple(row.values()))
+
+    def _delete_row(self, table, pk):
+        where = " AND ".join(f"{column} = ?" for column in pk)
+        self.db.execute(f"DELETE FROM {table} WHERE {where}", tuple(pk.values()))
+
+    def _count(self, table):
+        return self.db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def _meta(self, name):
+        row = self.db.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return None if row is None else row["value"]
+
+    def _set_meta(self, name, value):
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (name, str(value)))
+
+    ## Views, read from the mirror only
+
+    def digest(self) -> bytes:
+        """
+        stateDigest of the registry at the cursor, as rolled from the events
+        """
+        return bytes.fromhex(self._row("digest", {"id": 0})["value"])
+
+    def get(self, key: str) -> str:
+        row = self._row("addresses", {"key": key})
+        return None if row is None else row["address"]
+
+    def key_by_address(self, address: str) -> str:
+        row = self._row("key_by_address", {"address": address})
+        return None if row is None else row["key"]
+
+    def keys(self):
+        return [row["key"] for row in self.db.execute("SELECT key FROM keys ORDER BY position")]
+
+    def versions(self):
+        return [row["version"] for row in self.db.execute("SELECT version FROM versions ORDER BY position")]
+
+    def vaults(self, version: str, author: str):
+        """
+        Sorted by vault, the registry sets reorder on removal so their order can't be replayed
+        """
+        rows = self.db.execute(
+            "SELECT vault, version, status, metadata FROM author_vaults WHERE version = ? AND author = ? "
+            "ORDER BY vault",
+            (version, author),
+        )
+        return [tuple(row) for row in rows]
+
+    def production_vaults(self, version: str, status: int):
+        """
+        Sorted by vault, as `vaults`
+        """
+        rows = self.db.execute(
+            "SELECT vault, version, status, metadata FROM production_vaults WHERE version = ? AND status = ? "
+            "ORDER BY vault",
+            (version, status),
+        )
+        return [tuple(row) for row in rows]
+
+    def production_vault(self, vault: str):
+        row = self.db.execute(
+            "SELECT vault, version, status, metadata FROM production_vaults WHERE vault = ?", (vault,)
+        ).fetchone()
+        return None if row is None else tuple(row)
+
+
+def main(address, db_path="registry.db", start_block=0):
+    """
+    Refresh the local mirror of the registry at `address`
+    """
+    from brownie import BadgerRegistry
+
+    indexer = RegistryIndexer(BadgerRegistry.at(address), db_path=db_path, start_block=int(start_block))
+    cursor = indexer.sync()
+    print(f"Registry [{address}] indexed up to block {cursor}")
+    return indexer
@@ -0,0 +1,57 @@
+"""
+    Move a registry upgraded from v0.2.1 to the packed storage layout
+
+    The old layout can't enumerate authors nor every version vaults were promoted with,
+    so the buckets to migrate are listed from the registry events through the local index.
+
+    `migration_calldata` moves everything in the upgrade transaction (`upgradeToAndCall`), so
+    the views never miss a vault. `migrate_storage` moves the buckets in batches after the
+    upgrade, for registries too large for one transaction.
+"""
+from scripts.indexer import RegistryIndexer
+
+## Vaults moved per transaction
+MIGRATION_BATCH_SIZE = 50
+
+
+def migration_buckets(indexer: RegistryIndexer):
+    """
+    ([(version, status, count)], [(author, version, count)]) of the vaults known to `indexer`
+    """
+    indexer.sync()
+    production = indexer.db.execute(
+        "SELECT version, status, COUNT(*) FROM production_vaults GROUP BY version, status ORDER BY version, status"
+    ).fetchall()
+    authors = indexer.db.execute(
+        "SELECT author, version, COUNT(*) FROM author_vaults GROUP BY author, version ORDER BY author, version"
+    ).fetchall()
+    return [tuple(row) for row in production], [tuple(row) for row in authors]
+
+
+def migration_calldata(registry, indexer: RegistryIndexer) -> str:
+    """
+    `migrate` calldata indexing the keys and moving every bucket, to pass to `upgradeToAndCall`
+    """
+    production, authors = migration_buckets(indexer)
+    versions = sorted({version for version, _, _ in production})
+    return registry.migrate.encode_input(
+        versions, [author for author, _, _ in authors], [version for _, version, _ in authors]
+    )
+
+
+def migrate_storage(registry, sender, indexer: RegistryIndexer, batch_size: int = MIGRATION_BATCH_SIZE):
+    """
+    Index the keys and move every production and author vault known to `indexer`
+    """
+    production, authors = migration_buckets(indexer)
+    txs = [registry.indexKeys(0, registry.keysCount(), {"from": sender})]
+
+    for version, status, count in production:
+        for _ in range(0, count, batch_size):
+            txs.append(registry.migrateProductionVaults(version, status, batch_size, {"from": sender}))
+
+    for author, version, count in authors:
+        for _ in range(0, count, batch_size):
+            txs.append(registry.migrateVaults(author, version, batch_size, {"from": sender}))
+
+    return txs
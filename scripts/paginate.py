@@ -0,0 +1,96 @@
+"""
+    Stream registry vault lists page by page
+
+    Every page is read at the block the iteration started on, so the pages are consistent
+    with each other even if the registry changes while we read. When a page is too large
+    for the node (gas cap or response size) the page size is halved and the page retried.
+"""
+from brownie import web3
+from brownie.exceptions import VirtualMachineError
+
+DEFAULT_PAGE_SIZE = 100
+
+
+def iter_production_vaults(registry, page_size: int = DEFAULT_PAGE_SIZE, block_identifier=None):
+    """
+    Yield (version, status, vault, metadata) for every production vault, in getProductionVaults order
+    """
+
+    def fetch(offset, limit, block):
+        data, total = registry.getProductionVaultsPage.call(offset, limit, block_identifier=block)
+        items = [(version, status, vault, metadata) for version, status, list_ in data for vault, metadata in list_]
+        return items, total
+
+    yield from _paginate(fetch, page_size, block_identifier)
+
+
+def iter_filtered_production_vaults(
+    registry, version: str, status: int, page_size: int = DEFAULT_PAGE_SIZE, block_identifier=None
+):
+    """
+    Yield the VaultInfo of every production vault of the given version and status
+    """
+
+    def fetch(offset, limit, block):
+        return registry.getFilteredProductionVaultsPage.call(version, status, offset, limit, block_identifier=block), None
+
+    yield from _paginate(fetch, page_size, block_identifier)
+
+
+def iter_vaults(registry, version: str, author: str, page_size: int = DEFAULT_PAGE_SIZE, block_identifier=None):
+    """
+    Yield the VaultInfo of every vault added by `author` under the given version
+    """
+
+    def fetch(offset, limit, block):
+        return registry.getVaultsPage.call(version, author, offset, limit, block_identifier=block), None
+
+    yield from _paginate(fetch, page_size, block_identifier)
+
+
+def iter_authors(registry, page_size: int = DEFAULT_PAGE_SIZE, block_identifier=None):
+    """
+    Yield every author with at least one vault
+    """
+
+    def fetch(offset, limit, block):
+        return registry.getAuthorsPage.call(offset, limit, block_identifier=block), None
+
+    yield from _paginate(fetch, page_size, block_identifier)
+
+
+def iter_author_vaults(registry, author: str, page_size: int = DEFAULT_PAGE_SIZE, block_identifier=None):
+    """
+    Yield the VaultInfo of every vault added by `author`, whatever its version
+    """
+
+    def fetch(offset, limit, block):
+        return registry.getAuthorVaultsPage.call(author, offset, limit, block_identifier=block), None
+
+    yield from _paginate(fetch, page_size, block_identifier)
+
+
+def _paginate(fetch, page_size, block_identifier):
+    """
+    Call `fetch(offset, limit, block)` until the list runs out, yielding items as they arrive
+
+    `fetch` returns the page items and the total count when the view reports one
+    """
+    block = web3.eth.block_number if block_identifier is None else block_identifier
+    offset = 0
+    while True:
+        try:
+            items, total = fetch(offset, page_size, block)
+        except (VirtualMachineError, ValueError, OSError):
+            # Most likely the page hit the node's gas cap or response size limit
+            if page_size == 1:
+                raise
+            page_size //= 2
+            continue
+
+        yield from items
+        offset += len(items)
+
+        done = offset >= total if total is not None else len(items) < page_size
+        if done or not items:
+            return
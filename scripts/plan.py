@@ -0,0 +1,203 @@
+"""
+    Plan and apply registry changes from a desired state file
+
+    The desired state of one chain is a YAML (or JSON) file:
+
+        chainId: 1                      # optional, the plan refuses to run on another chain
+        versions: [v1, v1.5, v2]
+        keys:
+          controller: "0x63cF44B2548e4493Fd099222A1eC79F3344D9682"
+          treasury: treasury.badgerdao.eth
+        productionVaults:
+          "0x6dEf55d2e18486B9dDfaA075bc4e4EE0B28c1545":
+            version: v1
+            status: open
+            metadata: name=BTC-CVX,protocol=Badger,behavior=DCA
+
+    Addresses must be quoted, YAML reads a bare 0x... as a number.
+    `keys` and `productionVaults` are authoritative when present: anything on chain missing
+    from them is deleted or purged. Versions can only be added. Metadata is checked offline
+    and ENS names resolved concurrently before the chain is read. The batch calls of the plan
+    are packed in `multicall` transactions, usually a single one, split under the block gas limit.
+"""
+import json
+from dataclasses import dataclass, field
+
+import click
+import yaml
+from brownie import web3
+
+from scripts.batch import columns, send_batch
+from scripts.helpers.get_address import resolve_addresses
+from scripts.helpers.registry_state import read_state
+from scripts.helpers.verify_metadata import InvalidMetadata, verify_metadata
+
+## BadgerRegistry.VaultStatus
+STATUSES = ["deprecated", "experimental", "guarded", "open"]
+
+## Items per batch call, the calls are then packed in `multicall` transactions under the gas limit
+CALL_SIZE = 50
+
+
+class PlanError(ValueError):
+    pass
+
+
+@dataclass
+class Step:
+    """
+    One batch call of the plan, `items` holds the arguments of each item, e.g. [(vault, status), ...] for demoteMany
+    """
+
+    method: str
+    items: list = field(default_factory=list)
+
+
+def load_desired_state(path: str) -> dict:
+    with open(path) as f:
+        state = json.load(f) if str(path).endswith(".json") else yaml.safe_load(f)
+    return state or {}
+
+
+def normalize_desired_state(state: dict) -> dict:
+    """
+    Check the metadata, resolve ENS names and statuses, raises PlanError listing every problem found
+    """
+    errors = []
+    keys = state.get("keys")
+    vaults = state.get("productionVaults")
+
+    names = list((keys or {}).values()) + list(vaults or {})
+    addresses = resolve_addresses(str(name) for name in names)
+    unresolved = sorted(name for name, address in addresses.items() if address is None)
+    errors += [f"{name} is neither a checksummed address nor an ENS name" for name in unresolved]
+
+    normalized = {"versions": list(state.get("versions") or [])}
+    if keys is not None:
+        normalized["keys"] = {key: addresses[str(value)] for key, value in keys.items()}
+
+    if vaults is not None:
+        normalized["productionVaults"] = {}
+        for name, vault in vaults.items():
+            try:
+                verify_metadata(vault["metadata"])
+            except InvalidMetadata as e:
+                errors.append(f"{name}: {e}")
+            status = vault["status"]
+            if status in STATUSES:
+                status = STATUSES.index(status)
+            elif status not in range(len(STATUSES)):
+                errors.append(f"{name}: unknown status {status}")
+            if vault["version"] not in normalized["versions"]:
+                # Vaults are only listed by getProductionVaults under listed versions
+                normalized["versions"].append(vault["version"])
+            normalized["productionVaults"][addresses[str(name)]] = (vault["version"], status, vault["metadata"])
+
+    if errors:
+        raise PlanError("Invalid desired state:\n" + "\n".join(errors))
+    return normalized
+
+
+def plan_changes(current: dict, desired: dict) -> list:
+    """
+    The fewest calls bringing `current` to `desired`, in the order they must be sent
+    """
+    add_versions = Step("addVersions", [(v,) for v in desired["versions"] if v not in current["versions"]])
+    set_keys, delete_keys = Step("setMany"), Step("deleteKeys")
+    purge, promote, demote = Step("purgeMany"), Step("promoteMany"), Step("demoteMany")
+    update = Step("updateMetadataMany")
+
+    if "keys" in desired:
+        for key, address in desired["keys"].items():
+            if current["keys"].get(key) != address:
+                set_keys.items.append((key, address))
+        delete_keys.items = [(key,) for key in current["keys"] if key not in desired["keys"]]
+
+    if "productionVaults" in desired:
+        for vault, (version, status, metadata) in desired["productionVaults"].items():
+            existing = current["productionVaults"].get(vault)
+            if existing is None or existing[0] != version:
+                # The version of a production vault can't change, it has to be purged first
+                if existing is not None:
+                    purge.items.append((vault,))
+                promote.items.append((vault, version, metadata, status))
+                continue
+            if status > existing[1]:
+                promote.items.append((vault, version, metadata, status))
+            elif status < existing[1]:
+                demote.items.append((vault, status))
+            if metadata != existing[2]:
+                update.items.append((vault, metadata))
+        purge.items += [(vault,) for vault in current["productionVaults"] if vault not in desired["productionVaults"]]
+
+    # Deletions go before sets, deleting a key clears the keyByAddress of its address, which a renamed key keeps.
+    # Purges go first so vaults changing version can be promoted again
+    steps = [add_versions, delete_keys, set_keys, purge, promote, demote, update]
+    return [step for step in steps if step.items]
+
+
+def format_plan(steps: list) -> str:
+    lines = []
+    for step in steps:
+        lines.append(f"{step.method} ({len(step.items)})")
+        lines += [f"  {', '.join(str(arg) for arg in item)}" for item in step.items]
+    return "\n".join(lines) if lines else "Nothing to change"
+
+
+def plan(registry, path: str, block_identifier=None) -> list:
+    """
+    Steps bringing `registry` to the desired state at `path`
+    """
+    state = load_desired_state(path)
+    if state.get("chainId") is not None and state["chainId"] != web3.eth.chain_id:
+        raise PlanError(f"{path} describes chain {state['chainId']}, connected to chain {web3.eth.chain_id}")
+    desired = normalize_desired_state(state)
+    current = read_state(registry, desired.get("productionVaults", {}), block_identifier)
+    return plan_changes(current, desired)
+
+
+def plan_calls(registry, steps: list) -> list:
+    """
+    Calldata of the steps in order, a batch call per CALL_SIZE items and a call per added version
+    """
+    calls = []
+    for step in steps:
+        method = getattr(registry, step.method)
+        if step.method == "addVersions":
+            calls += [method.encode_input(*item) for item in step.items]
+            continue
+        for start in range(0, len(step.items), CALL_SIZE):
+            calls.append(method.encode_input(*columns(step.items[start : start + CALL_SIZE])))
+    return calls
+
+
+def apply_plan(registry, steps: list, sender, gas_limit: int = None) -> list:
+    """
+    Send every step through `multicall`, in as few transactions as the gas limit allows
+
+    `sender` must be the governance (keys and versions) or the strategistGuild (vaults only)
+    """
+    return send_batch(registry.multicall, [(call,) for call in plan_calls(registry, steps)], sender, gas_limit)
+
+
+def main(address, path):
+    """
+    Print the plan, `brownie run plan apply <address> <path>` sends it
+    """
+    from brownie import BadgerRegistry
+
+    steps = plan(BadgerRegistry.at(address), path)
+    print(format_plan(steps))
+    return steps
+
+
+def apply(address, path):
+    from brownie import BadgerRegistry
+
+    from scripts.helpers.connect_account import connect_account
+
+    registry = BadgerRegistry.at(address)
+    steps = main(address, path)
+    if steps and click.confirm("Apply this plan"):
+        return apply_plan(registry, steps, connect_account())
+    return []
@@ -0,0 +1,233 @@
+"""
+    Export a registry to a dump file and replay it into another deployment
+
+    A dump is a JSON lines file, gzipped when its name ends in .gz. The first line is a header
+    with the format version and the block the registry was read at, every other line is one
+    record: a version, a key, a production vault or an author vault.
+
+    Records are replayed in order with batched transactions. After each transaction the number
+    of records applied is saved next to the dump, so an interrupted import resumes where it stopped.
+"""
+import gzip
+import json
+from itertools import groupby, islice
+from pathlib import Path
+
+from brownie import web3
+
+from scripts.batch import chunk_batch, columns
+from scripts.paginate import iter_author_vaults, iter_authors, iter_production_vaults
+
+FORMAT = "badger-registry-dump"
+FORMAT_VERSION = 1
+
+## Record types, in the order they are written and replayed
+VERSION = "version"
+KEY = "key"
+PRODUCTION_VAULT = "productionVault"
+AUTHOR_VAULT = "authorVault"
+
+## Records of a type read from the dump at a time when importing, so a dump is never fully in memory
+READ_SIZE = 500
+
+
+class InvalidDump(ValueError):
+    pass
+
+
+def export_registry(registry, path, block_identifier=None) -> dict:
+    """
+    Write the versions, keys, production vaults and author vaults of `registry` to `path`
+
+    Everything is read at the same block, returns the header
+    """
+    block = web3.eth.block_number if block_identifier is None else block_identifier
+    header = {
+        "format": FORMAT,
+        "formatVersion": FORMAT_VERSION,
+        "chainId": web3.eth.chain_id,
+        "registry": registry.address,
+        "block": block,
+    }
+    with _open(path, "w") as f:
+        _write(f, header)
+        for record in _registry_records(registry, block):
+            _write(f, record)
+    return header
+
+
+def read_dump(path):
+    """
+    Returns the header of a dump and an iterator over its records
+    """
+    f = _open(path, "r")
+    header = json.loads(f.readline() or "null")
+    if not isinstance(header, dict) or header.get("format") != FORMAT:
+        f.close()
+        raise InvalidDump(f"{path} is not a registry dump")
+    if header["formatVersion"] > FORMAT_VERSION:
+        f.close()
+        raise InvalidDump(f"{path} uses format version {header['formatVersion']}, at most {FORMAT_VERSION} is supported")
+
+    def records():
+        with f:
+            for line in f:
+                yield json.loads(line)
+
+    return header, records()
+
+
+def import_registry(registry, path, sender, gas_limit: int = None) -> dict:
+    """
+    Replay the dump at `path` into `registry`, resuming from its checkpoint if there is one
+
+    `sender` must be the registry governance. Author vaults are indexed under whoever adds them,
+    so they can't be replayed and are only counted, their authors have to add them again.
+    Returns the number of records applied and skipped in this run
+    """
+    checkpoint = _checkpoint_path(path)
+    applied = _load_checkpoint(checkpoint, registry)
+    _, records = read_dump(path)
+    versions = set(registry.getAllVersions())
+    report = {"applied": 0, "skipped": 0, "transactions": 0}
+
+    def save(position):
+        checkpoint.write_text(json.dumps({"registry": registry.address, "applied": position}))
+
+    position = 0
+    for record_type, group in _read_groups(records):
+        start = max(applied - position, 0)
+        position += len(group)
+        group = group[start:]
+        if not group:
+            continue
+
+        if record_type == AUTHOR_VAULT:
+            report["skipped"] += len(group)
+            save(position)
+            continue
+
+        if record_type == VERSION:
+            for x, record in enumerate(group):
+                if record["version"] not in versions:
+                    registry.addVersions(record["version"], {"from": sender})
+                    versions.add(record["version"])
+                    report["transactions"] += 1
+                report["applied"] += 1
+                save(position - len(group) + x + 1)
+            continue
+
+        if record_type == KEY:
+            method, items = registry.setMany, [(record["key"], record["address"]) for record in group]
+        elif record_type == PRODUCTION_VAULT:
+            method = registry.promoteMany
+            items = [(record["vault"], record["version"], record["metadata"], record["status"]) for record in group]
+        else:
+            raise InvalidDump(f"Unknown record type {record_type}")
+
+        done = position - len(group)
+        for chunk in chunk_batch(method, items, sender, gas_limit):
+            method(*columns(chunk), {"from": sender})
+            done += len(chunk)
+            report["applied"] += len(chunk)
+            report["transactions"] += 1
+            save(done)
+
+    return report
+
+
+def diff_registry(registry, path, block_identifier=None) -> dict:
+    """
+    Differences between the dump at `path` and `registry`, as {record type: {id: (dumped, actual)}}
+
+    Author vaults are left out as they can't be imported, an empty dict means the import is complete
+    """
+    _, records = read_dump(path)
+    expected = _index(record for record in records if record["type"] != AUTHOR_VAULT)
+    block = web3.eth.block_number if block_identifier is None else block_identifier
+    actual = _index(record for record in _registry_records(registry, block) if record["type"] != AUTHOR_VAULT)
+
+    diff = {}
+    for record_type in (VERSION, KEY, PRODUCTION_VAULT):
+        dumped, found = expected.get(record_type, {}), actual.get(record_type, {})
+        changes = {
+            id_: (dumped.get(id_), found.get(id_))
+            for id_ in sorted(dumped)
+            if dumped[id_] != found.get(id_)
+        }
+        if changes:
+            diff[record_type] = changes
+    return diff
+
+
+def _registry_records(registry, block):
+    for version in registry.getAllVersions.call(block_identifier=block):
+        yield {"type": VERSION, "version": version}
+
+    keys, values = registry.getAllKeyValues.call(block_identifier=block)
+    for key, value in zip(keys, values):
+        yield {"type": KEY, "key": key, "address": str(value)}
+
+    for version, status, vault, metadata in iter_production_vaults(registry, block_identifier=block):
+        yield {"type": PRODUCTION_VAULT, "vault": str(vault), "version": version, "status": int(status), "metadata": metadata}
+
+    for author in iter_authors(registry, block_identifier=block):
+        for vault, version, status, metadata in iter_author_vaults(registry, author, block_identifier=block):
+            yield {"type": AUTHOR_VAULT, "author": str(author), "vault": str(vault), "version": version, "metadata": metadata}
+
+
+def _read_groups(records):
+    """
+    Yield (record type, [record, ...]) of at most READ_SIZE consecutive records of the same type
+    """
+    for record_type, group in groupby(records, key=lambda record: record["type"]):
+        while True:
+            chunk = list(islice(group, READ_SIZE))
+            if not chunk:
+                break
+            yield record_type, chunk
+
+
+def _index(records) -> dict:
+    """
+    {record type: {id: record}}, a version is identified by its name, a key by itself and a vault by its address
+    """
+    ids = {VERSION: "version", KEY: "key", PRODUCTION_VAULT: "vault"}
+    index = {}
+    for record in records:
+        index.setdefault(record["type"], {})[record[ids[record["type"]]]] = record
+    return index
+
+
+def _open(path, mode):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _write(f, record):
+    f.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+
+def _checkpoint_path(path) -> Path:
+    return Path(f"{path}.checkpoint")
+
+
+def _load_checkpoint(checkpoint: Path, registry) -> int:
+    """
+    Number of records already applied to `registry`, a checkpoint left by an import into another registry is an error
+    """
+    if not checkpoint.exists():
+        return 0
+    state = json.loads(checkpoint.read_text())
+    if state["registry"] != registry.address:
+        raise InvalidDump(f"{checkpoint} belongs to an import into {state['registry']}, remove it to start over")
+    return state["applied"]
+
+
+def main(address, path="registry_dump.jsonl.gz"):
+    from brownie import BadgerRegistry
+
+    header = export_registry(BadgerRegistry.at(address), path)
+    print(f"Registry {address} at block {header['block']} exported to {path}")
+    return header
@@ -0,0 +1,800 @@
+"""
+    In-memory model of BadgerRegistry, to test off-chain tooling without a chain
+
+    The model has the call surface of the brownie contract: transactions take a trailing
+    {"from": account} dict and return a transaction whose `events` are the events the registry
+    would emit, views are called directly or through `.call(...)`. Failing calls raise Revert
+    with the registry revert reason and leave the model as it was, batches included.
+    Transactions also have `encode_input`, so their calldata can go through `multicall`, and
+    `estimate_gas`, which runs the call without keeping it as the model has no gas.
+
+    Only the latest state is kept, the `block_identifier` of `.call` is accepted and ignored.
+    tests/test_registry_model.py replays random calls against both to keep them in lockstep.
+"""
+import copy
+import functools
+from collections import defaultdict
+
+from eth_utils import keccak, to_checksum_address
+
+try:
+    from eth_abi import decode, encode
+except ImportError:
+    from eth_abi import decode_abi as decode, encode_abi as encode
+
+from scripts.helpers.state_digest import EMPTY_DIGEST, roll_digest
+from scripts.helpers.verify_metadata import InvalidMetadata, metadata_fields, verify_metadata
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+VAULT_STATUS_LENGTH = 4
+## BadgerRegistry.VaultStatus
+DEPRECATED, EXPERIMENTAL, GUARDED, OPEN = range(VAULT_STATUS_LENGTH)
+MAX_UINT256 = 2**256 - 1
+## Revert reason of OpenZeppelin Address.functionDelegateCall when the call reverted without one
+DELEGATE_CALL_FAILED = "Address: low-level delegate call failed"
+
+
+class Revert(Exception):
+    def __init__(self, revert_msg: str = None):
+        super().__init__(revert_msg)
+        self.revert_msg = revert_msg
+
+
+class EventLog(list):
+    """
+    (name, args) of the events of a transaction in order, `events["NewVault"]` lists the args of the NewVault events
+    """
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return [args for name, args in self if name == key]
+        return super().__getitem__(key)
+
+    def __contains__(self, name):
+        return any(event == name for event, _ in self)
+
+
+class ModelTransaction:
+    def __init__(self, sender: str, events: EventLog):
+        self.sender = sender
+        self.events = events
+
+
+class AddressSet:
+    """
+    OpenZeppelin EnumerableSet.AddressSet, removals move the last value in the freed position
+    """
+
+    def __init__(self):
+        self.values = []
+        self._indexes = {}
+
+    def add(self, value: str) -> bool:
+        if value in self._indexes:
+            return False
+        self.values.append(value)
+        self._indexes[value] = len(self.values) - 1
+        return True
+
+    def remove(self, value: str) -> bool:
+        index = self._indexes.pop(value, None)
+        if index is None:
+            return False
+        last = self.values.pop()
+        if last != value:
+            self.values[index] = last
+            self._indexes[last] = index
+        return True
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        return iter(self.values)
+
+
+class _View:
+    """
+    A view, callable directly or through `.call` like a brownie ContractCall
+    """
+
+    def __init__(self, function):
+        self.function = function
+        functools.update_wrapper(self, function)
+
+    def __get__(self, model, owner=None):
+        if model is None:
+            return self
+        return _BoundView(self.function, model)
+
+
+class _BoundView:
+    def __init__(self, function, model):
+        self.function = function
+        self.model = model
+
+    def __call__(self, *args):
+        return self.function(self.model, *args)
+
+    def call(self, *args, block_identifier=None):
+        return self.function(self.model, *args)
+
+
+def _view(function):
+    return _View(function)
+
+
+class _Transaction:
+    """
+    A transaction with the ABI types of its arguments, see _transaction
+    """
+
+    def __init__(self, function, types):
+        self.function = function
+        self.types = list(types)
+        self.selector = keccak(text=f"{function.__name__}({','.join(types)})")[:4]
+        functools.update_wrapper(self, function)
+
+    def __get__(self, model, owner=None):
+        if model is None:
+            return self
+        return _BoundTransaction(self, model)
+
+
+class _BoundTransaction:
+    def __init__(self, transaction, model):
+        self.transaction = transaction
+        self.model = model
+
+    def __call__(self, *args):
+        return self.model._transact(self.transaction.function, args)
+
+    def encode_input(self, *args) -> str:
+        values = [_abi_value(abi_type, value) for abi_type, value in zip(self.transaction.types, args)]
+        return "0x" + (self.transaction.selector + encode(self.transaction.types, values)).hex()
+
+    def estimate_gas(self, *args) -> int:
+        """
+        Runs the call and rolls it back, 0 unless it reverts
+        """
+        self.model._transact(self.transaction.function, args, commit=False)
+        return 0
+
+
+def _transaction(*types):
+    """
+    A transaction taking arguments of the given ABI types, run all or nothing with
+    the trailing {"from": account} as msg.sender
+    """
+    return lambda function: _Transaction(function, types)
+
+
+def _abi_value(abi_type: str, value):
+    """
+    Accounts and contracts as the addresses eth_abi expects
+    """
+    if abi_type == "address":
+        return _address(value)
+    if abi_type == "address[]":
+        return [_address(item) for item in value]
+    return value
+
+
+def _address(value) -> str:
+    return to_checksum_address(str(getattr(value, "address", value)))
+
+
+def _status(value) -> int:
+    """
+    A VaultStatus argument, out of range values revert like they do when the registry decodes them
+    """
+    _require(0 <= int(value) < VAULT_STATUS_LENGTH)
+    return int(value)
+
+
+def _require(condition: bool, revert_msg: str = None):
+    if not condition:
+        raise Revert(revert_msg)
+
+
+def _verify_metadata(metadata: str):
+    try:
+        verify_metadata(metadata)
+    except InvalidMetadata as e:
+        raise Revert(str(e))
+
+
+def _page_length(total: int, offset: int, limit: int) -> int:
+    if offset >= total:
+        return 0
+    return min(limit, total - offset)
+
+
+class RegistryModel:
+    def __init__(self):
+        self._governance = ZERO_ADDRESS
+        self._developer = ZERO_ADDRESS
+        self._strategist_guild = ZERO_ADDRESS
+
+        self._addresses = {}
+        self._key_by_address = {}
+        self._keys = []
+        self._key_indexes = {}
+        self._versions = []
+        self._keys_revision = 0
+        self._state_digest = EMPTY_DIGEST
+
+        self._interned_versions = []
+        self._version_ids = {}
+
+        ## author => version id => AddressSet, (author, vault) => [status, version id, metadata]
+        self._vaults = defaultdict(lambda: defaultdict(AddressSet))
+        self._vault_infos = {}
+        ## version id => status => AddressSet, vault => [status, version id, metadata]
+        self._production_vaults = defaultdict(lambda: defaultdict(AddressSet))
+        self._production_infos = {}
+        ## version id => [revision of each status]
+        self._production_revisions = defaultdict(lambda: [0] * VAULT_STATUS_LENGTH)
+
+        self._authors = AddressSet()
+        self._vaults_by_author = defaultdict(AddressSet)
+        self._authors_by_vault = defaultdict(AddressSet)
+        ## Protocol (or behavior) value => AddressSet
+        self._by_protocol = defaultdict(AddressSet)
+        self._by_behavior = defaultdict(AddressSet)
+
+        ## (name, args) of every event emitted so far
+        self.logs = EventLog()
+
+    def _transact(self, function, args, commit=True):
+        if not args or not isinstance(args[-1], dict) or "from" not in args[-1]:
+            raise ValueError(f"{function.__name__} expects a trailing {{'from': account}}")
+        # The logs are only appended to once the transaction succeeded, no need to copy them
+        snapshot = copy.deepcopy({name: value for name, value in vars(self).items() if name != "logs"})
+        self._sender = _address(args[-1]["from"])
+        self._events = EventLog()
+        try:
+            function(self, *args[:-1])
+        except Revert:
+            vars(self).update(snapshot)
+            raise
+        if not commit:
+            vars(self).update(snapshot)
+            return None
+        events = self._events
+        self.logs.extend(events)
+        return ModelTransaction(self._sender, events)
+
+    ## Multicall
+
+    @_transaction("bytes[]")
+    def multicall(self, data):
+        """
+        Runs each transaction call in order as the sender, the first revert reverts them all
+        """
+        for call in data:
+            call = bytes.fromhex(call[2:]) if isinstance(call, str) else bytes(call)
+            transaction = TRANSACTIONS.get(call[:4])
+            _require(transaction is not None, DELEGATE_CALL_FAILED)
+            try:
+                transaction.function(self, *decode(transaction.types, call[4:]))
+            except Revert as e:
+                # The revert reason is bubbled up, a revert without one fails the delegate call
+                raise Revert(e.revert_msg or DELEGATE_CALL_FAILED)
+
+    ## Governance
+
+    @_transaction("address", "address")
+    def initialize(self, new_governance, new_strategist_guild):
+        _require(self._governance == ZERO_ADDRESS)
+        self._governance = _address(new_governance)
+        self._strategist_guild = _address(new_strategist_guild)
+        self._developer = ZERO_ADDRESS
+        self._versions += ["v1", "v1.5", "v2"]
+
+    @_transaction("address")
+    def setGovernance(self, new_governance):
+        _require(self._sender == self._governance, "!gov")
+        self._governance = _address(new_governance)
+
+    @_transaction("address")
+    def setDeveloper(self, new_developer):
+        _require(self._sender in (self._governance, self._developer), "!gov")
+        self._developer = _address(new_developer)
+
+    @_transaction("address")
+    def setStrategistGuild(self, new_strategist_guild):
+        _require(self._sender == self._governance, "!gov")
+        self._strategist_guild = _address(new_strategist_guild)
+
+    @_transaction("string")
+    def addVersions(self, version):
+        _require(self._sender == self._governance, "!gov")
+        self._versions.append(version)
+        self._emit("AddVersion", version=version)
+
+    ## Vaults
+
+    @_transaction("address", "string", "string")
+    def add(self, vault, version, metadata):
+        self._add(_address(vault), version, metadata)
+
+    @_transaction("address[]", "string[]", "string[]")
+    def addMany(self, vaults, versions, metadata):
+        _require(len(versions) == len(vaults) and len(metadata) == len(vaults), "BadgerRegistry: length mismatch")
+        for item in zip(vaults, versions, metadata):
+            self._add(_address(item[0]), *item[1:])
+
+    @_transaction("address")
+    def remove(self, vault):
+        vault = _address(vault)
+        info = self._vault_infos.pop((self._sender, vault), None)
+        if info is None:
+            return
+        status, version_id, metadata = info
+        removed = self._vaults[self._sender][version_id].remove(vault)
+        self._unindex_author_vault(self._sender, vault)
+        if removed:
+            self._emit_vault("RemoveVault", vault, self._interned_versions[version_id - 1], metadata)
+
+    @_transaction("address", "string", "string", "uint8")
+    def promote(self, vault, version, metadata, status):
+        self._require_promoter()
+        self._promote(_address(vault), version, metadata, _status(status))
+
+    @_transaction("address[]", "string[]", "string[]", "uint8[]")
+    def promoteMany(self, vaults, versions, metadata, statuses):
+        self._require_promoter()
+        length = len(vaults)
+        _require(
+            len(versions) == length and len(metadata) == length and len(statuses) == length,
+            "BadgerRegistry: length mismatch",
+        )
+        for vault, version, metadata_, status in zip(vaults, versions, metadata, statuses):
+            self._promote(_address(vault), version, metadata_, _status(status))
+
+    @_transaction("address", "uint8")
+    def demote(self, vault, status):
+        self._require_promoter()
+        self._demote(_address(vault), _status(status))
+
+    @_transaction("address[]", "uint8[]")
+    def demoteMany(self, vaults, statuses):
+        self._require_promoter()
+        _require(len(statuses) == len(vaults), "BadgerRegistry: length mismatch")
+        for vault, status in zip(vaults, statuses):
+            self._demote(_address(vault), _status(status))
+
+    @_transaction("address")
+    def purge(self, vault):
+        self._require_curator()
+        self._purge(_address(vault))
+
+    @_transaction("address[]")
+    def purgeMany(self, vaults):
+        self._require_curator()
+        for vault in vaults:
+            self._purge(_address(vault))
+
+    @_transaction("address", "string")
+    def updateMetadata(self, vault, metadata):
+        self._require_curator()
+        self._update_metadata(_address(vault), metadata)
+
+    @_transaction("address[]", "string[]")
+    def updateMetadataMany(self, vaults, metadata):
+        self._require_curator()
+        _require(len(metadata) == len(vaults), "BadgerRegistry: length mismatch")
+        for vault, metadata_ in zip(vaults, metadata):
+            self._update_metadata(_address(vault), metadata_)
+
+    @_transaction("string", "uint8", "uint256")
+    def migrateProductionVaults(self, version, status, count):
+        """
+        No-op, the model has no storage from before the upgrade
+        """
+
+    @_transaction("address", "string", "uint256")
+    def migrateVaults(self, author, version, count):
+        """
+        No-op, the model has no storage from before the upgrade
+        """
+
+    @_transaction("string[]", "address[]", "string[]")
+    def migrate(self, production_versions, authors, versions):
+        """
+        Only indexes the keys, the model has no storage from before the upgrade
+        """
+        _require(len(versions) == len(authors), "BadgerRegistry: length mismatch")
+        for x, key in enumerate(self._keys):
+            self._key_indexes[key] = x + 1
+
+    ## Keys
+
+    @_transaction("string", "address")
+    def set(self, key, at):
+        _require(self._sender == self._governance, "!gov")
+        self._set(key, _address(at))
+
+    @_transaction("string[]", "address[]")
+    def setMany(self, keys, addresses):
+        _require(self._sender == self._governance, "!gov")
+        _require(len(addresses) == len(keys), "BadgerRegistry: length mismatch")
+        for key, at in zip(keys, addresses):
+            self._set(key, _address(at))
+
+    @_transaction("string")
+    def deleteKey(self, key):
+        _require(self._sender == self._governance, "!gov")
+        self._delete_key(key)
+
+    @_transaction("string[]")
+    def deleteKeys(self, keys):
+        _require(self._sender == self._governance, "!gov")
+        for key in keys:
+            self._delete_key(key)
+
+    @_transaction("uint256", "uint256")
+    def indexKeys(self, start, end):
+        for x in range(start, min(end, len(self._keys))):
+            self._key_indexes[self._keys[x]] = x + 1
+
+    ## Views
+
+    @_view
+    def governance(self):
+        return self._governance
+
+    @_view
+    def developer(self):
+        return self._developer
+
+    @_view
+    def strategistGuild(self):
+        return self._strategist_guild
+
+    @_view
+    def VAULT_STATUS_LENGTH(self):
+        return VAULT_STATUS_LENGTH
+
+    @_view
+    def stateDigest(self):
+        return "0x" + self._state_digest.hex()
+
+    @_view
+    def addresses(self, key):
+        return self._addresses.get(key, ZERO_ADDRESS)
+
+    @_view
+    def keyByAddress(self, at):
+        return self._key_by_address.get(_address(at), "")
+
+    @_view
+    def keys(self, index):
+        _require(index < len(self._keys))
+        return self._keys[index]
+
+    @_view
+    def versions(self, index):
+        _require(index < len(self._versions))
+        return self._versions[index]
+
+    @_view
+    def get(self, key):
+        return self._addresses.get(key, ZERO_ADDRESS)
+
+    @_view
+    def getMany(self, keys):
+        return [self._addresses.get(key, ZERO_ADDRESS) for key in keys]
+
+    @_view
+    def keysCount(self):
+        return len(self._keys)
+
+    @_view
+    def getAllKeys(self):
+        return list(self._keys)
+
+    @_view
+    def getAllVersions(self):
+        return list(self._versions)
+
+    @_view
+    def getAllKeyValues(self):
+        return list(self._keys), [self._addresses.get(key, ZERO_ADDRESS) for key in self._keys]
+
+    @_view
+    def vaultInfoByAuthorAndVault(self, author, vault):
+        author, vault = _address(author), _address(vault)
+        return self._vault_info(vault, self._vault_infos.get((author, vault)))
+
+    @_view
+    def productionVaultInfoByVault(self, vault):
+        vault = _address(vault)
+        return self._vault_info(vault, self._production_infos.get(vault))
+
+    @_view
+    def getVaults(self, version, author):
+        return self.getVaultsPage(version, author, 0, MAX_UINT256)
+
+    @_view
+    def getVaultsPage(self, version, author, offset, limit):
+        author = _address(author)
+        vault_set = self._vaults[author][self._version_ids.get(version, 0)]
+        return [self.vaultInfoByAuthorAndVault(author, vault) for vault in _page(vault_set, offset, limit)]
+
+    @_view
+    def getFilteredProductionVaults(self, version, status):
+        return self.getFilteredProductionVaultsPage(version, status, 0, MAX_UINT256)
+
+    @_view
+    def getFilteredProductionVaultsPage(self, version, status, offset, limit):
+        vault_set = self._production_vaults[self._version_ids.get(version, 0)][_status(status)]
+        return [self.productionVaultInfoByVault(vault) for vault in _page(vault_set, offset, limit)]
+
+    @_view
+    def getProductionVaults(self):
+        return [
+            (version, status, [(vault, self._production_infos[vault][2]) for vault in self._bucket(version, status)])
+            for version in self._versions
+            for status in range(VAULT_STATUS_LENGTH)
+        ]
+
+    @_view
+    def getProductionVaultsPage(self, offset, limit):
+        buckets = [(version, status) for version in self._versions for status in range(VAULT_STATUS_LENGTH)]
+        total = sum(len(self._bucket(*bucket)) for bucket in buckets)
+        page_end = offset + _page_length(total, offset, limit)
+
+        data, bucket_start = [], 0
+        for version, status in buckets:
+            if bucket_start >= page_end:
+                break
+            vault_set = self._bucket(version, status)
+            bucket_end = bucket_start + len(vault_set)
+            if len(vault_set) > 0 and bucket_end > offset:
+                start, end = max(offset - bucket_start, 0), min(page_end, bucket_end) - bucket_start
+                vaults = vault_set.values[start:end]
+                data.append((version, status, [(vault, self._production_infos[vault][2]) for vault in vaults]))
+            bucket_start = bucket_end
+        return data, total
+
+    @_view
+    def getProductionVaultsByStatus(self, status_mask, versions):
+        _require(0 <= status_mask < 2**8)
+        return [
+            (vault, version, status, self._production_infos[vault][2])
+            for version in versions or self._versions
+            for status in range(VAULT_STATUS_LENGTH)
+            if status_mask >> status & 1
+            for vault in self._bucket(version, status)
+        ]
+
+    @_view
+    def getProductionVaultsByProtocol(self, protocol):
+        return [self.productionVaultInfoByVault(vault) for vault in self._by_protocol[protocol].values]
+
+    @_view
+    def getProductionVaultsByBehavior(self, behavior):
+        return [self.productionVaultInfoByVault(vault) for vault in self._by_behavior[behavior].values]
+
+    @_view
+    def authorsCount(self):
+        return len(self._authors)
+
+    @_view
+    def getAuthors(self):
+        return list(self._authors.values)
+
+    @_view
+    def getAuthorsPage(self, offset, limit):
+        return _page(self._authors, offset, limit)
+
+    @_view
+    def getVaultAuthors(self, vault):
+        return list(self._authors_by_vault[_address(vault)].values)
+
+    @_view
+    def getAuthorVaults(self, author):
+        return self.getAuthorVaultsPage(author, 0, MAX_UINT256)
+
+    @_view
+    def getAuthorVaultsPage(self, author, offset, limit):
+        author = _address(author)
+        vaults = _page(self._vaults_by_author[author], offset, limit)
+        return [self.vaultInfoByAuthorAndVault(author, vault) for vault in vaults]
+
+    @_view
+    def getRevisions(self):
+        bucket_revisions = [
+            revision
+            for version in self._versions
+            for revision in self._production_revisions[self._version_ids.get(version, 0)]
+        ]
+        return self._keys_revision, bucket_revisions, "0x" + self._state_digest.hex()
+
+    ## Internals, named after their BadgerRegistry counterparts
+
+    def _add(self, vault, version, metadata):
+        _verify_metadata(metadata)
+        existing = self._vault_infos.get((self._sender, vault))
+        if existing is not None:
+            _require(
+                existing[1] == self._version_ids.get(version, 0) and existing[2] == metadata,
+                "BadgerRegistry: vault info changed. Please remove before add changed vault info",
+            )
+            return
+
+        version_id = self._intern_version(version)
+        self._vault_infos[(self._sender, vault)] = [EXPERIMENTAL, version_id, metadata]
+        self._vaults[self._sender][version_id].add(vault)
+        self._index_author_vault(self._sender, vault)
+        self._emit_vault("NewVault", vault, version, metadata)
+
+    def _promote(self, vault, version, metadata, status):
+        _verify_metadata(metadata)
+        actual_status = EXPERIMENTAL if self._sender == self._developer else status
+
+        existing = self._production_infos.get(vault)
+        existing_status = DEPRECATED if existing is None else existing[0]
+        if existing is not None:
+            version_id = existing[1]
+            _require(
+                version_id == self._version_ids.get(version, 0),
+                "BadgerRegistry: vault info changed. Please demote before promote changed vault info",
+            )
+            existing[0] = actual_status
+        else:
+            version_id = self._intern_version(version)
+            self._production_infos[vault] = [actual_status, version_id, metadata]
+            self._index_metadata(vault, metadata)
+        _require(actual_status >= existing_status, "BadgerRegistry: Vault is not being promoted")
+
+        if self._production_vaults[version_id][actual_status].add(vault):
+            for lower_status in range(actual_status):
+                self._production_vaults[version_id][lower_status].remove(vault)
+            self._bump_production_revision(version_id, actual_status)
+            if existing is not None:
+                self._bump_production_revision(version_id, existing_status)
+            self._emit_production("PromoteVault", vault, version, metadata, actual_status)
+
+    def _demote(self, vault, status):
+        existing = self._production_infos.get(vault)
+        _require(existing is not None, "BadgerRegistry: Vault does not exist")
+        existing_status, version_id, metadata = existing
+        _require(status < existing_status, "BadgerRegistry: Vault is not being demoted")
+
+        self._production_vaults[version_id][existing_status].remove(vault)
+        existing[0] = status
+        self._emit_production("DemoteVault", vault, self._interned_versions[version_id - 1], metadata, status)
+        self._production_vaults[version_id][status].add(vault)
+        self._bump_production_revision(version_id, existing_status)
+        self._bump_production_revision(version_id, status)
+
+    def _purge(self, vault):
+        existing = self._production_infos.get(vault)
+        _require(existing is not None, "BadgerRegistry: Vault does not exist")
+        status, version_id, metadata = existing
+
+        self._production_vaults[version_id][status].remove(vault)
+        self._unindex_metadata(vault, metadata)
+        del self._production_infos[vault]
+        self._bump_production_revision(version_id, status)
+        self._emit_production("PurgeVault", vault, self._interned_versions[version_id - 1], metadata, status)
+
+    def _update_metadata(self, vault, metadata):
+        _verify_metadata(metadata)
+        existing = self._production_infos.get(vault)
+        _require(existing is not None, "BadgerRegistry: Vault does not exist")
+        status, version_id, old_metadata = existing
+
+        self._unindex_metadata(vault, old_metadata)
+        existing[2] = metadata
+        self._index_metadata(vault, metadata)
+        self._bump_production_revision(version_id, status)
+        self._emit_vault(
+            "UpdateVaultMetadata", vault, self._interned_versions[version_id - 1], metadata, sender_field="caller"
+        )
+
+    def _set(self, key, at):
+        if key not in self._key_indexes:
+            self._keys.append(key)
+            self._key_indexes[key] = len(self._keys)
+            self._emit("AddKey", key=key)
+        self._addresses[key] = at
+        self._key_by_address[at] = key
+        self._keys_revision += 1
+        self._emit("Set", key=key, at=at)
+
+    def _delete_key(self, key):
+        self._key_by_address.pop(self._addresses.get(key, ZERO_ADDRESS), None)
+        index = self._key_indexes.pop(key, None)
+        if index is None:
+            return
+        self._addresses.pop(key, None)
+
+        # Move the last key in the freed position, like the registry
+        last_key = self._keys.pop()
+        if index != len(self._keys) + 1:
+            self._keys[index - 1] = last_key
+            self._key_indexes[last_key] = index
+        self._keys_revision += 1
+        self._emit("DeleteKey", key=key)
+
+    def _intern_version(self, version) -> int:
+        if version not in self._version_ids:
+            self._interned_versions.append(version)
+            self._version_ids[version] = len(self._interned_versions)
+        return self._version_ids[version]
+
+    def _vault_info(self, vault, info) -> tuple:
+        if info is None:
+            return (ZERO_ADDRESS, "", DEPRECATED, "")
+        status, version_id, metadata = info
+        return (vault, self._interned_versions[version_id - 1], status, metadata)
+
+    def _bucket(self, version, status) -> AddressSet:
+        return self._production_vaults[self._version_ids.get(version, 0)][status]
+
+    def _bump_production_revision(self, version_id, status):
+        self._production_revisions[version_id][status] += 1
+
+    def _index_author_vault(self, author, vault):
+        self._vaults_by_author[author].add(vault)
+        self._authors_by_vault[vault].add(author)
+        self._authors.add(author)
+
+    def _unindex_author_vault(self, author, vault):
+        self._vaults_by_author[author].remove(vault)
+        self._authors_by_vault[vault].remove(author)
+        if len(self._vaults_by_author[author]) == 0:
+            self._authors.remove(author)
+
+    def _index_metadata(self, vault, metadata):
+        protocol, behavior = metadata_fields(metadata)
+        self._by_protocol[protocol].add(vault)
+        self._by_behavior[behavior].add(vault)
+
+    def _unindex_metadata(self, vault, metadata):
+        protocol, behavior = metadata_fields(metadata)
+        self._by_protocol[protocol].remove(vault)
+        self._by_behavior[behavior].remove(vault)
+
+    def _require_promoter(self):
+        _require(self._sender in (self._governance, self._strategist_guild, self._developer), "!auth")
+
+    def _require_curator(self):
+        _require(self._sender in (self._governance, self._strategist_guild), "!auth")
+
+    def _emit_vault(self, name, vault, version, metadata, sender_field="author"):
+        self._emit(
+            name,
+            vault=vault,
+            versionHash="0x" + keccak(text=version).hex(),
+            **{sender_field: self._sender},
+            version=version,
+            metadata=metadata,
+        )
+
+    def _emit_production(self, name, vault, version, metadata, status):
+        self._emit(
+            name,
+            vault=vault,
+            versionHash="0x" + keccak(text=version).hex(),
+            status=status,
+            caller=self._sender,
+            version=version,
+            metadata=metadata,
+        )
+
+    def _emit(self, name, **args):
+        self._events.append((name, args))
+        self._state_digest = roll_digest(self._state_digest, name, args)
+
+
+## Selector => transaction, the calls multicall can decode
+TRANSACTIONS = {item.selector: item for item in vars(RegistryModel).values() if isinstance(item, _Transaction)}
+
+
+def _page(vault_set: AddressSet, offset: int, limit: int) -> list:
+    return vault_set.values[offset : offset + _page_length(len(vault_set), offset, limit)]
@@ -0,0 +1,172 @@
+"""
+    Snapshot the registry of every configured network concurrently
+
+    Each network gets a pooled keep-alive HTTP session and every read is pinned to the block
+    the snapshot started on. Snapshots are normalized so they can be compared across chains,
+    and `diff_keys` reports the keys that are missing on some of them.
+"""
+import asyncio
+import itertools
+import json
+import os
+
+import aiohttp
+from eth_utils import function_abi_to_4byte_selector, to_checksum_address
+
+try:
+    from eth_abi import decode, encode
+except ImportError:
+    from eth_abi import decode_abi as decode, encode_abi as encode
+
+from scripts.helpers.networks import NETWORKS, REGISTRY_ADDRESS
+
+## Keys every chain is expected to have, see README
+CONSISTENT_KEYS = [
+    "controller",
+    "guardian",
+    "keeper",
+    "badgerTree",
+    "governance",
+    "developer",
+    "proxyAdminDev",
+    "proxyAdminTimelock",
+    "governanceTimelock",
+    "timelock",
+    "keeperAccessControl",
+    "rewardsLogger",
+    "BADGER",
+]
+
+PAGE_SIZE = 100
+MAX_CONNECTIONS_PER_HOST = 8
+
+
+class RpcError(Exception):
+    pass
+
+
+class AsyncRegistryReader:
+    """
+    Reads one registry over raw JSON-RPC, reusing the connections of `session`
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, session, rpc_url: str, address: str, abi: list):
+        self.session = session
+        self.rpc_url = rpc_url
+        self.address = address
+        self.functions = {item["name"]: item for item in abi if item["type"] == "function"}
+
+    async def request(self, method: str, params: list):
+        payload = {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}
+        async with self.session.post(self.rpc_url, json=payload) as response:
+            response.raise_for_status()
+            body = await response.json(content_type=None)
+        if "error" in body:
+            raise RpcError(f"{method} failed: {body['error']}")
+        return body["result"]
+
+    async def call(self, name: str, *args, block: int):
+        abi = self.functions[name]
+        data = function_abi_to_4byte_selector(abi) + encode([_abi_type(i) for i in abi["inputs"]], list(args))
+        result = await self.request("eth_call", [{"to": self.address, "data": "0x" + data.hex()}, hex(block)])
+        return decode([_abi_type(o) for o in abi["outputs"]], bytes.fromhex(result[2:]))
+
+    async def snapshot(self) -> dict:
+        block = int(await self.request("eth_blockNumber", []), 16)
+        chain_id, (keys, values), (versions,), vaults = await asyncio.gather(
+            self.request("eth_chainId", []),
+            self.call("getAllKeyValues", block=block),
+            self.call("getAllVersions", block=block),
+            self.production_vaults(block),
+        )
+        return {
+            "chainId": int(chain_id, 16),
+            "block": block,
+            "registry": self.address,
+            "keys": {key: to_checksum_address(value) for key, value in zip(keys, values)},
+            "versions": list(versions),
+            "productionVaults": vaults,
+        }
+
+    async def production_vaults(self, block: int) -> list:
+        vaults = []
+        offset, total = 0, None
+        while total is None or offset < total:
+            data, total = await self.call("getProductionVaultsPage", offset, PAGE_SIZE, block=block)
+            for version, status, list_ in data:
+                for vault, metadata in list_:
+                    vaults.append(
+                        {"vault": to_checksum_address(vault), "version": version, "status": status, "metadata": metadata}
+                    )
+            offset += PAGE_SIZE
+        return sorted(vaults, key=lambda vault: (vault["version"], vault["status"], vault["vault"]))
+
+
+async def snapshot_networks(networks: dict, abi: list) -> dict:
+    """
+    Snapshot every network concurrently, `networks` maps a name to its (rpc_url, registry address)
+
+    A network that fails for any reason (RPC error, unreachable node, no registry at the address, ...)
+    is reported with an "error" entry instead of failing the others
+    """
+
+    async def snapshot(rpc_url, address):
+        connector = aiohttp.TCPConnector(limit_per_host=MAX_CONNECTIONS_PER_HOST, keepalive_timeout=30)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            return await AsyncRegistryReader(session, rpc_url, address, abi).snapshot()
+
+    names = list(networks)
+    results = await asyncio.gather(*(snapshot(*networks[name]) for name in names), return_exceptions=True)
+    snapshots = {}
+    for name, result in zip(names, results):
+        if isinstance(result, BaseException):
+            result = {"error": f"{type(result).__name__}: {result}"}
+        snapshots[name] = result
+    return snapshots
+
+
+def diff_keys(snapshots: dict, expected=CONSISTENT_KEYS) -> dict:
+    """
+    Keys missing on some networks, as {key: [networks missing it]}
+
+    Every key listed on any network is checked, plus the `expected` ones
+    """
+    snapshots = {name: snapshot for name, snapshot in snapshots.items() if "error" not in snapshot}
+    keys = set(expected)
+    for snapshot in snapshots.values():
+        keys.update(snapshot["keys"])
+
+    missing = {}
+    for key in sorted(keys):
+        networks = [name for name, snapshot in snapshots.items() if key not in snapshot["keys"]]
+        if networks:
+            missing[key] = networks
+    return missing
+
+
+def _abi_type(param: dict) -> str:
+    """
+    ABI type string of a parameter, with tuples spelled out as (type,...)
+    """
+    if not param["type"].startswith("tuple"):
+        return param["type"]
+    inner = ",".join(_abi_type(component) for component in param["components"])
+    return f"({inner}){param['type'][len('tuple'):]}"
+
+
+def main(output="snapshot.json"):
+    from brownie import BadgerRegistry
+
+    networks = {name: (os.getenv(variable), REGISTRY_ADDRESS) for name, variable in NETWORKS.items() if os.getenv(variable)}
+    snapshots = asyncio.run(snapshot_networks(networks, BadgerRegistry.abi))
+    report = {"snapshots": snapshots, "missingKeys": diff_keys(snapshots)}
+
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    for name, snapshot in snapshots.items():
+        if "error" in snapshot:
+            print(f"Snapshot of {name} failed: {snapshot['error']}")
+    print(f"Snapshot of {', '.join(networks)} written to {output}")
+    return report
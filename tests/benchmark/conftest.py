@@ -0,0 +1,103 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+BASELINE_PATH = Path(__file__).parent.joinpath("baseline.json")
+REPORT_PATH = Path(os.getenv("BENCHMARK_REPORT", "benchmark_report.json"))
+
+## A metric fails when it uses this much more gas than the baseline, 0.05 is 5%
+THRESHOLD = float(os.getenv("BENCHMARK_THRESHOLD", "0.05"))
+UPDATE_BASELINE = os.getenv("BENCHMARK_UPDATE_BASELINE") == "1"
+
+## (before, after) groups printed side by side at the end of the run, see test_gas_storage_layout
+COMPARISONS = [("layout-v0.2.1", "layout-packed")]
+
+_report = None
+
+
+class GasReport:
+    def __init__(self, baseline=None):
+        ## None when no baseline was committed yet
+        self.baseline = baseline
+        self.results = {}
+
+    def record(self, group: str, metric: str, gas_used: int):
+        self.results.setdefault(group, {})[metric] = gas_used
+
+    def regressions(self, group: str):
+        """
+        Metrics of `group` that went over the baseline by more than THRESHOLD, or that are missing from it
+
+        A None gas means the call doesn't fit in a block, it's only a regression when the baseline call did
+        """
+        baseline = (self.baseline or {}).get(group, {})
+        regressions = {}
+        for metric, gas_used in self.results.get(group, {}).items():
+            if metric not in baseline:
+                regressions[metric] = ("missing", gas_used)
+                continue
+            expected = baseline[metric]
+            if expected is None:
+                continue
+            if gas_used is None or gas_used > expected * (1 + THRESHOLD):
+                regressions[metric] = (expected, gas_used)
+        return regressions
+
+    def check(self, group: str):
+        """
+        Fail on the regressions of `group`, skip when there is no baseline to compare against
+        """
+        if UPDATE_BASELINE:
+            return
+        if self.baseline is None:
+            pytest.skip(
+                f"No {BASELINE_PATH.name} to compare against, gas only written to {REPORT_PATH}. "
+                "Generate it with BENCHMARK_UPDATE_BASELINE=1 and commit it"
+            )
+        regressions = self.regressions(group)
+        assert regressions == {}, f"Gas regressions of {group} (baseline, now): {regressions}"
+
+    def compare(self, before: str, after: str) -> dict:
+        """
+        {metric: (gas in `before`, gas in `after`, change in %)} of the metrics both groups recorded
+        """
+        before_results, after_results = self.results.get(before, {}), self.results.get(after, {})
+        comparison = {}
+        for metric in sorted(before_results.keys() & after_results.keys()):
+            old, new = before_results[metric], after_results[metric]
+            change = None if not old or new is None else (new - old) * 100 / old
+            comparison[metric] = (old, new, change)
+        return comparison
+
+    def write(self):
+        REPORT_PATH.write_text(json.dumps(self.results, indent=2, sort_keys=True))
+        if UPDATE_BASELINE:
+            BASELINE_PATH.write_text(json.dumps(self.results, indent=2, sort_keys=True))
+
+
+@pytest.fixture(scope="session")
+def gas_report():
+    global _report
+    baseline = None
+    if not UPDATE_BASELINE and BASELINE_PATH.exists():
+        baseline = json.loads(BASELINE_PATH.read_text())
+    report = _report = GasReport(baseline)
+    yield report
+    if report.results:
+        report.write()
+
+
+def pytest_terminal_summary(terminalreporter):
+    if _report is None:
+        return
+    for before, after in COMPARISONS:
+        comparison = _report.compare(before, after)
+        if not comparison:
+            continue
+        terminalreporter.section(f"gas {before} -> {after}")
+        terminalreporter.write_line(f"{'metric':<32}{before:>16}{after:>16}{'change':>10}")
+        for metric, (old, new, change) in comparison.items():
+            change = "" if change is None else f"{change:+.1f}%"
+            terminalreporter.write_line(f"{metric:<32}{str(old):>16}{str(new):>16}{change:>10}")
@@ -0,0 +1,88 @@
+"""
+    Import time and per-call latency of the brownie-free client against brownie
+
+    BENCHMARK=1 brownie test tests/benchmark/test_client.py --network development -s
+
+    Both read the same registry from the same node, so the difference is the client overhead:
+    imports, middlewares, ABI decoding and formatting of the results.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from brownie import web3
+
+from badger_registry import RegistryClient
+from scripts.batch import send_batch
+
+pytestmark = pytest.mark.skipif(os.getenv("BENCHMARK") != "1", reason="set BENCHMARK=1 to run the benchmarks")
+
+ROOT = Path(__file__).parents[2]
+IMPORT_RUNS = 5
+CALL_RUNS = 50
+VAULTS = 200
+METADATA = "name=BTC-CVX,protocol=Badger,behavior=DCA"
+
+
+def import_seconds(statement: str) -> float:
+    """
+    Best of IMPORT_RUNS fresh interpreters, so nothing is already imported
+    """
+    timer = f"import time; start = time.perf_counter(); {statement}; print(time.perf_counter() - start)"
+    runs = [
+        float(subprocess.run([sys.executable, "-c", timer], cwd=ROOT, capture_output=True, check=True, text=True).stdout)
+        for _ in range(IMPORT_RUNS)
+    ]
+    return min(runs)
+
+
+def call_latency(call) -> float:
+    """
+    Median seconds of CALL_RUNS calls, after one warm up call
+    """
+    call()
+    runs = []
+    for _ in range(CALL_RUNS):
+        start = time.perf_counter()
+        call()
+        runs.append(time.perf_counter() - start)
+    return statistics.median(runs)
+
+
+def test_import_time():
+    client = import_seconds("import badger_registry")
+    brownie = import_seconds("import brownie")
+    print(f"\nimport badger_registry {client * 1000:.1f}ms, import brownie {brownie * 1000:.1f}ms")
+    assert client < brownie
+
+
+def test_call_latency(registry, gov):
+    vaults = [web3.toChecksumAddress(f"0x{x + 1:040x}") for x in range(VAULTS)]
+    send_batch(registry.setMany, [(f"key{x:05}", vault) for x, vault in enumerate(vaults)], gov)
+    send_batch(registry.promoteMany, [(vault, "v1", METADATA, x % 4) for x, vault in enumerate(vaults)], gov)
+
+    client = RegistryClient(web3.provider.endpoint_uri, registry.address)
+    block = web3.eth.block_number
+    calls = {
+        "get": (lambda: client.get("key00000", block), lambda: registry.get.call("key00000", block_identifier=block)),
+        "getAllKeyValues": (
+            lambda: client.get_all_key_values(block),
+            lambda: registry.getAllKeyValues.call(block_identifier=block),
+        ),
+        "getFilteredProductionVaults": (
+            lambda: client.get_filtered_production_vaults("v1", 3, block),
+            lambda: registry.getFilteredProductionVaults.call("v1", 3, block_identifier=block),
+        ),
+        "getProductionVaults": (
+            lambda: client.get_production_vaults(block),
+            lambda: registry.getProductionVaults.call(block_identifier=block),
+        ),
+    }
+
+    print(f"\n{'view':<32}{'client ms':>12}{'brownie ms':>12}")
+    for name, (client_call, brownie_call) in calls.items():
+        print(f"{name:<32}{call_latency(client_call) * 1000:>12.2f}{call_latency(brownie_call) * 1000:>12.2f}")
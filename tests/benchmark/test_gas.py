@@ -0,0 +1,121 @@
+"""
+    Gas used by every registry entry point as the registry grows
+
+    BENCHMARK=1 brownie test tests/benchmark --network development
+
+    Results are written to benchmark_report.json. With BENCHMARK_UPDATE_BASELINE=1 they also
+    become the new tests/benchmark/baseline.json, which later runs are compared against.
+"""
+import os
+
+import pytest
+from brownie import BadgerRegistry, LegacyBadgerRegistry, web3
+from brownie.exceptions import VirtualMachineError
+
+from scripts.batch import send_batch
+
+pytestmark = pytest.mark.skipif(os.getenv("BENCHMARK") != "1", reason="set BENCHMARK=1 to run the gas benchmarks")
+
+SIZES = [int(size) for size in os.getenv("BENCHMARK_SIZES", "10,100,1000,5000").split(",")]
+## One extra version is added for every VAULTS_PER_VERSION vaults
+VAULTS_PER_VERSION = 100
+## Vaults of the v0.2.1 and packed layout comparison, filled one call at a time as v0.2.1 has no batches
+LAYOUT_SIZE = int(os.getenv("BENCHMARK_LAYOUT_SIZE", "100"))
+LAYOUTS = {"v0.2.1": LegacyBadgerRegistry, "packed": BadgerRegistry}
+METADATA = "name=BTC-CVX,protocol=Badger,behavior=DCA"
+
+
+def vault_address(x: int) -> str:
+    return web3.toChecksumAddress(f"0x{x + 1:040x}")
+
+
+def fill_registry(registry, size, gov, author):
+    """
+    Register `size` keys, production vaults spread over versions and statuses, and author vaults
+    """
+    versions = ["v1", "v1.5", "v2"]
+    for x in range(size // VAULTS_PER_VERSION):
+        versions.append(f"v{x + 3}")
+        registry.addVersions(versions[-1], {"from": gov})
+
+    send_batch(registry.setMany, [(f"key{x:05}", vault_address(x)) for x in range(size)], gov)
+    send_batch(
+        registry.promoteMany,
+        [(vault_address(x), versions[x % len(versions)], METADATA, x % 4) for x in range(size)],
+        gov,
+    )
+    send_batch(registry.addMany, [(vault_address(x), versions[x % len(versions)], METADATA) for x in range(size)], author)
+
+
+def view_gas(method, *args):
+    """
+    eth_call gas of a view, None when the view doesn't fit in a block anymore
+    """
+    try:
+        return method.estimate_gas(*args)
+    except (VirtualMachineError, ValueError):
+        return None
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_gas_scaling(registry, gov, rando, size, gas_report):
+    fill_registry(registry, size, gov, rando)
+    group = str(size)
+    vault = vault_address(size)
+    key = f"key{size:05}"
+
+    gas_report.record(group, "add", registry.add(vault, "v1", METADATA, {"from": rando}).gas_used)
+    gas_report.record(group, "remove", registry.remove(vault, {"from": rando}).gas_used)
+
+    gas_report.record(group, "promote", registry.promote(vault, "v1", METADATA, 1, {"from": gov}).gas_used)
+    gas_report.record(group, "promote_existing", registry.promote(vault, "v1", METADATA, 3, {"from": gov}).gas_used)
+    gas_report.record(group, "updateMetadata", registry.updateMetadata(vault, METADATA, {"from": gov}).gas_used)
+    gas_report.record(group, "demote", registry.demote(vault, 0, {"from": gov}).gas_used)
+    gas_report.record(group, "purge", registry.purge(vault, {"from": gov}).gas_used)
+
+    gas_report.record(group, "set", registry.set(key, vault, {"from": gov}).gas_used)
+    gas_report.record(group, "set_existing", registry.set(key, gov, {"from": gov}).gas_used)
+    gas_report.record(group, "deleteKeys", registry.deleteKeys([f"key{size // 2:05}"], {"from": gov}).gas_used)
+
+    gas_report.record(group, "get", view_gas(registry.get, key))
+    gas_report.record(group, "getVaults", view_gas(registry.getVaults, "v1", rando))
+    gas_report.record(group, "getFilteredProductionVaults", view_gas(registry.getFilteredProductionVaults, "v1", 3))
+    gas_report.record(group, "getProductionVaults", view_gas(registry.getProductionVaults))
+    gas_report.record(group, "getProductionVaultsPage", view_gas(registry.getProductionVaultsPage, 0, 100))
+    gas_report.record(group, "getProductionVaultsByStatus", view_gas(registry.getProductionVaultsByStatus, 0x0C, []))
+    gas_report.record(group, "getRevisions", view_gas(registry.getRevisions))
+    gas_report.record(group, "getProductionVaultsByProtocol", view_gas(registry.getProductionVaultsByProtocol, "Badger"))
+
+    gas_report.check(group)
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_gas_storage_layout(gov, strategistGuild, rando, layout, gas_report):
+    """
+    Same calls on v0.2.1 and the current registry, `layout-v0.2.1` and `layout-packed` give the gas before and after
+    """
+    registry = LAYOUTS[layout].deploy({"from": gov})
+    registry.initialize(gov, strategistGuild, {"from": gov})
+    for x in range(LAYOUT_SIZE):
+        registry.add(vault_address(x), "v1", METADATA, {"from": rando})
+        registry.promote(vault_address(x), "v1", METADATA, x % 4, {"from": gov})
+    group = f"layout-{layout}"
+    vault = vault_address(LAYOUT_SIZE)
+
+    gas_report.record(group, "add", registry.add(vault, "v1", METADATA, {"from": rando}).gas_used)
+    gas_report.record(group, "remove", registry.remove(vault, {"from": rando}).gas_used)
+    gas_report.record(group, "promote", registry.promote(vault, "v1", METADATA, 1, {"from": gov}).gas_used)
+    gas_report.record(group, "promote_existing", registry.promote(vault, "v1", METADATA, 3, {"from": gov}).gas_used)
+    gas_report.record(group, "updateMetadata", registry.updateMetadata(vault, METADATA, {"from": gov}).gas_used)
+    gas_report.record(group, "demote", registry.demote(vault, 0, {"from": gov}).gas_used)
+    gas_report.record(group, "purge", registry.purge(vault, {"from": gov}).gas_used)
+    gas_report.record(group, "set", registry.set("controller", vault, {"from": gov}).gas_used)
+
+    gas_report.record(group, "getVaults", view_gas(registry.getVaults, "v1", rando))
+    gas_report.record(group, "getFilteredProductionVaults", view_gas(registry.getFilteredProductionVaults, "v1", 3))
+    gas_report.record(group, "getProductionVaults", view_gas(registry.getProductionVaults))
+    gas_report.record(
+        group, "productionVaultInfoByVault", view_gas(registry.productionVaultInfoByVault, vault_address(0))
+    )
+
+    gas_report.check(group)
@@ -1,5 +1,11 @@
+import shutil
+import socket
+import subprocess
+import time
+
 import pytest
 from brownie import *
+from web3 import Web3
 
 
 @pytest.fixture
@@ -55,3 +61,39 @@ def vault_four():
 @pytest.fixture(autouse=True)
 def isolation(fn_isolation):
     pass
+
+
+## Chain id of the second dev chain, the brownie one is 1337
+OTHER_CHAIN_ID = 1338
+
+
+@pytest.fixture(scope="module")
+def other_chain():
+    """
+    RPC url of a second ganache on another chain id, the other tests share the brownie dev chain
+    """
+    executable = shutil.which("ganache-cli") or shutil.which("ganache")
+    if executable is None:
+        pytest.skip("ganache is needed to launch a second chain")
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    process = subprocess.Popen(
+        [executable, "--port", str(port), "--chainId", str(OTHER_CHAIN_ID)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    rpc = f"http://127.0.0.1:{port}"
+    w3 = Web3(Web3.HTTPProvider(rpc))
+    for _ in range(60):
+        try:
+            w3.eth.chain_id
+            break
+        except Exception:
+            time.sleep(0.5)
+    else:
+        process.terminate()
+        pytest.fail("The second ganache didn't start")
+    yield rpc
+    process.terminate()
+    process.wait()
@@ -60,3 +60,37 @@ def test_user_can_add_remove_multiple_vaults(registry, vault_one, vault_two, vau
     
     # NOTE: Order of entries change when vaults are removed from sets
     assert registry.getVaults("v1", rando) == [[vault3, "v1", "1", "name=MATIC-CVX,protocol=Badger,behavior=DCA"], [vault2, "v1", "1", "name=ETH-CVX,protocol=Badger,behavior=DCA"]]
+
+
+def test_vault_info_getters(registry, vault, vault_one, rando, gov):
+    registry.add(vault, "v1.5", "name=BTC-CVX,protocol=Badger,behavior=DCA", {"from": rando})
+    registry.promote(vault_one, "v2", "name=ETH-CVX,protocol=Badger,behavior=DCA", 3, {"from": gov})
+
+    assert registry.vaultInfoByAuthorAndVault(rando, vault) == [vault, "v1.5", 1, "name=BTC-CVX,protocol=Badger,behavior=DCA"]
+    assert registry.productionVaultInfoByVault(vault_one) == [vault_one, "v2", 3, "name=ETH-CVX,protocol=Badger,behavior=DCA"]
+
+    # Unknown vaults are empty
+    assert registry.vaultInfoByAuthorAndVault(gov, vault) == [ZERO_ADDRESS, "", 0, ""]
+    assert registry.productionVaultInfoByVault(vault) == [ZERO_ADDRESS, "", 0, ""]
+
+
+def test_vault_version_must_match(registry, vault, rando, gov):
+    registry.add(vault, "v1", "name=BTC-CVX,protocol=Badger,behavior=DCA", {"from": rando})
+    with brownie.reverts("BadgerRegistry: vault info changed. Please remove before add changed vault info"):
+        registry.add(vault, "v2", "name=BTC-CVX,protocol=Badger,behavior=DCA", {"from": rando})
+
+    registry.promote(vault, "v1", "name=BTC-CVX,protocol=Badger,behavior=DCA", 1, {"from": gov})
+    with brownie.reverts("BadgerRegistry: vault info changed. Please demote before promote changed vault info"):
+        registry.promote(vault, "unknown", "name=BTC-CVX,protocol=Badger,behavior=DCA", 2, {"from": gov})
+
+
+def test_migration_without_legacy_vaults_is_noop(registry, vault, rando, gov):
+    registry.add(vault, "v1", "name=BTC-CVX,protocol=Badger,behavior=DCA", {"from": rando})
+    registry.promote(vault, "v1", "name=BTC-CVX,protocol=Badger,behavior=DCA", 2, {"from": gov})
+
+    # Anyone can migrate, nothing is left in the legacy layout of a fresh registry
+    registry.migrateProductionVaults("v1", 2, 10, {"from": rando})
+    registry.migrateVaults(rando, "v1", 10, {"from": rando})
+
+    assert registry.getVaults("v1", rando) == [[vault, "v1", "1", "name=BTC-CVX,protocol=Badger,behavior=DCA"]]
+    assert registry.getFilteredProductionVaults("v1", 2) == [[vault, "v1", "2", "name=BTC-CVX,protocol=Badger,behavior=DCA"]]
@@ -0,0 +1,29 @@
+import brownie
+from brownie import ZERO_ADDRESS, accounts
+
+from scripts.address_book import load_address_book, resolve_keys
+
+
+def test_bulk_key_views(registry, gov):
+    registry.setMany(["controller", "guardian", "keeper"], [accounts[3], accounts[4], accounts[5]], {"from": gov})
+    registry.deleteKey("controller", {"from": gov})
+
+    assert registry.getAllKeys() == ["keeper", "guardian"]
+    assert registry.getAllKeyValues() == (["keeper", "guardian"], [accounts[5], accounts[4]])
+    assert registry.getMany(["guardian", "controller", "unknown"]) == [accounts[4], ZERO_ADDRESS, ZERO_ADDRESS]
+
+    registry.addVersions("v3", {"from": gov})
+    assert registry.getAllVersions() == ["v1", "v1.5", "v2", "v3"]
+
+
+def test_address_book(registry, gov):
+    assert load_address_book(registry) == {}
+
+    registry.setMany(["controller", "guardian"], [accounts[3], accounts[4]], {"from": gov})
+    assert load_address_book(registry) == {"controller": accounts[3], "guardian": accounts[4]}
+    assert resolve_keys(registry, ["guardian", "badgerTree"]) == {"guardian": accounts[4], "badgerTree": ZERO_ADDRESS}
+    ## Any iterable of keys, generators included
+    assert resolve_keys(registry, (key for key in ["controller", "guardian"])) == {
+        "controller": accounts[3],
+        "guardian": accounts[4],
+    }
@@ -0,0 +1,49 @@
+import brownie
+from brownie import ZERO_ADDRESS, accounts
+
+from scripts.paginate import iter_authors, iter_author_vaults
+
+
+def test_author_index(registry, vault_one, vault_two, vault_three, rando, user):
+    assert registry.getAuthors() == []
+    assert registry.getAuthorVaults(rando) == []
+
+    registry.add(vault_one, "v1", "name=BTC-CVX,protocol=Badger,behavior=DCA", {"from": rando})
+    registry.add(vault_two, "v2", "name=ETH-CVX,protocol=Badger,behavior=DCA", {"from": rando})
+    registry.add(vault_one, "v1.5", "name=BTC-CVX,protocol=Badger,behavior=DCA", {"from": user})
+    ## Adding the same vault twice doesn't list it twice
+    registry.add(vault_one, "v1", "name=BTC-CVX,protocol=Badger,behavior=DCA", {"from": rando})
+
+    assert registry.authorsCount() == 2
+    assert registry.getAuthors() == [rando, user]
+    assert registry.getVaultAuthors(vault_one) == [rando, user]
+    assert registry.getVaultAuthors(vault_three) == []
+
+    ## Vaults across versions in a single call
+    vaults = registry.getAuthorVaults(rando)
+    assert [(vault[0], vault[1]) for vault in vaults] == [(vault_one, "v1"), (vault_two, "v2")]
+    assert vaults == registry.getVaults("v1", rando) + registry.getVaults("v2", rando)
+
+    registry.remove(vault_one, {"from": rando})
+    assert registry.getVaultAuthors(vault_one) == [user]
+    assert registry.getAuthorVaults(rando) == registry.getVaults("v2", rando)
+
+    ## Authors without vaults are dropped
+    registry.remove(vault_one, {"from": user})
+    assert registry.getAuthors() == [rando]
+    assert registry.getVaultAuthors(vault_one) == []
+
+
+def test_author_index_pages(registry, vault_one, vault_two, vault_three, rando):
+    for x in range(3):
+        registry.add(vault_one, "v1", "name=BTC-CVX,protocol=Badger,behavior=DCA", {"from": accounts[x + 3]})
+    registry.add(vault_two, "v1", "name=ETH-CVX,protocol=Badger,behavior=DCA", {"from": rando})
+    registry.add(vault_three, "v2", "name=MATIC-CVX,protocol=Badger,behavior=DCA", {"from": rando})
+
+    authors = registry.getAuthors()
+    assert registry.getAuthorsPage(1, 2) == authors[1:3]
+    assert registry.getAuthorsPage(10, 2) == []
+    assert list(iter_authors(registry, page_size=2)) == authors
+
+    assert registry.getAuthorVaultsPage(rando, 1, 5) == registry.getAuthorVaults(rando)[1:]
+    assert list(iter_author_vaults(registry, rando, page_size=1)) == registry.getAuthorVaults(rando)
@@ -0,0 +1,145 @@
+import brownie
+from brownie import ZERO_ADDRESS, accounts
+
+from scripts.batch import chunk_batch, send_batch
+
+
+def test_promote_many(registry, vault_one, vault_two, vault_three, rando, gov):
+    vaults = [vault_one, vault_two, vault_three]
+    versions = ["v1", "v1", "v2"]
+    metadata = [
+        "name=BTC-CVX,protocol=Badger,behavior=DCA",
+        "name=ETH-CVX,protocol=Badger,behavior=DCA",
+        "name=MATIC-CVX,protocol=Badger,behavior=DCA",
+    ]
+
+    with brownie.reverts("!auth"):
+        registry.promoteMany(vaults, versions, metadata, [3, 2, 1], {"from": rando})
+
+    with brownie.reverts("BadgerRegistry: length mismatch"):
+        registry.promoteMany(vaults, versions, metadata, [3, 2], {"from": gov})
+
+    tx = registry.promoteMany(vaults, versions, metadata, [3, 2, 1], {"from": gov})
+    assert len(tx.events["PromoteVault"]) == 3
+    assert registry.getFilteredProductionVaults("v1", 3) == [[vault_one, "v1", "3", metadata[0]]]
+    assert registry.getFilteredProductionVaults("v1", 2) == [[vault_two, "v1", "2", metadata[1]]]
+    assert registry.getFilteredProductionVaults("v2", 1) == [[vault_three, "v2", "1", metadata[2]]]
+
+
+def test_promote_many_by_developer_is_capped(registry, vault_one, vault_two, devGov):
+    registry.promoteMany(
+        [vault_one, vault_two],
+        ["v1", "v1"],
+        ["name=BTC-CVX,protocol=Badger,behavior=DCA", "name=ETH-CVX,protocol=Badger,behavior=DCA"],
+        [3, 2],
+        {"from": devGov},
+    )
+    assert len(registry.getFilteredProductionVaults("v1", 1)) == 2
+
+
+def test_batch_is_all_or_nothing(registry, vault_one, vault_two, gov):
+    ## The second item has bad metadata, so the first one isn't promoted either
+    with brownie.reverts("BadgerRegistry: Invalid Name"):
+        registry.promoteMany(
+            [vault_one, vault_two],
+            ["v1", "v1"],
+            ["name=BTC-CVX,protocol=Badger,behavior=DCA", "DCA-ETH-CVX"],
+            [3, 3],
+            {"from": gov},
+        )
+    assert registry.getFilteredProductionVaults("v1", 3) == []
+
+
+def test_demote_purge_many(registry, vault_one, vault_two, rando, gov, devGov, strategistGuild):
+    metadata = "name=BTC-CVX,protocol=Badger,behavior=DCA"
+    registry.promoteMany([vault_one, vault_two], ["v1", "v1"], [metadata, metadata], [3, 3], {"from": gov})
+
+    with brownie.reverts("!auth"):
+        registry.demoteMany([vault_one, vault_two], [0, 1], {"from": rando})
+
+    tx = registry.demoteMany([vault_one, vault_two], [0, 1], {"from": devGov})
+    assert len(tx.events["DemoteVault"]) == 2
+    assert registry.getFilteredProductionVaults("v1", 0) == [[vault_one, "v1", "0", metadata]]
+    assert registry.getFilteredProductionVaults("v1", 1) == [[vault_two, "v1", "1", metadata]]
+
+    with brownie.reverts("!auth"):
+        registry.purgeMany([vault_one, vault_two], {"from": devGov})
+
+    tx = registry.purgeMany([vault_one, vault_two], {"from": strategistGuild})
+    assert len(tx.events["PurgeVault"]) == 2
+    assert registry.getFilteredProductionVaults("v1", 0) == []
+    assert registry.getFilteredProductionVaults("v1", 1) == []
+
+
+def test_set_add_many(registry, vault_one, vault_two, rando, gov):
+    with brownie.reverts("!gov"):
+        registry.setMany(["controller"], [accounts[5]], {"from": rando})
+
+    tx = registry.setMany(["controller", "ibBTC"], [accounts[5], accounts[6]], {"from": gov})
+    assert len(tx.events["Set"]) == 2
+    assert registry.get("controller") == accounts[5]
+    assert registry.get("ibBTC") == accounts[6]
+    assert registry.keysCount() == 2
+
+    metadata = "name=BTC-CVX,protocol=Badger,behavior=DCA"
+    tx = registry.addMany([vault_one, vault_two], ["v1", "v1"], [metadata, metadata], {"from": rando})
+    assert len(tx.events["NewVault"]) == 2
+    assert registry.getVaults("v1", rando) == [[vault_one, "v1", "1", metadata], [vault_two, "v1", "1", metadata]]
+
+
+def test_multicall(registry, vault_one, rando, gov):
+    metadata = "name=BTC-CVX,protocol=Convex,behavior=DCA"
+    calls = [
+        registry.promote.encode_input(vault_one, "v1", "name=BTC-CVX,protocol=Badger,behavior=DCA", 3),
+        registry.updateMetadata.encode_input(vault_one, metadata),
+    ]
+
+    ## Every call is authorized against the sender of the multicall
+    with brownie.reverts("!auth"):
+        registry.multicall(calls, {"from": rando})
+
+    tx = registry.multicall(calls, {"from": gov})
+    assert list(tx.events.keys()) == ["PromoteVault", "UpdateVaultMetadata"]
+    assert registry.productionVaultInfoByVault(vault_one) == [vault_one, "v1", 3, metadata]
+
+
+def test_send_batch_in_chunks(registry, gov):
+    items = [(f"key{x}", accounts[x % 10]) for x in range(12)]
+
+    ## Room for roughly 5 keys per transaction
+    single = registry.setMany.estimate_gas(["key"], [accounts[0]], {"from": gov})
+    chunks = list(chunk_batch(registry.setMany, items, gov, gas_limit=single * 5))
+    assert len(chunks) > 1
+    assert [item for chunk in chunks for item in chunk] == items
+
+    txs = send_batch(registry.setMany, items, gov, gas_limit=single * 5)
+    assert len(txs) == len(chunks)
+    assert registry.keysCount() == 12
+    assert all(registry.get(key) == at for key, at in items)
+
+
+def test_send_batch_estimates_after_previous_chunk(registry, vault_one, gov):
+    metadata = ["name=BTC-CVX,protocol=Convex,behavior=DCA", "name=BTC-CVX,protocol=Curve,behavior=DCA"]
+    promote = registry.promote.encode_input(vault_one, "v1", "name=BTC-CVX,protocol=Badger,behavior=DCA", 3)
+    ## The updates revert until the vault is promoted, which only the first chunk does
+    items = [(promote,)] + [(registry.updateMetadata.encode_input(vault_one, item),) for item in metadata]
+    gas_limit = registry.multicall.estimate_gas([promote], {"from": gov})
+
+    txs = send_batch(registry.multicall, items, gov, gas_limit=gas_limit)
+    assert len(txs) > 1
+    assert registry.productionVaultInfoByVault(vault_one)[3] == metadata[1]
+
+
+def test_update_metadata_many(registry, vault_one, vault_two, rando, gov):
+    registry.promote(vault_one, "v1", "name=BTC-CVX,protocol=Badger,behavior=DCA", 3, {"from": gov})
+    registry.promote(vault_two, "v1", "name=ETH-CVX,protocol=Badger,behavior=DCA", 3, {"from": gov})
+    metadata = ["name=BTC-CVX,protocol=Convex,behavior=DCA", "name=ETH-CVX,protocol=Convex,behavior=DCA"]
+
+    with brownie.reverts("!auth"):
+        registry.updateMetadataMany([vault_one, vault_two], metadata, {"from": rando})
+    with brownie.reverts("BadgerRegistry: length mismatch"):
+        registry.updateMetadataMany([vault_one, vault_two], metadata[:1], {"from": gov})
+
+    tx = registry.updateMetadataMany([vault_one, vault_two], metadata, {"from": gov})
+    assert len(tx.events["UpdateVaultMetadata"]) == 2
+    assert [info[3] for info in registry.getFilteredProductionVaults("v1", 3)] == metadata
@@ -0,0 +1,80 @@
+import threading
+import time
+
+from brownie import chain
+
+from scripts.cache import RegistryCache
+
+METADATA = "name=BTC-CVX,protocol=Badger,behavior=DCA"
+
+
+def test_cache_hits_and_invalidation(registry, vault_one, vault_two, gov):
+    registry.set("controller", vault_one, {"from": gov})
+    registry.promote(vault_one, "v1", METADATA, 1, {"from": gov})
+    cache = RegistryCache(registry)
+
+    assert cache.get("controller") == vault_one
+    assert cache.get_filtered_production_vaults("v1", 1) == registry.getFilteredProductionVaults("v1", 1)
+    assert cache.get_filtered_production_vaults("v2", 1) == []
+    cache.get_production_vaults()
+    cache.get("controller")
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 4
+
+    ## Cached values stay pinned to the cache block until refreshed
+    registry.set("controller", vault_two, {"from": gov})
+    registry.promote(vault_two, "v1", METADATA, 1, {"from": gov})
+    assert cache.get("controller") == vault_one
+
+    assert cache.refresh() == chain.height
+    ## Only the v2 bucket survives
+    assert cache.stats()["invalidations"] == 3
+    assert cache.get("controller") == vault_two
+    assert cache.get_filtered_production_vaults("v1", 1) == registry.getFilteredProductionVaults("v1", 1)
+    assert cache.get_production_vaults() == registry.getProductionVaults()
+    cache.get_filtered_production_vaults("v2", 1)
+    assert cache.stats()["hits"] == 3
+
+
+def test_cache_evicts_least_recently_used(registry, gov):
+    cache = RegistryCache(registry, max_entries=2)
+    cache.get("a")
+    cache.get("b")
+    cache.get("a")
+    cache.get("c")
+
+    assert cache.stats()["evictions"] == 1
+    cache.get("a")
+    cache.get("b")
+    assert cache.stats()["misses"] == 4
+
+
+def test_cache_coalesces_concurrent_misses(registry, vault_one, gov):
+    registry.set("controller", vault_one, {"from": gov})
+    cache = RegistryCache(registry)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("controller"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert results == [vault_one] * 8
+    assert stats["misses"] == 1
+    assert stats["hits"] + stats["coalesced"] == 7
+
+
+def test_cache_refreshes_after_max_age(registry, vault_one, vault_two, gov):
+    registry.set("controller", vault_one, {"from": gov})
+    cache = RegistryCache(registry, max_age=0.5)
+    assert cache.get("controller") == vault_one
+
+    registry.set("controller", vault_two, {"from": gov})
+    ## Still within max_age, the snapshot is served
+    assert cache.get("controller") == vault_one
+    time.sleep(0.6)
+    assert cache.get("controller") == vault_two
+    assert cache.block == chain.height
+    assert cache.stats()["invalidations"] == 1
@@ -0,0 +1,89 @@
+import pytest
+from brownie import LegacyBadgerRegistry, accounts, chain, web3
+
+from scripts.checkpoints import RegistryCheckpoints
+from scripts.helpers.registry_state import read_state
+
+METADATA = "name=BTC-CVX,protocol=Badger,behavior=DCA"
+
+
+def test_state_at_matches_chain(registry, gov, strategistGuild, vault_one, vault_two, vault_three, tmp_path):
+    start = web3.eth.block_number
+    registry.promote(vault_one, "v1", METADATA, 3, {"from": gov})
+    registry.set("controller", accounts[3], {"from": gov})
+    registry.promote(vault_two, "v2", METADATA, 2, {"from": strategistGuild})
+    registry.add(vault_three, "v1", METADATA, {"from": accounts[4]})
+    registry.demote(vault_one, 1, {"from": gov})
+    registry.updateMetadata(vault_two, "name=ETH-CVX,protocol=Convex,behavior=DCA", {"from": gov})
+    registry.set("controller", accounts[4], {"from": gov})
+    registry.promote(vault_three, "v1", METADATA, 3, {"from": gov})
+    registry.purge(vault_one, {"from": gov})
+    registry.deleteKey("controller", {"from": gov})
+    chain.mine(3)
+
+    db_path = str(tmp_path.joinpath("checkpoints.db"))
+    checkpoints = RegistryCheckpoints(registry, db_path=db_path, start_block=start, interval=3, confirmations=0)
+    assert checkpoints.sync() == web3.eth.block_number
+
+    for block in range(start, web3.eth.block_number + 1):
+        expected = read_state(registry, block_identifier=block)
+        state = checkpoints.state_at(block)
+        assert state["productionVaults"] == expected["productionVaults"], block
+        assert state["keys"] == expected["keys"], block
+
+    assert checkpoints.production_vaults(start + 3, status=2) == [
+        (vault_two, "v2", 2, "name=BTC-CVX,protocol=Badger,behavior=DCA")
+    ]
+    checkpointed = [block for (block,) in checkpoints.db.execute("SELECT block FROM checkpoints")]
+    assert checkpointed == list(range(start - 1, web3.eth.block_number + 1, 3))
+
+    ## Reopening resumes from the cursor
+    registry.promote(vault_one, "v2", METADATA, 3, {"from": gov})
+    reopened = RegistryCheckpoints(registry, db_path=db_path, interval=3, confirmations=0)
+    assert reopened.sync() == web3.eth.block_number
+    assert reopened.production_vaults(web3.eth.block_number, status=3) == sorted(
+        [(vault_one, "v2", 3, METADATA), (vault_three, "v1", 3, METADATA)]
+    )
+
+
+def test_start_at_head_seeds_from_chain(registry, gov, vault_one, vault_two):
+    registry.promote(vault_one, "v1", METADATA, 3, {"from": gov})
+    registry.promote(vault_two, "v2", METADATA, 2, {"from": gov})
+    registry.set("controller", accounts[3], {"from": gov})
+    seed = web3.eth.block_number
+
+    checkpoints = RegistryCheckpoints(registry, start_block="head", interval=2, confirmations=0)
+    registry.demote(vault_one, 1, {"from": gov})
+    registry.updateMetadata(vault_two, "name=ETH-CVX,protocol=Convex,behavior=DCA", {"from": gov})
+    registry.deleteKey("controller", {"from": gov})
+
+    assert checkpoints.sync() == web3.eth.block_number
+    for block in range(seed, web3.eth.block_number + 1):
+        expected = read_state(registry, block_identifier=block)
+        state = checkpoints.state_at(block)
+        assert state["productionVaults"] == expected["productionVaults"], block
+        assert state["keys"] == expected["keys"], block
+    with pytest.raises(ValueError, match="before the first checkpoint"):
+        checkpoints.state_at(seed - 1)
+
+
+def test_legacy_registry(gov, strategistGuild, vault_one, vault_two):
+    start = web3.eth.block_number + 1
+    legacy = LegacyBadgerRegistry.deploy({"from": gov})
+    legacy.initialize(gov, strategistGuild, {"from": gov})
+    legacy.promote(vault_one, "v1", METADATA, 3, {"from": gov})
+    legacy.promote(vault_two, "v1", METADATA, 2, {"from": gov})
+    legacy.demote(vault_one, 1, {"from": gov})
+    legacy.purge(vault_two, {"from": gov})
+    legacy.set("controller", accounts[3], {"from": gov})
+
+    ## Unindexed v0.2.1 events are replayed from the deploy block
+    checkpoints = RegistryCheckpoints(legacy, start_block=start, confirmations=0)
+    checkpoints.sync()
+    state = checkpoints.state_at(web3.eth.block_number)
+    assert state["productionVaults"] == {vault_one: ("v1", 1, METADATA)}
+    assert state["keys"] == {"controller": accounts[3]}
+
+    ## v0.2.1 has none of the views seeding from the head reads
+    with pytest.raises(ValueError, match="Can't read the registry state"):
+        RegistryCheckpoints(legacy, start_block="head", confirmations=0)
@@ -0,0 +1,96 @@
+import pytest
+from brownie import ZERO_ADDRESS, BadgerRegistry, accounts, web3
+from eth_utils import function_abi_to_4byte_selector, keccak, to_checksum_address
+from eth_utils.abi import collapse_if_tuple
+
+from badger_registry import RegistryClient, RpcError, VaultInfo
+from badger_registry.abi import decode, encode, load_functions
+from badger_registry.checksum import keccak256, to_checksum_address as checksum
+
+
+def test_abi_matches_contract():
+    functions = {item["name"]: item for item in BadgerRegistry.abi if item["type"] == "function"}
+    for name, function in load_functions().items():
+        abi = functions[name]
+        assert abi["stateMutability"] == "view"
+        assert function["selector"] == "0x" + function_abi_to_4byte_selector(abi).hex()
+        assert function["inputs"] == [collapse_if_tuple(i) for i in abi["inputs"]]
+        assert function["outputs"] == [collapse_if_tuple(o) for o in abi["outputs"]]
+
+
+def test_codec_round_trip():
+    types = ["(string,uint8,(address,string)[])[]", "uint256", "bytes32"]
+    vault = to_checksum_address("0x" + "ab" * 20)
+    values = [[("v1", 3, [(vault.lower(), "name=a")]), ("v2", 0, [])], 5, "0x" + "11" * 32]
+    ## Addresses are decoded checksummed, whatever their case when encoded
+    assert decode(types, encode(types, values)) == [
+        [("v1", 3, [(vault, "name=a")]), ("v2", 0, [])],
+        5,
+        "0x" + "11" * 32,
+    ]
+
+
+def test_checksum():
+    for data in [b"", b"registry", bytes(135), bytes(136), bytes(range(256))]:
+        assert keccak256(data) == keccak(data)
+    for account in accounts:
+        assert checksum(account.address.lower()) == account.address
+
+
+def test_client_matches_brownie(registry, gov, rando, vault_one, vault_two, vault_three):
+    registry.setMany(["controller", "guardian"], [accounts[3], accounts[4]], {"from": gov})
+    registry.promote(vault_one, "v1", "name=BTC-CVX,protocol=Convex,behavior=DCA", 3, {"from": gov})
+    registry.promote(vault_two, "v2", "name=ETH-CVX,protocol=Badger,behavior=Compounder", 1, {"from": gov})
+    registry.add(vault_three, "v1", "name=BTC-CRV,protocol=Curve,behavior=DCA", {"from": rando})
+
+    client = RegistryClient(web3.provider.endpoint_uri, registry.address)
+    assert client.block_number() == web3.eth.block_number
+    assert client.get("controller") == registry.get("controller")
+    assert client.get_many(["guardian", "missing"]) == list(registry.getMany(["guardian", "missing"]))
+    assert client.get_all_key_values() == dict(zip(*registry.getAllKeyValues()))
+    assert client.get_all_versions() == registry.getAllVersions()
+
+    assert client.get_filtered_production_vaults("v1", 3) == [
+        VaultInfo(vault_one, "v1", 3, "name=BTC-CVX,protocol=Convex,behavior=DCA")
+    ]
+    production = client.get_production_vaults()
+    assert [(data.version, data.status) for data in production] == [
+        (version, status) for version, status, _ in registry.getProductionVaults()
+    ]
+    assert [[item.vault for item in data.list] for data in production] == [
+        [vault for vault, _ in items] for _, _, items in registry.getProductionVaults()
+    ]
+    assert client.get_production_vaults_by_protocol("Badger")[0].vault == vault_two
+    assert client.get_production_vaults_by_behavior("DCA")[0].metadata == "name=BTC-CVX,protocol=Convex,behavior=DCA"
+    assert client.get_production_vaults_by_status(["open", "experimental"]) == [
+        VaultInfo(vault_one, "v1", 3, "name=BTC-CVX,protocol=Convex,behavior=DCA"),
+        VaultInfo(vault_two, "v2", 1, "name=ETH-CVX,protocol=Badger,behavior=Compounder"),
+    ]
+    assert client.get_vaults("v1", rando)[0].vault == vault_three
+    assert client.get_author_vaults(rando)[0].vault == vault_three
+
+    assert client.production_vault_info(vault_two).status == 1
+    assert client.production_vault_info(vault_three) is None
+    keys_revision, bucket_revisions, digest = client.get_revisions()
+    assert keys_revision == registry.getRevisions()[0]
+    assert bucket_revisions == list(registry.getRevisions()[1])
+    assert digest == client.state_digest() == registry.stateDigest()
+
+
+def test_client_pins_block(registry, gov, vault_one):
+    registry.promote(vault_one, "v1", "name=BTC-CVX,protocol=Convex,behavior=DCA", 3, {"from": gov})
+    block = web3.eth.block_number
+    registry.demote(vault_one, 1, {"from": gov})
+
+    client = RegistryClient(web3.provider.endpoint_uri, registry.address)
+    assert client.production_vault_info(vault_one, block=block).status == 3
+    assert client.production_vault_info(vault_one).status == 1
+
+
+def test_client_errors(registry):
+    client = RegistryClient(web3.provider.endpoint_uri, registry.address)
+    ## Out of bounds, reverts
+    with pytest.raises(RpcError):
+        client.call("keys", 100)
+    with pytest.raises(KeyError):
+        client.call("set", "controller", ZERO_ADDRESS)
@@ -23,7 +23,7 @@ def test_vault_demote(registry, vault, vault_two, rando, gov):
     assert registry.getFilteredProductionVaults("v1", 1) == [[vault, "v1", "1", "name=BTC-CVX,protocol=Badger,behavior=DCA"]]
 
     event = tx.events["DemoteVault"][0]
-    assert event["author"] == gov
+    assert event["caller"] == gov
     assert event["version"] == "v1"
     assert event["metadata"] == "name=BTC-CVX,protocol=Badger,behavior=DCA"
     assert event["vault"] == vault
@@ -34,7 +34,7 @@ def test_vault_demote(registry, vault, vault_two, rando, gov):
     assert registry.getFilteredProductionVaults("v1", 0) == [[vault, "v1", "0", "name=BTC-CVX,protocol=Badger,behavior=DCA"]]
 
     event = tx.events["DemoteVault"][0]
-    assert event["author"] == gov
+    assert event["caller"] == gov
     assert event["version"] == "v1"
     assert event["metadata"] == "name=BTC-CVX,protocol=Badger,behavior=DCA"
     assert event["vault"] == vault
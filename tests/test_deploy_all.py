@@ -0,0 +1,124 @@
+import json
+
+import pytest
+from brownie import AdminUpgradeabilityProxy, BadgerRegistry, accounts, web3
+from eth_account import Account
+from web3 import Web3
+
+from scripts.deploy_all import DeployError, deploy_all, verify_network
+
+METADATA = "name=BTC-CVX,protocol=Badger,behavior=DCA"
+
+ARTIFACTS = {
+    container._name: {"abi": container.abi, "bytecode": container.bytecode}
+    for container in (BadgerRegistry, AdminUpgradeabilityProxy)
+}
+
+
+@pytest.fixture
+def deployer():
+    deployer = accounts.add()
+    accounts[0].transfer(deployer, "10 ether")
+    return Account.from_key(deployer.private_key)
+
+
+def network_config(rpc=None):
+    return {
+        "rpc": rpc or web3.provider.endpoint_uri,
+        "proxyAdmin": accounts[7].address,
+        "governance": accounts[0].address,
+        "strategistGuild": accounts[1].address,
+    }
+
+
+def test_deploy_all(deployer, tmp_path):
+    ## Two configs on the same dev chain deploy concurrently with shared nonces,
+    ## test_deploy_all_chains covers separate chains
+    state_path = tmp_path / "state.json"
+    results = deploy_all({"one": network_config(), "two": network_config()}, deployer, ARTIFACTS, state_path)
+
+    for result in results.values():
+        assert result["verified"]
+        registry = BadgerRegistry.at(result["proxy"]["address"])
+        assert registry.governance() == accounts[0]
+        assert registry.strategistGuild() == accounts[1]
+    assert results["one"]["proxy"] != results["two"]["proxy"]
+    assert json.loads(state_path.read_text()) == results
+
+    ## Done networks are left alone
+    nonce = web3.eth.get_transaction_count(deployer.address)
+    assert deploy_all({"one": network_config()}, deployer, ARTIFACTS, state_path)["one"] == results["one"]
+    assert web3.eth.get_transaction_count(deployer.address) == nonce
+
+
+def test_deploy_all_resumes_failed_network(deployer, tmp_path):
+    state_path = tmp_path / "state.json"
+    results = deploy_all(
+        {"one": network_config(), "down": network_config("http://127.0.0.1:1")}, deployer, ARTIFACTS, state_path
+    )
+    assert results["one"]["verified"]
+    assert "error" in results["down"]
+
+    results = deploy_all({"one": network_config(), "down": network_config()}, deployer, ARTIFACTS, state_path)
+    assert results["down"]["verified"]
+    assert "error" not in results["one"]
+
+
+def test_verify_network(deployer, tmp_path):
+    result = deploy_all({"one": network_config()}, deployer, ARTIFACTS, tmp_path / "state.json")["one"]
+
+    config = {**network_config(), "strategistGuild": accounts[2].address}
+    with pytest.raises(DeployError, match="strategistGuild"):
+        verify_network(web3, result["proxy"]["address"], result["logic"]["address"], config, BadgerRegistry.abi)
+
+
+def test_deploy_all_chains(deployer, other_chain, tmp_path):
+    other = Web3(Web3.HTTPProvider(other_chain))
+    other.eth.send_transaction({"from": other.eth.accounts[0], "to": deployer.address, "value": 10**19})
+
+    results = deploy_all(
+        {"dev": network_config(), "other": network_config(other_chain)}, deployer, ARTIFACTS, tmp_path / "state.json"
+    )
+    assert results["dev"]["verified"] and results["other"]["verified"]
+    assert results["dev"]["chainId"] == web3.eth.chain_id
+    assert results["other"]["chainId"] == other.eth.chain_id != web3.eth.chain_id
+    ## Nonces are tracked per chain, the other chain only saw its own two deploys
+    assert other.eth.get_code(results["other"]["proxy"]["address"])
+    assert other.eth.get_transaction_count(deployer.address) == 2
+
+
+def test_upgrade_existing_proxy(deployer, gov, vault_one, tmp_path):
+    deployed = deploy_all({"one": network_config()}, deployer, ARTIFACTS, tmp_path / "deploy.json")["one"]
+    proxy = deployed["proxy"]["address"]
+    BadgerRegistry.at(proxy).promote(vault_one, "v1", METADATA, 3, {"from": gov})
+
+    ## The deployer isn't the proxy admin, the run stops with what the admin has to send
+    state_path = tmp_path / "upgrade.json"
+    config = {**network_config(), "proxy": proxy}
+    result = deploy_all({"one": config}, deployer, ARTIFACTS, state_path)["one"]
+    logic = result["logic"]["address"]
+    assert logic != deployed["logic"]["address"]
+    assert f"must send upgradeTo({logic})" in result["error"]
+
+    AdminUpgradeabilityProxy.at(proxy).upgradeTo(logic, {"from": accounts[7]})
+    result = deploy_all({"one": config}, deployer, ARTIFACTS, state_path)["one"]
+    assert result["verified"] and "block" in result["migrate"]
+    assert BadgerRegistry.at(proxy).getFilteredProductionVaults("v1", 3) == [(vault_one, "v1", 3, METADATA)]
+
+    ## Upgraded networks are left alone
+    nonce = web3.eth.get_transaction_count(deployer.address)
+    assert deploy_all({"one": config}, deployer, ARTIFACTS, state_path)["one"] == result
+    assert web3.eth.get_transaction_count(deployer.address) == nonce
+
+
+def test_dropped_transaction(deployer, tmp_path):
+    ## A transaction the node doesn't know about, as if it was dropped from the mempool
+    state_path = tmp_path / "state.json"
+    state_path.write_text(json.dumps({"one": {"logic": {"tx": "0x" + "ab" * 32}}}))
+    config = {**network_config(), "receiptTimeout": 1}
+
+    result = deploy_all({"one": config}, deployer, ARTIFACTS, state_path)["one"]
+    assert "was dropped" in result["error"]
+    assert result["logic"] == {}
+
+    assert deploy_all({"one": config}, deployer, ARTIFACTS, state_path)["one"]["verified"]
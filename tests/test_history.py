@@ -0,0 +1,84 @@
+from brownie import web3
+from eth_utils import event_abi_to_log_topic
+
+from scripts.helpers.registry_events import decode_log, legacy_event_abis, registry_events
+from scripts.history import address_topic, author_history, status_history, version_history, vault_history
+
+METADATA = "name=BTC-CVX,protocol=Badger,behavior=DCA"
+
+
+def names(history):
+    return [name for _, name, _ in history]
+
+
+def test_vault_events_are_indexed(registry, rando, vault_one):
+    tx = registry.add(vault_one, "v1", METADATA, {"from": rando})
+    (log,) = tx.logs
+    assert log["topics"][1].hex() == address_topic(vault_one)
+    assert log["topics"][2] == web3.keccak(text="v1")
+    assert log["topics"][3].hex() == address_topic(rando.address)
+    assert tx.events["NewVault"]["version"] == "v1"
+    assert tx.events["NewVault"]["metadata"] == METADATA
+
+
+def test_history_queries(registry, gov, rando, user, vault_one, vault_two):
+    registry.add(vault_one, "v1", METADATA, {"from": rando})
+    registry.add(vault_two, "v2", METADATA, {"from": user})
+    registry.promote(vault_one, "v1", METADATA, 1, {"from": gov})
+    registry.promote(vault_two, "v2", METADATA, 2, {"from": gov})
+    registry.promote(vault_one, "v1", METADATA, 3, {"from": gov})
+    registry.updateMetadata(vault_one, "name=BTC-CVX,protocol=Convex,behavior=DCA", {"from": gov})
+    registry.demote(vault_one, 2, {"from": gov})
+    registry.remove(vault_one, {"from": rando})
+    registry.purge(vault_two, {"from": gov})
+
+    history = vault_history(registry, vault_one)
+    assert names(history) == [
+        "NewVault",
+        "PromoteVault",
+        "PromoteVault",
+        "UpdateVaultMetadata",
+        "DemoteVault",
+        "RemoveVault",
+    ]
+    assert [block for block, _, _ in history] == sorted(block for block, _, _ in history)
+    assert history[3][2]["metadata"] == "name=BTC-CVX,protocol=Convex,behavior=DCA"
+    ## The vault author added it, governance promoted and updated it
+    assert history[0][2]["author"] == rando
+    assert history[1][2]["caller"] == history[3][2]["caller"] == gov
+
+    assert names(author_history(registry, rando)) == ["NewVault", "RemoveVault"]
+    assert [args["vault"] for _, _, args in author_history(registry, user)] == [vault_two]
+    assert names(version_history(registry, "v2")) == ["NewVault", "PromoteVault", "PurgeVault"]
+    assert [(name, args["vault"]) for _, name, args in status_history(registry, 2)] == [
+        ("PromoteVault", vault_two),
+        ("DemoteVault", vault_one),
+        ("PurgeVault", vault_two),
+    ]
+    assert vault_history(registry, vault_one, to_block=history[0][0]) == history[:1]
+
+
+def test_decode_legacy_logs(registry, rando, vault_one):
+    ## Logs emitted before the events were indexed carry everything in their data
+    abi = next(abi for abi in legacy_event_abis() if abi["name"] == "PromoteVault")
+    types = ["address", "string", "string", "address", "uint8"]
+    data = web3.codec.encode_abi(types, [rando.address, "v1", METADATA, vault_one, 3])
+    log = {
+        "address": registry.address,
+        "topics": [event_abi_to_log_topic(abi)],
+        "data": "0x" + data.hex(),
+        "blockNumber": 1,
+        "blockHash": bytes(32),
+        "transactionHash": bytes(32),
+        "transactionIndex": 0,
+        "logIndex": 0,
+    }
+    name, args = decode_log(registry_events(registry), log)
+    assert name == "PromoteVault"
+    assert (args["caller"], args["version"], args["metadata"], args["vault"], args["status"]) == (
+        rando.address,
+        "v1",
+        METADATA,
+        vault_one,
+        3,
+    )
@@ -0,0 +1,105 @@
+import brownie
+from brownie import chain, ZERO_ADDRESS
+
+from scripts.indexer import RegistryIndexer
+
+
+def test_indexer_mirrors_registry(registry, vault_one, vault_two, rando, gov):
+    indexer = RegistryIndexer(registry, start_block=registry.tx.block_number, confirmations=0)
+
+    registry.add(vault_one, "v1", "name=BTC-CVX,protocol=Badger,behavior=DCA", {"from": rando})
+    registry.promote(vault_one, "v1", "name=BTC-CVX,protocol=Badger,behavior=DCA", 1, {"from": gov})
+    registry.promote(vault_one, "v1", "name=BTC-CVX,protocol=Badger,behavior=DCA", 3, {"from": gov})
+    registry.promote(vault_two, "v2", "name=ETH-CVX,protocol=Badger,behavior=DCA", 2, {"from": gov})
+    registry.demote(vault_two, 0, {"from": gov})
+    registry.addVersions("v3", {"from": gov})
+    registry.set("controller", "0x63cF44B2548e4493Fd099222A1eC79F3344D9682", {"from": gov})
+    registry.set("ibBTC", "0xc4E15973E6fF2A35cC804c2CF9D2a1b817a8b40F", {"from": gov})
+    registry.set("guardian", "0x6615e67b8B6b6375D38A0A3f937cd8c1a1e96386", {"from": gov})
+    registry.deleteKey("controller", {"from": gov})
+
+    assert indexer.sync() == chain.height
+
+    assert indexer.vaults("v1", rando) == sorted(registry.getVaults("v1", rando))
+    for version in ["v1", "v2"]:
+        for status in range(4):
+            assert indexer.production_vaults(version, status) == sorted(
+                registry.getFilteredProductionVaults(version, status)
+            )
+
+    assert indexer.versions() == ["v1", "v1.5", "v2", "v3"]
+    assert indexer.keys() == [registry.keys(x) for x in range(registry.keysCount())]
+    assert indexer.get("controller") is None
+    assert indexer.get("guardian") == registry.get("guardian")
+    assert indexer.key_by_address("0xc4E15973E6fF2A35cC804c2CF9D2a1b817a8b40F") == "ibBTC"
+
+    registry.remove(vault_one, {"from": rando})
+    registry.purge(vault_one, {"from": gov})
+    indexer.sync()
+
+    assert indexer.vaults("v1", rando) == []
+    assert indexer.production_vault(vault_one) is None
+
+
+def test_indexer_skips_rows_written_before_start_block(registry, vault_one, gov, caplog):
+    registry.promote(vault_one, "v1", "name=BTC-CVX,protocol=Badger,behavior=DCA", 1, {"from": gov})
+    registry.set("controller", "0x63cF44B2548e4493Fd099222A1eC79F3344D9682", {"from": gov})
+    indexer = RegistryIndexer(registry, start_block=chain.height + 1, confirmations=0)
+
+    registry.demote(vault_one, 0, {"from": gov})
+    registry.updateMetadata(vault_one, "name=BTC-CVX,protocol=Convex,behavior=DCA", {"from": gov})
+    registry.deleteKey("controller", {"from": gov})
+    registry.set("guardian", "0x6615e67b8B6b6375D38A0A3f937cd8c1a1e96386", {"from": gov})
+
+    assert indexer.sync() == chain.height
+    assert indexer.production_vault(vault_one) is None
+    assert indexer.keys() == ["guardian"]
+    assert "DemoteVault" in caplog.text and "UpdateVaultMetadata" in caplog.text and "DeleteKey" in caplog.text
+
+
+def test_indexer_waits_for_confirmations(registry, gov):
+    indexer = RegistryIndexer(registry, start_block=registry.tx.block_number, confirmations=2)
+
+    registry.set("controller", "0x63cF44B2548e4493Fd099222A1eC79F3344D9682", {"from": gov})
+    indexer.sync()
+    assert indexer.get("controller") is None
+
+    chain.mine(2)
+    assert indexer.sync() == chain.height - 2
+    assert indexer.get("controller") == "0x63cF44B2548e4493Fd099222A1eC79F3344D9682"
+
+
+def test_indexer_resumes_from_cursor(registry, gov):
+    indexer = RegistryIndexer(registry, start_block=registry.tx.block_number, confirmations=0)
+    registry.set("controller", "0x63cF44B2548e4493Fd099222A1eC79F3344D9682", {"from": gov})
+    cursor = indexer.sync()
+
+    # Nothing new, the cursor doesn't move
+    assert indexer.sync() == cursor
+
+    registry.set("ibBTC", "0xc4E15973E6fF2A35cC804c2CF9D2a1b817a8b40F", {"from": gov})
+    assert indexer.sync() == cursor + 1
+    assert indexer.keys() == ["controller", "ibBTC"]
+
+
+def test_indexer_rolls_back_reorg(registry, gov, strategistGuild, vault):
+    indexer = RegistryIndexer(registry, start_block=registry.tx.block_number, confirmations=0)
+    registry.set("controller", "0x63cF44B2548e4493Fd099222A1eC79F3344D9682", {"from": gov})
+    registry.promote(vault, "v1", "name=BTC-CVX,protocol=Badger,behavior=DCA", 2, {"from": gov})
+    indexer.sync()
+
+    # Replace the last block with a different one at the same height
+    chain.undo()
+    registry.set("controller", "0xc4E15973E6fF2A35cC804c2CF9D2a1b817a8b40F", {"from": gov})
+    indexer.sync()
+
+    assert indexer.production_vault(vault) is None
+    assert indexer.get("controller") == "0xc4E15973E6fF2A35cC804c2CF9D2a1b817a8b40F"
+    assert indexer.keys() == ["controller"]
+
+    # A shorter chain rolls back as well
+    chain.undo()
+    indexer.sync()
+
+    assert indexer.get("controller") == "0x63cF44B2548e4493Fd099222A1eC79F3344D9682"
+    assert indexer.cursor == chain.height
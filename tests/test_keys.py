@@ -48,3 +48,66 @@ def test_delete_keys(registry, rando, gov):
     assert registry.get("ibBTC") == ZERO_ADDRESS
     assert registry.keyByAddress("0xc4E15973E6fF2A35cC804c2CF9D2a1b817a8b40F") == ""
     assert registry.keysCount() == 0
+
+
+def test_set_existing_key_is_not_listed_twice(registry, gov):
+    registry.set("controller", "0x63cF44B2548e4493Fd099222A1eC79F3344D9682", {"from": gov})
+    tx = registry.set("controller", "0xc4E15973E6fF2A35cC804c2CF9D2a1b817a8b40F", {"from": gov})
+
+    assert "AddKey" not in tx.events
+    assert registry.keysCount() == 1
+    assert registry.get("controller") == "0xc4E15973E6fF2A35cC804c2CF9D2a1b817a8b40F"
+
+
+def test_delete_key_keeps_positions(registry, gov):
+    for x in range(4):
+        registry.set(f"key{x}", accounts[x], {"from": gov})
+
+    # Deleting from the middle moves the last key in its place
+    registry.deleteKey("key1", {"from": gov})
+    assert [registry.keys(x) for x in range(registry.keysCount())] == ["key0", "key3", "key2"]
+
+    # The moved key is still found at its new position
+    registry.deleteKey("key3", {"from": gov})
+    assert [registry.keys(x) for x in range(registry.keysCount())] == ["key0", "key2"]
+
+    # Deleting an unknown key does nothing
+    tx = registry.deleteKey("key1", {"from": gov})
+    assert len(tx.events) == 0
+    assert registry.keysCount() == 2
+
+
+def test_index_keys_is_idempotent(registry, rando, gov):
+    for x in range(3):
+        registry.set(f"key{x}", accounts[x], {"from": gov})
+
+    # Anyone can (re)build the index, it only mirrors `keys`
+    registry.indexKeys(0, 100, {"from": rando})
+
+    registry.set("key1", accounts[5], {"from": gov})
+    assert registry.keysCount() == 3
+    registry.deleteKey("key0", {"from": gov})
+    assert [registry.keys(x) for x in range(registry.keysCount())] == ["key2", "key1"]
+
+
+def test_key_gas_does_not_grow_with_key_count(registry, gov):
+    def fill(count):
+        for x in range(registry.keysCount(), count):
+            registry.set(f"key{x:04}", accounts[x % 10], {"from": gov})
+
+    def measure():
+        count = registry.keysCount()
+        added = registry.set(f"key{count:04}", accounts[0], {"from": gov}).gas_used
+        updated = registry.set(f"key{count:04}", accounts[1], {"from": gov}).gas_used
+        deleted = registry.deleteKeys([f"key{count // 2:04}"], {"from": gov}).gas_used
+        # Put the last key back so the next fill starts from the same shape
+        registry.set(f"key{count // 2:04}", accounts[0], {"from": gov})
+        return added, updated, deleted
+
+    fill(10)
+    small = measure()
+    fill(100)
+    large = measure()
+
+    for small_gas, large_gas in zip(small, large):
+        assert abs(large_gas - small_gas) < 100
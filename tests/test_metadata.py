@@ -0,0 +1,70 @@
+import json
+import random
+from pathlib import Path
+
+import brownie
+from brownie.exceptions import VirtualMachineError
+
+from scripts.helpers.verify_metadata import InvalidMetadata, is_valid_metadata, verify_metadata
+
+CORPUS = json.loads(Path(__file__).parent.joinpath("data", "metadata_corpus.json").read_text(encoding="utf-8"))
+
+## Fragments the fuzzer glues together, biased towards almost valid metadata
+FRAGMENTS = ["name", "protocol", "behavior", "=", ",", "a", "BTC-CVX", "nam", "rotocol", "é", "🦡", "\x00", " "]
+
+
+def fuzz_corpus(count, seed=1):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        valid = f"name={rng.choice(FRAGMENTS)},protocol={rng.choice(FRAGMENTS)},behavior={rng.choice(FRAGMENTS)}"
+        fragments = list(valid) if rng.random() < 0.5 else [rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 12))]
+        # Mutate a few positions of the (possibly) valid string
+        for _ in range(rng.randint(0, 2)):
+            if fragments:
+                fragments[rng.randrange(len(fragments))] = rng.choice(FRAGMENTS)
+        corpus.append("".join(fragments))
+    return corpus
+
+
+def python_reason(metadata):
+    try:
+        verify_metadata(metadata)
+    except InvalidMetadata as e:
+        return str(e)
+    return None
+
+
+def contract_reason(registry, metadata, vault, author):
+    try:
+        registry.add.call(vault, "v1", metadata, {"from": author})
+    except VirtualMachineError as e:
+        return e.revert_msg
+    return None
+
+
+def test_verify_metadata():
+    verify_metadata("name=BTC-CVX,protocol=Badger,behavior=DCA")
+    assert is_valid_metadata("name=BTC-CVXprotocol=Badgerbehavior=DCA")
+
+    assert python_reason("DCA-BTC-CVX") == "BadgerRegistry: Invalid Name"
+    assert python_reason("name=BTC-CVX") == "BadgerRegistry: Invalid Protocol"
+    assert python_reason("name=BTC-CVX,protocol=Badger,behavior") == "BadgerRegistry: Invalid Behavior"
+    ## Too short to hold "protocol" before the second "="
+    assert python_reason("name=a=b=c") == "BadgerRegistry: Invalid Protocol"
+    assert not is_valid_metadata("=name=a,protocol=b,behavior=c")
+
+
+def test_contract_and_python_agree(registry, vault, rando):
+    for metadata in CORPUS + fuzz_corpus(300):
+        assert contract_reason(registry, metadata, vault, rando) == python_reason(metadata), metadata
+
+
+def test_verify_metadata_on_promote_and_update(registry, vault, gov):
+    ## Promote and updateMetadata go through the same validation
+    with brownie.reverts("BadgerRegistry: Invalid Protocol"):
+        registry.promote(vault, "v1", "name=a=b=c", 1, {"from": gov})
+
+    registry.promote(vault, "v1", "name=é,protocol=é,behavior=é", 1, {"from": gov})
+    with brownie.reverts("BadgerRegistry: Invalid Behavior"):
+        registry.updateMetadata(vault, "name=a,protocol=b,ehavior=c", {"from": gov})
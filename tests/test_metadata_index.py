@@ -0,0 +1,99 @@
+import brownie
+from brownie import ZERO_ADDRESS, accounts
+
+from scripts.helpers.verify_metadata import metadata_fields
+
+
+def vaults_of(infos):
+    return sorted(info[0] for info in infos)
+
+
+def test_metadata_fields():
+    assert metadata_fields("name=BTC-CVX,protocol=Convex,behavior=DCA") == ("Convex", "DCA")
+    assert metadata_fields("name=BTC-CVXprotocol=Convexbehavior=DCA,extra=1") == ("Convex", "DCA")
+    assert metadata_fields("name=a,protocol=,behavior=") == ("", "")
+
+
+def test_index_by_protocol_and_behavior(registry, vault_one, vault_two, vault_three, gov):
+    registry.promote(vault_one, "v1", "name=BTC-CVX,protocol=Convex,behavior=DCA", 3, {"from": gov})
+    registry.promote(vault_two, "v2", "name=ETH-CVX,protocol=Convex,behavior=Compounder", 1, {"from": gov})
+    registry.promote(vault_three, "v1", "name=BTC-CRV,protocol=Curve,behavior=DCA", 2, {"from": gov})
+
+    assert vaults_of(registry.getProductionVaultsByProtocol("Convex")) == sorted([vault_one, vault_two])
+    assert vaults_of(registry.getProductionVaultsByProtocol("Curve")) == [vault_three]
+    assert registry.getProductionVaultsByProtocol("Badger") == []
+    assert vaults_of(registry.getProductionVaultsByBehavior("DCA")) == sorted([vault_one, vault_three])
+    assert registry.getProductionVaultsByBehavior("Compounder") == [registry.productionVaultInfoByVault(vault_two)]
+
+    ## Demotions keep the vault indexed, with its new status
+    registry.demote(vault_one, 0, {"from": gov})
+    assert (vault_one, "v1", 0, "name=BTC-CVX,protocol=Convex,behavior=DCA") in registry.getProductionVaultsByProtocol(
+        "Convex"
+    )
+
+    ## Promoting an existing vault keeps its metadata and index
+    registry.promote(vault_three, "v1", "name=BTC-CRV,protocol=Balancer,behavior=DCA", 3, {"from": gov})
+    assert registry.getProductionVaultsByProtocol("Balancer") == []
+
+    registry.updateMetadata(vault_two, "name=ETH-CVX,protocol=Aura,behavior=DCA", {"from": gov})
+    assert vaults_of(registry.getProductionVaultsByProtocol("Convex")) == [vault_one]
+    assert vaults_of(registry.getProductionVaultsByProtocol("Aura")) == [vault_two]
+    assert registry.getProductionVaultsByBehavior("Compounder") == []
+
+    registry.purge(vault_one, {"from": gov})
+    assert registry.getProductionVaultsByProtocol("Convex") == []
+    assert vaults_of(registry.getProductionVaultsByBehavior("DCA")) == sorted([vault_two, vault_three])
+
+
+def test_index_matches_python_fields(registry, gov):
+    ## Separators and missing commas are parsed the same way on both sides
+    metadata = [
+        "name=a,protocol=Convex,behavior=DCA",
+        "name=aprotocol=Convexbehavior=DCA",
+        "name=a,protocol=Con,vex,behavior=DCA,x=y",
+        "name=a,protocol=,behavior=",
+    ]
+    for x, item in enumerate(metadata):
+        vault = accounts[x + 3]
+        registry.promote(vault, "v1", item, 1, {"from": gov})
+        protocol, behavior = metadata_fields(item)
+        assert vault in vaults_of(registry.getProductionVaultsByProtocol(protocol)), item
+        assert vault in vaults_of(registry.getProductionVaultsByBehavior(behavior)), item
+
+
+def test_unindex_with_positions_of_current_metadata(registry, vault_one, gov):
+    ## Each update moves the "=" positions, purge must unindex the last metadata
+    registry.promote(vault_one, "v1", "name=a,protocol=Convex,behavior=DCA", 1, {"from": gov})
+    registry.updateMetadata(vault_one, "name=a-longer-name,protocol=Aura,behavior=Compounder", {"from": gov})
+    assert vaults_of(registry.getProductionVaultsByProtocol("Aura")) == [vault_one]
+    assert registry.getProductionVaultsByProtocol("Convex") == []
+
+    registry.updateMetadata(vault_one, "name=b,protocol=Curve,behavior=DCA", {"from": gov})
+    assert registry.getProductionVaultsByBehavior("Compounder") == []
+    registry.purge(vault_one, {"from": gov})
+    assert registry.getProductionVaultsByProtocol("Curve") == []
+    assert registry.getProductionVaultsByBehavior("DCA") == []
+
+
+def test_demoted_vaults_stay_indexed(registry, vault_one, vault_two, gov):
+    ## The index spans every status, demotions only change the status returned
+    registry.promote(vault_one, "v1", "name=a,protocol=Convex,behavior=DCA", 3, {"from": gov})
+    registry.promote(vault_two, "v1", "name=b,protocol=Convex,behavior=Compounder", 2, {"from": gov})
+    registry.demote(vault_one, 0, {"from": gov})
+    registry.demote(vault_two, 1, {"from": gov})
+
+    assert sorted(registry.getProductionVaultsByProtocol("Convex")) == sorted(
+        [
+            (vault_one, "v1", 0, "name=a,protocol=Convex,behavior=DCA"),
+            (vault_two, "v1", 1, "name=b,protocol=Convex,behavior=Compounder"),
+        ]
+    )
+    assert registry.getProductionVaultsByBehavior("DCA") == [
+        (vault_one, "v1", 0, "name=a,protocol=Convex,behavior=DCA")
+    ]
+    assert registry.getProductionVaultsByBehavior("Compounder") == [
+        (vault_two, "v1", 1, "name=b,protocol=Convex,behavior=Compounder")
+    ]
+    ## The live vaults, as the index doesn't filter them
+    live = [info for info in registry.getProductionVaultsByProtocol("Convex") if info[2] > 0]
+    assert vaults_of(live) == [vault_two]
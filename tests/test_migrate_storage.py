@@ -0,0 +1,129 @@
+import pytest
+from brownie import AdminUpgradeabilityProxy, BadgerRegistry, Contract, LegacyBadgerRegistry, accounts
+
+from scripts.indexer import RegistryIndexer
+from scripts.migrate_storage import migrate_storage, migration_calldata
+
+METADATA = ["name=BTC-CVX,protocol=Badger,behavior=DCA", "name=ETH-CVX,protocol=Convex,behavior=Compounder"]
+VERSIONS = ["v1", "v1.5", "v2", "v3"]
+
+
+@pytest.fixture
+def proxy_admin():
+    return accounts[9]
+
+
+@pytest.fixture
+def proxy(gov, strategistGuild, proxy_admin):
+    logic = LegacyBadgerRegistry.deploy({"from": gov})
+    return AdminUpgradeabilityProxy.deploy(
+        logic, proxy_admin, logic.initialize.encode_input(gov, strategistGuild), {"from": gov}
+    )
+
+
+def fill_legacy(legacy, gov, strategistGuild, authors, vaults):
+    """
+    Author vaults, production vaults of every status and keys, written by v0.2.1
+    """
+    legacy.addVersions("v3", {"from": gov})
+    for x, vault in enumerate(vaults):
+        legacy.add(vault, VERSIONS[x % len(VERSIONS)], METADATA[x % 2], {"from": authors[x % 2]})
+    legacy.add(vaults[0], "v2", METADATA[1], {"from": authors[1]})
+    legacy.remove(vaults[2], {"from": authors[0]})
+
+    legacy.promote(vaults[0], "v1", METADATA[0], 3, {"from": gov})
+    legacy.promote(vaults[1], "v2", METADATA[1], 2, {"from": strategistGuild})
+    legacy.promote(vaults[2], "v3", METADATA[0], 1, {"from": gov})
+    legacy.promote(vaults[3], "v1", METADATA[1], 3, {"from": gov})
+    legacy.demote(vaults[3], 0, {"from": gov})
+    legacy.promote(vaults[4], "v1", METADATA[0], 2, {"from": gov})
+    legacy.purge(vaults[4], {"from": gov})
+    legacy.updateMetadata(vaults[0], METADATA[1], {"from": gov})
+
+    legacy.set("controller", accounts[7], {"from": gov})
+    legacy.set("guardian", accounts[8], {"from": gov})
+    legacy.set("keeper", accounts[5], {"from": gov})
+    legacy.deleteKey("controller", {"from": gov})
+
+
+def read_views(registry, authors, vaults):
+    """
+    Every view v0.2.1 has, set backed lists are sorted as the migration doesn't keep their order
+    """
+    keys = [registry.keys(x) for x in range(registry.keysCount())]
+    return {
+        "versions": [registry.versions(x) for x in range(len(VERSIONS))],
+        "keys": sorted(keys),
+        "addresses": {key: registry.get(key) for key in keys},
+        "keyByAddress": {account.address: registry.keyByAddress(account) for account in accounts[5:9]},
+        "getVaults": {
+            (version, author.address): sorted(registry.getVaults(version, author))
+            for version in VERSIONS
+            for author in authors
+        },
+        "getFilteredProductionVaults": {
+            (version, status): sorted(registry.getFilteredProductionVaults(version, status))
+            for version in VERSIONS
+            for status in range(4)
+        },
+        "getProductionVaults": [
+            (version, status, sorted(list_)) for version, status, list_ in registry.getProductionVaults()
+        ],
+        "productionVaultInfoByVault": [registry.productionVaultInfoByVault(vault) for vault in vaults],
+        "vaultInfoByAuthorAndVault": [
+            registry.vaultInfoByAuthorAndVault(author, vault) for author in authors for vault in vaults
+        ],
+    }
+
+
+def test_upgrade_then_migrate(
+    proxy, proxy_admin, gov, strategistGuild, rando, user, vault, vault_one, vault_two, vault_three, vault_four
+):
+    authors, vaults = [rando, user], [vault, vault_one, vault_two, vault_three, vault_four]
+    legacy = Contract.from_abi("LegacyBadgerRegistry", proxy.address, LegacyBadgerRegistry.abi)
+    fill_legacy(legacy, gov, strategistGuild, authors, vaults)
+    before = read_views(legacy, authors, vaults)
+
+    registry = Contract.from_abi("BadgerRegistry", proxy.address, BadgerRegistry.abi)
+    indexer = RegistryIndexer(registry, start_block=proxy.tx.block_number, confirmations=0)
+    proxy.upgradeTo(BadgerRegistry.deploy({"from": gov}), {"from": proxy_admin})
+    ## Until migrated, the vaults of the old layout are missing from the views
+    assert registry.getFilteredProductionVaults("v1", 3) == []
+    assert registry.getVaults("v1", rando) == []
+
+    migrate_storage(registry, rando, indexer, batch_size=1)
+    assert read_views(registry, authors, vaults) == before
+    assert sorted(registry.getAuthors()) == sorted(authors)
+    ## Moved production vaults are indexed by their current metadata
+    convex = [info[0] for info in registry.getProductionVaultsByProtocol("Convex")]
+    assert sorted(convex) == sorted([vault, vault_one, vault_three])
+
+    ## Running it again changes nothing
+    revisions = registry.getRevisions()
+    migrate_storage(registry, rando, indexer, batch_size=1)
+    assert read_views(registry, authors, vaults) == before
+    assert registry.getRevisions() == revisions
+
+    ## Keys were indexed, setting an existing key doesn't list it twice
+    registry.set("guardian", accounts[5], {"from": gov})
+    assert registry.keysCount() == len(before["keys"])
+
+
+def test_upgrade_to_and_call_migrates(
+    proxy, proxy_admin, gov, strategistGuild, rando, user, vault, vault_one, vault_two, vault_three, vault_four
+):
+    authors, vaults = [rando, user], [vault, vault_one, vault_two, vault_three, vault_four]
+    legacy = Contract.from_abi("LegacyBadgerRegistry", proxy.address, LegacyBadgerRegistry.abi)
+    fill_legacy(legacy, gov, strategistGuild, authors, vaults)
+    before = read_views(legacy, authors, vaults)
+
+    registry = Contract.from_abi("BadgerRegistry", proxy.address, BadgerRegistry.abi)
+    indexer = RegistryIndexer(registry, start_block=proxy.tx.block_number, confirmations=0)
+    logic = BadgerRegistry.deploy({"from": gov})
+    proxy.upgradeToAndCall(logic, migration_calldata(registry, indexer), {"from": proxy_admin})
+
+    ## The vaults are visible from the upgrade block on
+    assert read_views(registry, authors, vaults) == before
+    revisions = registry.getRevisions()
+    migrate_storage(registry, rando, indexer)
+    assert registry.getRevisions() == revisions
@@ -0,0 +1,76 @@
+import brownie
+from brownie import ZERO_ADDRESS, accounts
+
+from scripts.paginate import iter_production_vaults, iter_filtered_production_vaults, iter_vaults
+
+
+def test_vaults_page(registry, vault_one, vault_two, vault_three, rando):
+    registry.add(vault_one, "v1", "name=BTC-CVX,protocol=Badger,behavior=DCA", {"from": rando})
+    registry.add(vault_two, "v1", "name=ETH-CVX,protocol=Badger,behavior=DCA", {"from": rando})
+    registry.add(vault_three, "v1", "name=MATIC-CVX,protocol=Badger,behavior=DCA", {"from": rando})
+
+    all_vaults = registry.getVaults("v1", rando)
+    assert registry.getVaultsPage("v1", rando, 0, 2) == all_vaults[:2]
+    assert registry.getVaultsPage("v1", rando, 2, 2) == all_vaults[2:]
+    assert registry.getVaultsPage("v1", rando, 3, 2) == []
+
+    assert list(iter_vaults(registry, "v1", rando, page_size=2)) == all_vaults
+
+
+def test_filtered_production_vaults_page(registry, vault_one, vault_two, vault_three, gov):
+    registry.promote(vault_one, "v1", "name=BTC-CVX,protocol=Badger,behavior=DCA", 3, {"from": gov})
+    registry.promote(vault_two, "v1", "name=ETH-CVX,protocol=Badger,behavior=DCA", 3, {"from": gov})
+    registry.promote(vault_three, "v1", "name=MATIC-CVX,protocol=Badger,behavior=DCA", 3, {"from": gov})
+
+    all_vaults = registry.getFilteredProductionVaults("v1", 3)
+    assert registry.getFilteredProductionVaultsPage("v1", 3, 1, 1) == all_vaults[1:2]
+    assert registry.getFilteredProductionVaultsPage("v1", 3, 1, 10) == all_vaults[1:]
+    assert registry.getFilteredProductionVaultsPage("v1", 2, 0, 10) == []
+
+    assert list(iter_filtered_production_vaults(registry, "v1", 3, page_size=1)) == all_vaults
+
+
+def test_production_vaults_page(registry, vault_one, vault_two, vault_three, vault_four, gov):
+    registry.promote(vault_one, "v1", "name=BTC-CVX,protocol=Badger,behavior=DCA", 0, {"from": gov})
+    registry.promote(vault_two, "v2", "name=ETH-CVX,protocol=Badger,behavior=DCA", 1, {"from": gov})
+    registry.promote(vault_three, "v1", "name=BTC-CVX,protocol=Badger,behavior=DCA", 2, {"from": gov})
+    registry.promote(vault_four, "v2", "name=MATIC-CVX,protocol=Badger,behavior=DCA", 1, {"from": gov})
+
+    ## Only non empty buckets overlapping the page are returned
+    data, total = registry.getProductionVaultsPage(0, 2)
+    assert total == 4
+    assert data == [
+        ("v1", 0, [[vault_one, "name=BTC-CVX,protocol=Badger,behavior=DCA"]]),
+        ("v1", 2, [[vault_three, "name=BTC-CVX,protocol=Badger,behavior=DCA"]]),
+    ]
+
+    ## A page can split a bucket
+    data, total = registry.getProductionVaultsPage(3, 2)
+    assert data == [("v2", 1, [[vault_four, "name=MATIC-CVX,protocol=Badger,behavior=DCA"]])]
+
+    data, total = registry.getProductionVaultsPage(4, 2)
+    assert data == []
+    assert total == 4
+
+    expected = [
+        (version, status, vault, metadata)
+        for version, status, list_ in registry.getProductionVaults()
+        for vault, metadata in list_
+    ]
+    assert list(iter_production_vaults(registry, page_size=1)) == expected
+    assert list(iter_production_vaults(registry, page_size=3)) == expected
+
+
+def test_stream_is_pinned_to_starting_block(registry, vault_one, vault_two, gov):
+    registry.promote(vault_one, "v1", "name=BTC-CVX,protocol=Badger,behavior=DCA", 3, {"from": gov})
+    registry.promote(vault_two, "v1", "name=ETH-CVX,protocol=Badger,behavior=DCA", 3, {"from": gov})
+
+    stream = iter_filtered_production_vaults(registry, "v1", 3, page_size=1)
+    first = next(stream)
+    registry.purge(first[0], {"from": gov})
+
+    ## The purge happened after the stream started, so the second vault is still listed once
+    assert [first] + list(stream) == [
+        [vault_one, "v1", 3, "name=BTC-CVX,protocol=Badger,behavior=DCA"],
+        [vault_two, "v1", 3, "name=ETH-CVX,protocol=Badger,behavior=DCA"],
+    ]
@@ -0,0 +1,116 @@
+import brownie
+import pytest
+import yaml
+from brownie import ZERO_ADDRESS, accounts
+
+from scripts.plan import PlanError, Step, apply_plan, plan, plan_changes
+
+METADATA = "name=BTC-CVX,protocol=Badger,behavior=DCA"
+
+
+def write_state(path, state):
+    path.write_text(yaml.safe_dump(state))
+    return str(path)
+
+
+def test_plan_changes():
+    current = {
+        "versions": ["v1", "v1.5", "v2"],
+        "keys": {"controller": "0x1", "guardian": "0x2"},
+        "productionVaults": {
+            "0xa": ("v1", 3, METADATA),
+            "0xb": ("v1", 3, METADATA),
+            "0xc": ("v1", 1, METADATA),
+            "0xd": ("v2", 1, METADATA),
+        },
+    }
+    desired = {
+        "versions": ["v1", "v1.5", "v2", "v3"],
+        "keys": {"controller": "0x1", "guardian": "0x3", "keeper": "0x4"},
+        "productionVaults": {
+            "0xa": ("v1", 3, METADATA),
+            "0xb": ("v1", 2, "name=b,protocol=Badger,behavior=DCA"),
+            "0xc": ("v3", 1, METADATA),
+            "0xe": ("v2", 3, METADATA),
+        },
+    }
+    assert plan_changes(current, desired) == [
+        Step("addVersions", [("v3",)]),
+        Step("setMany", [("guardian", "0x3"), ("keeper", "0x4")]),
+        Step("purgeMany", [("0xc",), ("0xd",)]),
+        Step("promoteMany", [("0xc", "v3", METADATA, 1), ("0xe", "v2", METADATA, 3)]),
+        Step("demoteMany", [("0xb", 2)]),
+        Step("updateMetadataMany", [("0xb", "name=b,protocol=Badger,behavior=DCA")]),
+    ]
+    assert plan_changes(current, {"versions": []}) == []
+
+
+def test_plan_and_apply(registry, vault_one, vault_two, vault_three, gov, tmp_path):
+    registry.set("controller", accounts[3], {"from": gov})
+    registry.set("guardian", accounts[4], {"from": gov})
+    registry.promote(vault_one, "v1", METADATA, 3, {"from": gov})
+    registry.promote(vault_two, "v1", METADATA, 1, {"from": gov})
+
+    path = write_state(
+        tmp_path / "state.yaml",
+        {
+            "versions": ["v1", "v1.5", "v2"],
+            "keys": {"controller": accounts[5].address},
+            "productionVaults": {
+                vault_one: {"version": "v1", "status": "guarded", "metadata": METADATA},
+                vault_three: {"version": "v3", "status": "open", "metadata": METADATA},
+            },
+        },
+    )
+    steps = plan(registry, path)
+    assert [step.method for step in steps] == [
+        "addVersions",
+        "deleteKeys",
+        "setMany",
+        "purgeMany",
+        "promoteMany",
+        "demoteMany",
+    ]
+
+    ## Every step is packed in one transaction
+    assert len(apply_plan(registry, steps, gov)) == 1
+    assert registry.getAllKeyValues() == (["controller"], [accounts[5]])
+    assert registry.productionVaultInfoByVault(vault_one)[2] == 2
+    assert registry.productionVaultInfoByVault(vault_two)[0] == ZERO_ADDRESS
+    assert registry.getFilteredProductionVaults("v3", 3)[0][0] == vault_three
+
+    assert plan(registry, path) == []
+
+
+def test_plan_renames_key(registry, gov, tmp_path):
+    registry.set("controller", accounts[3], {"from": gov})
+
+    path = write_state(tmp_path / "state.yaml", {"versions": [], "keys": {"controllerV2": accounts[3].address}})
+    steps = plan(registry, path)
+    assert steps == [Step("deleteKeys", [("controller",)]), Step("setMany", [("controllerV2", accounts[3].address)])]
+
+    apply_plan(registry, steps, gov)
+    assert registry.getAllKeyValues() == (["controllerV2"], [accounts[3]])
+    ## Deleting the old key last would clear the address of the new one
+    assert registry.keyByAddress(accounts[3]) == "controllerV2"
+
+
+def test_plan_validates_offline(registry, vault_one, tmp_path):
+    path = write_state(
+        tmp_path / "state.yaml",
+        {
+            "chainId": 12345,
+            "productionVaults": {vault_one: {"version": "v1", "status": "open", "metadata": "name=a"}},
+        },
+    )
+    with pytest.raises(PlanError, match="chain"):
+        plan(registry, path)
+
+    path = write_state(
+        tmp_path / "state.yaml",
+        {"productionVaults": {vault_one: {"version": "v1", "status": "shiny", "metadata": "name=a"}}},
+    )
+    with pytest.raises(PlanError) as e:
+        plan(registry, path)
+    assert "Invalid Protocol" in str(e.value)
+    assert "unknown status shiny" in str(e.value)
@@ -0,0 +1,55 @@
+import pytest
+
+from scripts.helpers.production_by_status import production_vaults_by_status, status_mask
+
+METADATA = "name=BTC-CVX,protocol=Badger,behavior=DCA"
+
+
+def flatten(production):
+    return [(vault, version, status, metadata) for version, status, list_ in production for vault, metadata in list_]
+
+
+def test_status_mask():
+    assert status_mask(["guarded", "open"]) == 0x0C
+    assert status_mask([0, "experimental"]) == 0x03
+    assert status_mask([]) == 0
+    with pytest.raises(ValueError):
+        status_mask(["retired"])
+    with pytest.raises(ValueError):
+        status_mask([4])
+
+
+def test_production_vaults_by_status(registry, gov, vault_one, vault_two, vault_three, vault_four):
+    registry.promote(vault_one, "v1", METADATA, 3, {"from": gov})
+    registry.promote(vault_two, "v2", METADATA, 2, {"from": gov})
+    registry.promote(vault_three, "v1", METADATA, 0, {"from": gov})
+    registry.promote(vault_four, "v1.5", METADATA, 2, {"from": gov})
+
+    assert registry.getProductionVaultsByStatus(0x0C, []) == [
+        (vault_one, "v1", 3, METADATA),
+        (vault_four, "v1.5", 2, METADATA),
+        (vault_two, "v2", 2, METADATA),
+    ]
+    assert registry.getProductionVaultsByStatus(0x01, []) == [(vault_three, "v1", 0, METADATA)]
+    assert registry.getProductionVaultsByStatus(0, []) == []
+
+    ## Every status gives the flattened getProductionVaults
+    assert registry.getProductionVaultsByStatus(0x0F, []) == flatten(registry.getProductionVaults())
+
+    ## Versions are read in the given order, unlisted ones included
+    registry.purge(vault_three, {"from": gov})
+    registry.promote(vault_three, "v3", METADATA, 3, {"from": gov})
+    assert registry.getProductionVaultsByStatus(0x08, ["v3", "v1"]) == [
+        (vault_three, "v3", 3, METADATA),
+        (vault_one, "v1", 3, METADATA),
+    ]
+    assert registry.getProductionVaultsByStatus(0x0F, ["missing"]) == []
+
+
+def test_helper(registry, gov, vault_one, vault_two):
+    registry.promote(vault_one, "v1", METADATA, 3, {"from": gov})
+    registry.promote(vault_two, "v2", METADATA, 1, {"from": gov})
+
+    assert production_vaults_by_status(registry, ["open", "guarded"]) == [(vault_one, "v1", 3, METADATA)]
+    assert production_vaults_by_status(registry, [1], versions=["v2"]) == [(vault_two, "v2", 1, METADATA)]
+    assert production_vaults_by_status(registry, ["experimental"], versions=["v1"]) == []
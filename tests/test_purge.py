@@ -20,7 +20,7 @@ def test_vault_purge(registry, vault, rando, gov):
     assert registry.getFilteredProductionVaults("v1", 1) == []
 
     event = tx.events["PurgeVault"][0]
-    assert event["author"] == gov
+    assert event["caller"] == gov
     assert event["version"] == "v1"
     assert event["metadata"] == "name=BTC-CVX,protocol=Badger,behavior=DCA"
     assert event["vault"] == vault
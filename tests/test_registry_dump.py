@@ -0,0 +1,93 @@
+import json
+
+import brownie
+import pytest
+from brownie import BadgerRegistry, accounts
+
+import scripts.registry_dump
+from scripts.registry_dump import InvalidDump, diff_registry, export_registry, import_registry, read_dump
+
+
+def fill(registry, gov, rando, vaults):
+    registry.addVersions("v3", {"from": gov})
+    registry.setMany(["controller", "guardian"], [accounts[3], accounts[4]], {"from": gov})
+    registry.promote(vaults[0], "v1", "name=BTC-CVX,protocol=Badger,behavior=DCA", 3, {"from": gov})
+    registry.promote(vaults[1], "v3", "name=ETH-CVX,protocol=Badger,behavior=DCA", 1, {"from": gov})
+    registry.promote(vaults[2], "v2", "name=MATIC-CVX,protocol=Badger,behavior=DCA", 0, {"from": gov})
+    registry.add(vaults[3], "v2", "name=FTM-CVX,protocol=Badger,behavior=DCA", {"from": rando})
+
+
+def fresh_registry(gov, strategistGuild):
+    registry = gov.deploy(BadgerRegistry)
+    registry.initialize(gov, strategistGuild)
+    return registry
+
+
+def test_export_and_import(
+    registry, gov, strategistGuild, rando, vault_one, vault_two, vault_three, vault_four, tmp_path
+):
+    fill(registry, gov, rando, [vault_one, vault_two, vault_three, vault_four])
+    path = tmp_path / "dump.jsonl.gz"
+    header = export_registry(registry, path)
+
+    header_, records = read_dump(path)
+    assert header_ == header
+    assert [record["type"] for record in records].count("authorVault") == 1
+
+    target = fresh_registry(gov, strategistGuild)
+    assert diff_registry(target, path) != {}
+
+    report = import_registry(target, path, gov)
+    assert report["skipped"] == 1
+    assert diff_registry(target, path) == {}
+    assert target.getProductionVaults() == registry.getProductionVaults()
+    assert target.getAllKeyValues() == registry.getAllKeyValues()
+
+    ## Running it again does nothing
+    assert import_registry(target, path, gov) == {"applied": 0, "skipped": 0, "transactions": 0}
+
+
+def test_import_resumes_from_checkpoint(
+    registry, gov, strategistGuild, rando, vault_one, vault_two, vault_three, vault_four, tmp_path
+):
+    fill(registry, gov, rando, [vault_one, vault_two, vault_three, vault_four])
+    path = tmp_path / "dump.jsonl"
+    export_registry(registry, path)
+    target = fresh_registry(gov, strategistGuild)
+
+    ## Interrupted after the versions and keys
+    target.addVersions("v3", {"from": gov})
+    target.setMany(["controller", "guardian"], [accounts[3], accounts[4]], {"from": gov})
+    (tmp_path / "dump.jsonl.checkpoint").write_text(json.dumps({"registry": target.address, "applied": 6}))
+
+    report = import_registry(target, path, gov, gas_limit=1)
+    assert report == {"applied": 3, "skipped": 1, "transactions": 3}
+    assert diff_registry(target, path) == {}
+
+    ## The checkpoint belongs to target
+    with pytest.raises(InvalidDump):
+        import_registry(fresh_registry(gov, strategistGuild), path, gov)
+
+
+def test_import_reads_dump_in_chunks(
+    registry, gov, strategistGuild, rando, vault_one, vault_two, vault_three, vault_four, tmp_path, monkeypatch
+):
+    fill(registry, gov, rando, [vault_one, vault_two, vault_three, vault_four])
+    path = tmp_path / "dump.jsonl"
+    export_registry(registry, path)
+
+    ## Every type spans several reads, the import is sent as the records are read
+    monkeypatch.setattr(scripts.registry_dump, "READ_SIZE", 2)
+    target = fresh_registry(gov, strategistGuild)
+    report = import_registry(target, path, gov)
+    ## v3, the keys, then the production vaults in two reads
+    assert report == {"applied": 9, "skipped": 1, "transactions": 4}
+    assert diff_registry(target, path) == {}
+    assert json.loads((tmp_path / "dump.jsonl.checkpoint").read_text())["applied"] == 10
+
+
+def test_read_dump_rejects_other_files(tmp_path):
+    path = tmp_path / "dump.jsonl"
+    path.write_text(json.dumps({"format": "something-else"}) + "\n")
+    with pytest.raises(InvalidDump):
+        read_dump(path)
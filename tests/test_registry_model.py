@@ -0,0 +1,144 @@
+import random
+
+import brownie
+import pytest
+
+from scripts.registry_model import RegistryModel, Revert
+
+METADATA = [
+    "name=BTC-CVX,protocol=Convex,behavior=DCA",
+    "name=ETH-CVX,protocol=Convex,behavior=Compounder",
+    "name=BTC-CRV,protocol=Curve,behavior=DCA",
+    "name=BTC-CRV,protocol=Curve",
+]
+VERSIONS = ["v1", "v2", "v3"]
+KEYS = ["controller", "guardian", "keeper"]
+STEPS = 60
+## Every view is compared every CHECK_EVERY steps
+CHECK_EVERY = 10
+
+
+def make_model(gov, strategistGuild, devGov):
+    model = RegistryModel()
+    model.initialize(gov, strategistGuild, {"from": gov})
+    model.setDeveloper(devGov, {"from": gov})
+    return model
+
+
+def random_call(rng, model, vaults):
+    """
+    (method, args) of a random registry call, including calls bound to revert
+
+    multicall packs two other random calls, encoded by the model as the ABI is the same
+    """
+    vault, other = rng.sample(vaults, 2)
+    version, metadata, status = rng.choice(VERSIONS), rng.choice(METADATA), rng.randrange(4)
+    calls = [
+        ("add", [vault, version, metadata]),
+        ("addMany", [[vault, other], [version, version], [metadata, rng.choice(METADATA)]]),
+        ("remove", [vault]),
+        ("promote", [vault, version, metadata, status]),
+        ("promoteMany", [[vault, other], [version, version], [metadata, metadata], [status, rng.randrange(4)]]),
+        ("demote", [vault, status]),
+        ("demoteMany", [[vault, other], [status, rng.randrange(4)]]),
+        ("purge", [vault]),
+        ("purgeMany", [[vault, other]]),
+        ("updateMetadata", [vault, metadata]),
+        ("updateMetadataMany", [[vault, other], [metadata, rng.choice(METADATA)]]),
+        ("set", [rng.choice(KEYS), vault]),
+        ("setMany", [rng.sample(KEYS, 2), [vault, other]]),
+        ("deleteKeys", [rng.sample(KEYS, 2)]),
+        ("addVersions", [version]),
+    ]
+    if rng.random() < 0.1:
+        packed = [rng.choice(calls) for _ in range(2)]
+        return "multicall", [[getattr(model, method).encode_input(*args) for method, args in packed]]
+    return rng.choice(calls)
+
+
+def call_both(registry, model, sender, method, args):
+    try:
+        expected = getattr(model, method)(*args, {"from": sender})
+    except Revert as e:
+        with brownie.reverts(e.revert_msg):
+            getattr(registry, method)(*args, {"from": sender})
+        return
+    tx = getattr(registry, method)(*args, {"from": sender})
+    assert [(event.name, dict(event)) for event in tx.events] == list(expected.events), method
+
+
+def assert_same_state(registry, model, senders, vaults):
+    views = [
+        ("getAllKeyValues", []),
+        ("getAllVersions", []),
+        ("getProductionVaults", []),
+        ("getProductionVaultsPage", [1, 3]),
+        ("getRevisions", []),
+        ("stateDigest", []),
+        ("getAuthors", []),
+        ("getAuthorsPage", [1, 2]),
+        ("getProductionVaultsByProtocol", ["Convex"]),
+        ("getProductionVaultsByBehavior", ["DCA"]),
+        ("getProductionVaultsByStatus", [0x0C, []]),
+        ("getProductionVaultsByStatus", [0x0F, ["v3", "v1"]]),
+    ]
+    views += [(name, [vault]) for vault in vaults for name in ("productionVaultInfoByVault", "getVaultAuthors")]
+    views += [("keyByAddress", [vault]) for vault in vaults]
+    views += [("getAuthorVaults", [sender]) for sender in senders]
+    views += [("getVaults", [version, sender]) for version in VERSIONS for sender in senders]
+    views += [("getFilteredProductionVaults", [version, status]) for version in VERSIONS for status in range(4)]
+    for name, args in views:
+        assert getattr(registry, name)(*args) == getattr(model, name)(*args), (name, args)
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_model_matches_registry(
+    registry, gov, strategistGuild, devGov, rando, user, vault_one, vault_two, vault_three, vault_four, seed
+):
+    rng = random.Random(seed)
+    model = make_model(gov, strategistGuild, devGov)
+    senders = [gov, strategistGuild, devGov, rando, user]
+    vaults = [vault_one, vault_two, vault_three, vault_four]
+
+    for step in range(1, STEPS + 1):
+        method, args = random_call(rng, model, vaults)
+        call_both(registry, model, rng.choice(senders), method, args)
+        if step % CHECK_EVERY == 0:
+            assert_same_state(registry, model, senders, vaults)
+
+
+def test_model_reverts_whole_batch(gov, strategistGuild, devGov, vault_one, vault_two):
+    model = make_model(gov, strategistGuild, devGov)
+    digest = model.stateDigest()
+    with pytest.raises(Revert, match="Invalid Behavior"):
+        model.promoteMany([vault_one, vault_two], ["v1", "v1"], [METADATA[0], METADATA[3]], [3, 3], {"from": gov})
+    assert all(vaults == [] for _, _, vaults in model.getProductionVaults())
+    assert model.stateDigest() == digest
+    assert model.logs == []
+
+    tx = model.promote(vault_one, "v1", METADATA[0], 3, {"from": devGov})
+    ## The developer can only promote up to experimental
+    assert tx.events["PromoteVault"][0]["status"] == 1
+    assert model.logs == list(tx.events)
+
+
+def test_model_multicall(gov, strategistGuild, devGov, rando, vault_one, vault_two):
+    model = make_model(gov, strategistGuild, devGov)
+    calls = [
+        model.promote.encode_input(vault_one, "v1", METADATA[0], 3),
+        model.updateMetadata.encode_input(vault_one, METADATA[2]),
+    ]
+    tx = model.multicall(calls, {"from": gov})
+    assert [name for name, _ in tx.events] == ["PromoteVault", "UpdateVaultMetadata"]
+    assert model.getProductionVaultsByProtocol("Curve") == [(vault_one, "v1", 3, METADATA[2])]
+
+    ## Every call runs as the sender, one revert reverts them all
+    digest = model.stateDigest()
+    with pytest.raises(Revert, match="!auth"):
+        model.multicall([model.promote.encode_input(vault_two, "v1", METADATA[0], 3)], {"from": rando})
+    with pytest.raises(Revert, match="Vault does not exist"):
+        model.multicall(
+            [model.set.encode_input("controller", vault_two), model.purge.encode_input(vault_two)], {"from": gov}
+        )
+    assert model.stateDigest() == digest
+    assert model.getAllKeys() == []
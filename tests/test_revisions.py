@@ -0,0 +1,86 @@
+import brownie
+from brownie import ZERO_ADDRESS, accounts
+
+from scripts.conditional_fetch import RegistryPoller, in_sync
+from scripts.indexer import RegistryIndexer
+
+METADATA = "name=BTC-CVX,protocol=Badger,behavior=DCA"
+
+
+def bucket_revisions(registry, version, status):
+    _, revisions, _ = registry.getRevisions()
+    return revisions[registry.getAllVersions().index(version) * 4 + status]
+
+
+def test_revisions(registry, vault_one, vault_two, gov):
+    keys_revision, revisions, digest = registry.getRevisions()
+    assert (keys_revision, revisions, digest) == (0, [0] * 12, "0x" + "00" * 32)
+
+    registry.promote(vault_one, "v1", METADATA, 1, {"from": gov})
+    assert bucket_revisions(registry, "v1", 1) == 1
+    registry.promote(vault_one, "v1", METADATA, 3, {"from": gov})
+    assert bucket_revisions(registry, "v1", 1) == 2
+    assert bucket_revisions(registry, "v1", 3) == 1
+
+    registry.demote(vault_one, 2, {"from": gov})
+    registry.updateMetadata(vault_one, "name=ETH-CVX,protocol=Badger,behavior=DCA", {"from": gov})
+    assert bucket_revisions(registry, "v1", 3) == 2
+    assert bucket_revisions(registry, "v1", 2) == 2
+    registry.purge(vault_one, {"from": gov})
+    assert bucket_revisions(registry, "v1", 2) == 3
+
+    ## Other buckets and the keys are untouched
+    keys_revision, revisions, _ = registry.getRevisions()
+    assert keys_revision == 0
+    assert sum(revisions) == 2 + 2 + 3
+
+    registry.set("controller", vault_two, {"from": gov})
+    registry.deleteKey("controller", {"from": gov})
+    registry.deleteKey("controller", {"from": gov})
+    assert registry.getRevisions()[0] == 2
+
+
+def test_update_metadata_event(registry, vault_one, gov):
+    registry.promote(vault_one, "v1", METADATA, 1, {"from": gov})
+    tx = registry.updateMetadata(vault_one, "name=ETH-CVX,protocol=Badger,behavior=DCA", {"from": gov})
+    assert tx.events["UpdateVaultMetadata"]["vault"] == vault_one
+    assert tx.events["UpdateVaultMetadata"]["metadata"] == "name=ETH-CVX,protocol=Badger,behavior=DCA"
+
+
+def test_poller_fetches_changed_buckets(registry, vault_one, vault_two, gov):
+    poller = RegistryPoller(registry)
+    changes = poller.poll()
+    assert changes["keys"]
+    assert len(changes["buckets"]) == 12
+
+    assert poller.poll() == {"keys": False, "buckets": []}
+
+    registry.promote(vault_one, "v2", METADATA, 3, {"from": gov})
+    assert poller.poll() == {"keys": False, "buckets": [("v2", 3)]}
+    assert poller.production_vaults("v2", 3) == registry.getFilteredProductionVaults("v2", 3)
+
+    registry.addVersions("v3", {"from": gov})
+    registry.set("controller", vault_two, {"from": gov})
+    changes = poller.poll()
+    assert changes == {"keys": True, "buckets": [("v3", x) for x in range(4)]}
+    assert poller.keys == {"controller": vault_two}
+
+
+def test_index_digest_matches(registry, vault_one, vault_two, rando, gov):
+    indexer = RegistryIndexer(registry, start_block=registry.tx.block_number, confirmations=0)
+
+    registry.add(vault_one, "v1", METADATA, {"from": rando})
+    registry.promote(vault_one, "v1", METADATA, 1, {"from": gov})
+    registry.promote(vault_two, "v2", METADATA, 3, {"from": gov})
+    registry.updateMetadata(vault_two, "name=ETH-CVX,protocol=Badger,behavior=DCA", {"from": gov})
+    registry.demote(vault_two, 0, {"from": gov})
+    registry.purge(vault_one, {"from": gov})
+    registry.remove(vault_one, {"from": rando})
+    registry.addVersions("v3", {"from": gov})
+    registry.set("controller", vault_one, {"from": gov})
+    registry.deleteKey("controller", {"from": gov})
+
+    indexer.sync()
+    assert in_sync(registry, indexer)
+    assert indexer.digest() == registry.stateDigest()
+    assert indexer.production_vault(vault_two)[3] == "name=ETH-CVX,protocol=Badger,behavior=DCA"
@@ -0,0 +1,56 @@
+import json
+
+from brownie import web3
+from web3 import HTTPProvider, Web3
+
+from scripts.helpers.rpc_metrics import RpcMetrics, recording, report
+
+
+def test_records_requests(registry, tmp_path):
+    with recording(RpcMetrics()) as metrics:
+        web3.eth.block_number
+        web3.eth.block_number
+        registry.getProductionVaults()
+
+    summary = metrics.summary()
+    assert summary["eth_blockNumber"]["calls"] == 2
+    assert summary["eth_call"]["calls"] == 1
+    assert summary["eth_call"]["requestBytes"] > 0
+    assert summary["eth_call"]["responseBytes"] > 0
+    for stats in summary.values():
+        assert sum(stats["latency"].values()) == stats["calls"]
+
+    ## Nothing is recorded outside of the block
+    web3.eth.block_number
+    assert metrics.summary()["eth_blockNumber"]["calls"] == 2
+
+    path = tmp_path / "metrics.json"
+    report(str(path), metrics)
+    assert json.loads(path.read_text()) == summary
+
+
+def test_records_errors_and_retries():
+    unreachable = Web3(HTTPProvider("http://127.0.0.1:1"))
+    with recording(RpcMetrics()) as metrics:
+        try:
+            unreachable.eth.chain_id
+        except Exception:
+            pass
+
+    stats = metrics.summary()["eth_chainId"]
+    assert stats["errors"] == stats["calls"]
+    ## The provider retries failed connections
+    assert stats["retries"] == stats["calls"] - 1
+
+
+def test_retry_is_the_same_request_again():
+    provider = HTTPProvider("http://127.0.0.1:1")
+    with recording(RpcMetrics()) as metrics:
+        for params in (["0x0", "latest"], ["0x1", "latest"], ["0x1", "latest"]):
+            try:
+                provider.make_request("eth_getBalance", params)
+            except Exception:
+                pass
+
+    stats = metrics.summary()["eth_getBalance"]
+    assert (stats["calls"], stats["errors"], stats["retries"]) == (3, 3, 1)
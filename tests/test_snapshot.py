@@ -0,0 +1,81 @@
+import asyncio
+
+from brownie import BadgerRegistry, accounts, web3
+from web3 import Web3
+
+from scripts.snapshot import diff_keys, snapshot_networks
+
+
+def deploy_registry(w3):
+    """
+    Registry deployed and initialized by the first unlocked account of the node at `w3`
+    """
+    sender = w3.eth.accounts[0]
+    contract = w3.eth.contract(abi=BadgerRegistry.abi, bytecode=BadgerRegistry.bytecode)
+    receipt = w3.eth.wait_for_transaction_receipt(contract.constructor().transact({"from": sender}))
+    registry = w3.eth.contract(address=receipt["contractAddress"], abi=BadgerRegistry.abi)
+    w3.eth.wait_for_transaction_receipt(registry.functions.initialize(sender, sender).transact({"from": sender}))
+    return registry, sender
+
+
+def test_snapshot_networks(registry, gov, strategistGuild, vault_one, vault_two):
+    ## A second registry on the local chain stands in for another network, test_snapshot_chains uses a second chain
+    polygon = gov.deploy(BadgerRegistry)
+    polygon.initialize(gov, strategistGuild)
+
+    registry.setMany(["controller", "guardian"], [accounts[3], accounts[4]], {"from": gov})
+    registry.promote(vault_one, "v1", "name=BTC-CVX,protocol=Badger,behavior=DCA", 3, {"from": gov})
+    polygon.set("controller", accounts[5], {"from": gov})
+    polygon.promote(vault_two, "v2", "name=ETH-CVX,protocol=Badger,behavior=DCA", 2, {"from": gov})
+
+    rpc = web3.provider.endpoint_uri
+    networks = {
+        "ethereum": (rpc, registry.address),
+        "polygon": (rpc, polygon.address),
+        "offline": ("http://127.0.0.1:1", registry.address),
+    }
+    snapshots = asyncio.run(snapshot_networks(networks, BadgerRegistry.abi))
+
+    ethereum = snapshots["ethereum"]
+    assert ethereum["block"] == web3.eth.block_number
+    assert ethereum["chainId"] == web3.eth.chain_id
+    assert ethereum["keys"] == {"controller": accounts[3], "guardian": accounts[4]}
+    assert ethereum["versions"] == ["v1", "v1.5", "v2"]
+    assert ethereum["productionVaults"] == [
+        {"vault": vault_one, "version": "v1", "status": 3, "metadata": "name=BTC-CVX,protocol=Badger,behavior=DCA"}
+    ]
+    assert snapshots["polygon"]["productionVaults"] == [
+        {"vault": vault_two, "version": "v2", "status": 2, "metadata": "name=ETH-CVX,protocol=Badger,behavior=DCA"}
+    ]
+
+    ## A network that can't be reached doesn't fail the others
+    assert "error" in snapshots["offline"]
+
+    assert diff_keys(snapshots, expected=[]) == {"guardian": ["polygon"]}
+    assert diff_keys(snapshots)["BADGER"] == ["ethereum", "polygon"]
+
+
+def test_snapshot_chains(registry, gov, vault_one, vault_two, other_chain):
+    other = Web3(Web3.HTTPProvider(other_chain))
+    remote, sender = deploy_registry(other)
+    other.eth.wait_for_transaction_receipt(remote.functions.set("controller", vault_two).transact({"from": sender}))
+    registry.set("controller", vault_one, {"from": gov})
+
+    networks = {
+        "dev": (web3.provider.endpoint_uri, registry.address),
+        "other": (other_chain, remote.address),
+        ## Reachable, but no registry there, the empty eth_call result fails to decode
+        "empty": (other_chain, accounts[8].address),
+        "offline": ("http://127.0.0.1:1", registry.address),
+    }
+    snapshots = asyncio.run(snapshot_networks(networks, BadgerRegistry.abi))
+
+    assert snapshots["dev"]["chainId"] == web3.eth.chain_id
+    assert snapshots["other"]["chainId"] == other.eth.chain_id != web3.eth.chain_id
+    assert snapshots["other"]["block"] == other.eth.block_number
+    assert snapshots["dev"]["keys"] == {"controller": vault_one}
+    assert snapshots["other"]["keys"] == {"controller": vault_two}
+
+    ## Every kind of failure is reported per network
+    assert "error" in snapshots["empty"] and "error" in snapshots["offline"]
+    assert diff_keys(snapshots, expected=[]) == {}